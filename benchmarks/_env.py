@@ -0,0 +1,12 @@
+"""Configure chroma_server for benchmarking; import before ``chroma_server``.
+
+chroma_server creates its client and embedding cache at import time, so the
+settings have to be in the environment first. Both stay in memory: a
+benchmark never touches ./chroma_db or the on-disk embedding cache.
+"""
+from __future__ import annotations
+
+import os
+
+os.environ["CHROMA_SERVER_CLIENT"] = "ephemeral"
+os.environ["CHROMA_SERVER_EMBEDDING_CACHE_PATH"] = ""
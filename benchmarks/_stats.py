@@ -0,0 +1,10 @@
+"""Latency statistics shared by the benchmark scripts."""
+from __future__ import annotations
+
+from typing import Sequence
+
+
+def percentile(samples: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of ``samples`` (``fraction`` in ``[0, 1]``)."""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
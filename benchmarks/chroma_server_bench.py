@@ -0,0 +1,272 @@
+"""Offline throughput and latency benchmark for chroma_server.
+
+Usage: ``python benchmarks/chroma_server_bench.py [--concurrency 16] [--output results.json]``
+
+Drives the ASGI app in-process through httpx, against an ephemeral client or a
+persistent client in a temporary directory. Documents are synthetic and their
+embeddings are precomputed from a seeded RNG, so no model is downloaded and
+two runs with the same arguments do the same work. Three workloads are
+available:
+
+* ``ingest`` - NDJSON ``/ingest`` requests of ``--ingest-request-size`` records;
+* ``query`` - ``/query`` requests with distinct query vectors (cache misses);
+* ``mixed`` - queries interleaved with single-document adds (``--write-ratio``).
+
+The JSON report holds the configuration plus, per workload, request
+throughput and mean/p50/p95/p99/max latency, so results can be diffed
+between commits.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Sequence
+
+import chromadb
+import httpx
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import benchmarks._env  # noqa: E402,F401  (must precede chroma_server)
+import chroma_server  # noqa: E402
+from benchmarks._stats import percentile  # noqa: E402
+
+WORKLOADS = ("ingest", "query", "mixed")
+_TOPICS = ("camera", "lighting", "dialogue", "pacing", "subtext", "montage", "score", "blocking")
+
+
+def summarize(samples: Sequence[float], elapsed: float, errors: int) -> Dict[str, Any]:
+    """Latency percentiles (ms) and throughput for one set of request timings."""
+    if not samples:
+        return {"requests": 0, "errors": errors}
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "requestsPerSecond": round(len(samples) / elapsed, 1) if elapsed > 0 else None,
+        "meanMs": round(statistics.fmean(samples), 3),
+        "p50Ms": round(percentile(samples, 0.50), 3),
+        "p95Ms": round(percentile(samples, 0.95), 3),
+        "p99Ms": round(percentile(samples, 0.99), 3),
+        "maxMs": round(max(samples), 3),
+    }
+
+
+class Corpus:
+    """Deterministic synthetic documents with unit-length float32 embeddings."""
+
+    def __init__(self, size: int, dimensions: int, seed: int) -> None:
+        rng = np.random.default_rng(seed)
+        vectors = rng.standard_normal((size, dimensions), dtype=np.float32)
+        self.vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        self.ids = [f"doc-{i}" for i in range(size)]
+        self.documents = [
+            f"Synthetic note {i} about {_TOPICS[i % len(_TOPICS)]} and {_TOPICS[(i * 7) % len(_TOPICS)]}."
+            for i in range(size)
+        ]
+        self._rng = rng
+
+    def records(self, start: int, stop: int) -> List[Dict[str, Any]]:
+        return [
+            {
+                "id": self.ids[i],
+                "document": self.documents[i],
+                "metadata": {"topic": _TOPICS[i % len(_TOPICS)]},
+                "embedding": self.vectors[i].tolist(),
+            }
+            for i in range(start, stop)
+        ]
+
+    def query_vectors(self, count: int) -> np.ndarray:
+        """Noisy copies of stored vectors, so every query is distinct but has real neighbours."""
+        picks = self._rng.integers(0, len(self.ids), size=count)
+        noise = self._rng.standard_normal((count, self.vectors.shape[1]), dtype=np.float32) * 0.05
+        return self.vectors[picks] + noise
+
+
+async def _drive(
+    operations: Iterable[Callable[[httpx.AsyncClient], Awaitable[httpx.Response]]],
+    http: httpx.AsyncClient,
+    concurrency: int,
+) -> tuple[Dict[str, List[float]], Dict[str, int], float]:
+    """Run ``operations`` with ``concurrency`` workers; returns timings and errors by label."""
+    pending = iter(operations)
+    timings: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+
+    async def worker() -> None:
+        for operation in pending:
+            label = getattr(operation, "label", "request")
+            start = time.perf_counter()
+            response = await operation(http)
+            timings.setdefault(label, []).append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 300:
+                errors[label] = errors.get(label, 0) + 1
+
+    began = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return timings, errors, time.perf_counter() - began
+
+
+def _labelled(label: str, fn: Callable[[httpx.AsyncClient], Awaitable[httpx.Response]]):
+    fn.label = label  # type: ignore[attr-defined]
+    return fn
+
+
+def _query_payload(vector: np.ndarray, args: argparse.Namespace) -> Dict[str, Any]:
+    matrix = vector.reshape(1, -1)
+    if args.encoding == "base64":
+        embeddings: Any = chroma_server.EncodedVectors.from_array(matrix).model_dump()
+    else:
+        embeddings = matrix.tolist()
+    return {"query_embeddings": embeddings, "n_results": args.n_results, "include": ["distances", "metadatas"]}
+
+
+def _seed_collection(name: str, corpus: Corpus) -> None:
+    client = chroma_server.client
+    try:
+        client.delete_collection(name)
+    except Exception:
+        pass
+    collection = client.create_collection(name)
+    step = client.get_max_batch_size()
+    for start in range(0, len(corpus.ids), step):
+        stop = start + step
+        collection.add(
+            ids=corpus.ids[start:stop],
+            documents=corpus.documents[start:stop],
+            embeddings=corpus.vectors[start:stop],
+        )
+
+
+async def _ingest(http: httpx.AsyncClient, corpus: Corpus, args: argparse.Namespace) -> Dict[str, Any]:
+    name = "bench-ingest"
+    try:
+        chroma_server.client.delete_collection(name)
+    except Exception:
+        pass
+    await http.post(f"/collections/{name}")
+    size = args.ingest_request_size
+    bodies = [
+        "".join(json.dumps(record) + "\n" for record in corpus.records(start, min(start + size, len(corpus.ids)))).encode()
+        for start in range(0, len(corpus.ids), size)
+    ]
+    operations = (
+        _labelled("ingest", lambda client, body=body: client.post(f"/collections/{name}/ingest", content=body))
+        for body in bodies
+    )
+    timings, errors, elapsed = await _drive(operations, http, args.concurrency)
+    result = summarize(timings.get("ingest", []), elapsed, errors.get("ingest", 0))
+    result["documentsPerSecond"] = round(len(corpus.ids) / elapsed, 1) if elapsed > 0 else None
+    return result
+
+
+async def _query(http: httpx.AsyncClient, corpus: Corpus, args: argparse.Namespace) -> Dict[str, Any]:
+    name = "bench-query"
+    _seed_collection(name, corpus)
+    payloads = [_query_payload(vector, args) for vector in corpus.query_vectors(args.queries)]
+    operations = (
+        _labelled("query", lambda client, payload=payload: client.post(f"/collections/{name}/query", json=payload))
+        for payload in payloads
+    )
+    timings, errors, elapsed = await _drive(operations, http, args.concurrency)
+    return summarize(timings.get("query", []), elapsed, errors.get("query", 0))
+
+
+async def _mixed(http: httpx.AsyncClient, corpus: Corpus, args: argparse.Namespace) -> Dict[str, Any]:
+    name = "bench-mixed"
+    _seed_collection(name, corpus)
+    rng = np.random.default_rng(args.seed + 1)
+    writes = rng.random(args.queries) < args.write_ratio
+    vectors = corpus.query_vectors(args.queries)
+    operations = []
+    for index, (is_write, vector) in enumerate(zip(writes, vectors)):
+        if is_write:
+            payload = {
+                "ids": [f"mixed-{index}"],
+                "documents": [f"Mixed workload write {index}"],
+                "embeddings": [vector.tolist()],
+            }
+            operations.append(_labelled("write", lambda client, payload=payload: client.post(f"/collections/{name}/documents", json=payload)))
+        else:
+            payload = _query_payload(vector, args)
+            operations.append(_labelled("query", lambda client, payload=payload: client.post(f"/collections/{name}/query", json=payload)))
+    timings, errors, elapsed = await _drive(operations, http, args.concurrency)
+    every = [sample for samples in timings.values() for sample in samples]
+    result = summarize(every, elapsed, sum(errors.values()))
+    result["byOperation"] = {
+        label: summarize(samples, elapsed, errors.get(label, 0)) for label, samples in sorted(timings.items())
+    }
+    return result
+
+
+_RUNNERS = {"ingest": _ingest, "query": _query, "mixed": _mixed}
+
+
+async def _run(args: argparse.Namespace, corpus: Corpus) -> Dict[str, Any]:
+    transport = httpx.ASGITransport(app=chroma_server.app)
+    results: Dict[str, Any] = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as http:
+        for workload in args.workloads:
+            results[workload] = await _RUNNERS[workload](http, corpus, args)
+    return results
+
+
+def run_benchmarks(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run the selected workloads and return the JSON-serializable report."""
+    chroma_server.query_cache = chroma_server.OwnedLRUCache(args.query_cache_size, ttl=None)
+    corpus = Corpus(args.documents, args.dimensions, args.seed)
+    with tempfile.TemporaryDirectory(prefix="chroma-bench-") as directory:
+        chroma_server.client = chroma_server.create_client(args.client, directory)
+        chroma_server.collection_cache.clear()
+        workloads = asyncio.run(_run(args, corpus))
+    return {
+        "config": {key: value for key, value in sorted(vars(args).items()) if key != "output"},
+        "environment": {
+            "python": platform.python_version(),
+            "chromadb": chromadb.__version__,
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+        },
+        "workloads": workloads,
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workloads", type=lambda value: [item for item in value.split(",") if item], default=list(WORKLOADS))
+    parser.add_argument("--client", choices=("ephemeral", "persistent"), default="ephemeral")
+    parser.add_argument("--documents", type=int, default=5000)
+    parser.add_argument("--dimensions", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=1000, help="requests for the query and mixed workloads")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--n-results", type=int, default=10)
+    parser.add_argument("--ingest-request-size", type=int, default=500, help="records per /ingest request")
+    parser.add_argument("--write-ratio", type=float, default=0.1, help="share of mixed operations that are writes")
+    parser.add_argument("--encoding", choices=("json", "base64"), default="json", help="query vector encoding")
+    parser.add_argument("--query-cache-size", type=int, default=0, help="result cache size (0 measures the index)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="also write the report to this file")
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    args = build_parser().parse_args(argv)
+    unknown = set(args.workloads) - set(WORKLOADS)
+    if unknown:
+        raise SystemExit(f"unknown workloads: {', '.join(sorted(unknown))}")
+    report = json.dumps(run_benchmarks(args), indent=2)
+    if args.output:
+        Path(args.output).write_text(report + "\n", encoding="utf-8")
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Measure small-query latency through chroma_server with and without the collection cache.
+
+Usage: ``python benchmarks/collection_cache_bench.py [--queries 500]``
+
+Runs entirely in-process against an ephemeral Chroma client and prints a JSON
+summary with per-request latency percentiles for both configurations.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import chromadb
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import benchmarks._env  # noqa: E402,F401  (must precede chroma_server)
+import chroma_server  # noqa: E402
+from benchmarks._stats import percentile  # noqa: E402
+
+COLLECTION = "bench-collection"
+
+
+async def _measure(queries: int, cache_size: int) -> dict:
+    chroma_server.collection_cache = chroma_server.CollectionCache(cache_size)
+    # The same query is sent every time; keep the result cache out of the way
+    # so each request resolves the collection handle.
+    chroma_server.query_cache = chroma_server.OwnedLRUCache(maxsize=0)
+    transport = httpx.ASGITransport(app=chroma_server.app)
+    payload = {"query_embeddings": [[1.0, 0.0, 0.0]], "n_results": 3}
+    samples = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        for _ in range(20):
+            await http.post(f"/collections/{COLLECTION}/query", json=payload)
+        for _ in range(queries):
+            start = time.perf_counter()
+            response = await http.post(f"/collections/{COLLECTION}/query", json=payload)
+            samples.append((time.perf_counter() - start) * 1000)
+            response.raise_for_status()
+    return {
+        "cacheSize": cache_size,
+        "queries": queries,
+        "meanMs": round(statistics.fmean(samples), 3),
+        "p50Ms": round(percentile(samples, 0.50), 3),
+        "p95Ms": round(percentile(samples, 0.95), 3),
+        "p99Ms": round(percentile(samples, 0.99), 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--documents", type=int, default=100)
+    args = parser.parse_args()
+
+    chroma_server.client = chromadb.EphemeralClient()
+    collection = chroma_server.client.get_or_create_collection(COLLECTION)
+    collection.add(
+        ids=[f"doc-{i}" for i in range(args.documents)],
+        documents=[f"document {i}" for i in range(args.documents)],
+        embeddings=[[1.0, i / args.documents, 0.0] for i in range(args.documents)],
+    )
+
+    uncached = asyncio.run(_measure(args.queries, 0))
+    cached = asyncio.run(_measure(args.queries, 128))
+    speedup = round(uncached["meanMs"] / cached["meanMs"], 2) if cached["meanMs"] else None
+    print(json.dumps({"uncached": uncached, "cached": cached, "meanSpeedup": speedup}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,12 @@
+"""Compile the knowledge base and notes into a memory-mappable snapshot.
+
+Usage: ``python build_knowledge_snapshot.py build`` (see ``--help``).
+"""
+from __future__ import annotations
+
+import sys
+
+from src.knowledge_snapshot import main
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,15 +1,50 @@
+import asyncio
+import base64
+import binascii
+import contextlib
+import hashlib
+import heapq
+import json
 import logging
 import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Dict, Any, Optional, Union, Tuple
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field, PrivateAttr, field_validator, model_validator
+from typing import AsyncIterator, Callable, List, Dict, Any, Literal, Optional, Set, TypeVar, Union, Tuple, get_args
 import chromadb
-from chromadb.errors import InternalError, NotFoundError
+from chromadb.errors import (
+    DuplicateIDError,
+    InternalError,
+    InvalidArgumentError,
+    InvalidDimensionException,
+    NotFoundError,
+)
+import numpy as np
 import uvicorn
 
-app = FastAPI(title="ChromaDB MCP Server", description="REST API for ChromaDB operations")
+@contextlib.asynccontextmanager
+async def _lifespan(_app: "FastAPI") -> AsyncIterator[None]:
+    # Warm up in the background so the server can answer liveness probes;
+    # /ready reports 503 until the warm-up has finished.
+    task = asyncio.create_task(warmup.run())
+    try:
+        yield
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+
+app = FastAPI(title="ChromaDB MCP Server", description="REST API for ChromaDB operations", lifespan=_lifespan)
 
 logger = logging.getLogger(__name__)
 
@@ -46,25 +81,506 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+def create_client(mode: str, path: str):
+    """Return a Chroma client: ``persistent`` stores under ``path``, ``ephemeral`` keeps everything in memory."""
+    if mode == "persistent":
+        return chromadb.PersistentClient(path=path)
+    if mode == "ephemeral":
+        return chromadb.EphemeralClient()
+    raise ValueError(f"CHROMA_SERVER_CLIENT must be 'persistent' or 'ephemeral', not {mode!r}")
+
+
 # Initialize ChromaDB client
-client = chromadb.PersistentClient(path="./chroma_db")
+client = create_client(
+    os.getenv("CHROMA_SERVER_CLIENT", "persistent"),
+    os.getenv("CHROMA_SERVER_PERSIST_PATH", "./chroma_db"),
+)
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+
+class ChromaExecutor:
+    """Bounded thread pool for blocking Chroma calls.
+
+    At most ``workers`` calls run at once and at most ``max_queue`` more wait
+    for a thread; anything beyond that is rejected with 503 so latency cannot
+    grow without bound.
+    """
+
+    def __init__(self, name: str, workers: int, max_queue: int, retry_after: int = 1):
+        self.name = name
+        self.workers = workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.rejected = 0
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=503,
+                    detail="Server is busy, please retry later",
+                    headers={"Retry-After": str(self.retry_after)},
+                )
+            self._pending += 1
+        try:
+            future = self._pool.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._release()
+            raise
+        # The slot is freed when the thread finishes, not when the caller stops
+        # waiting: a cancelled request (e.g. a client disconnect) still occupies
+        # its worker until the Chroma call returns.
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, _future: Any = None) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def stats(self) -> Dict[str, int]:
+        return {"workers": self.workers, "maxQueue": self.max_queue, "pending": self._pending, "rejected": self.rejected}
+
+
+# Reads and writes get separate pools so a burst of ingests cannot starve
+# queries (and vice versa). Sizes are configurable via environment variables.
+_retry_after = int(os.getenv("CHROMA_SERVER_RETRY_AFTER", "1"))
+read_executor = ChromaExecutor(
+    "chroma-read",
+    workers=int(os.getenv("CHROMA_SERVER_READ_WORKERS", "8")),
+    max_queue=int(os.getenv("CHROMA_SERVER_READ_QUEUE", "64")),
+    retry_after=_retry_after,
+)
+write_executor = ChromaExecutor(
+    "chroma-write",
+    workers=int(os.getenv("CHROMA_SERVER_WRITE_WORKERS", "2")),
+    max_queue=int(os.getenv("CHROMA_SERVER_WRITE_QUEUE", "16")),
+    retry_after=_retry_after,
+)
+
+
+async def run_read(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    return await read_executor.run(fn, *args, **kwargs)
+
+
+async def run_write(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    return await write_executor.run(fn, *args, **kwargs)
+
+
+class OwnedLRUCache:
+    """Thread-safe LRU cache whose entries remember the client they came from.
+
+    Swapping the module-level ``client`` (as the tests do) therefore never
+    serves an entry from another database. ``ttl`` (seconds) bounds how long
+    an entry is trusted; ``maxsize=0`` disables the cache.
+    """
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Any, Tuple[Any, float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, owner: Any, key: Any) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and time.monotonic() - entry[1] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None or entry[0] is not owner:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, owner: Any, key: Any, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (owner, time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Any) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class CollectionCache(OwnedLRUCache):
+    """LRU cache of collection handles keyed by collection name."""
+
+    def remember(self, owner: Any, collection: Any) -> None:
+        self.put(owner, collection.name, collection)
+
+
+collection_cache = CollectionCache(int(os.getenv("CHROMA_SERVER_COLLECTION_CACHE_SIZE", "128")))
+query_cache = OwnedLRUCache(
+    int(os.getenv("CHROMA_SERVER_QUERY_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("CHROMA_SERVER_QUERY_CACHE_TTL", "300")),
+)
+
+# Per-collection write generation. Every add, upsert, rename or delete made
+# through this server bumps it, which retires all cached query results for
+# the collection because the generation is part of the cache key.
+_generations: Dict[str, int] = {}
+_generations_lock = threading.Lock()
+
+
+def collection_generation(collection_name: str) -> int:
+    with _generations_lock:
+        return _generations.get(collection_name, 0)
+
+
+def bump_generation(collection_name: str) -> None:
+    with _generations_lock:
+        _generations[collection_name] = _generations.get(collection_name, 0) + 1
+
+
+class EmbeddingCache:
+    """Two-tier cache of text embeddings keyed by SHA-256 of (model name, text).
+
+    Hot vectors live in an in-memory LRU; every vector is also written to a
+    sqlite table (float32 blobs) so re-ingesting an unchanged corpus after a
+    restart costs a lookup instead of a model forward pass. ``path=None``
+    keeps the cache in memory only.
+    """
+
+    _SQLITE_BATCH = 500
+
+    def __init__(self, maxsize: int, path: Optional[str] = None):
+        self.maxsize = maxsize
+        self.path = path
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if self.path and self._db is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+        return self._db
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        if self.maxsize <= 0:
+            return
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def get_many(self, model: str, texts: List[str]) -> List[Optional[np.ndarray]]:
+        keys = [self.key(model, text) for text in texts]
+        vectors: List[Optional[np.ndarray]] = [None] * len(texts)
+        with self._lock:
+            pending: Dict[str, List[int]] = {}
+            for index, key in enumerate(keys):
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    vectors[index] = vector
+                else:
+                    pending.setdefault(key, []).append(index)
+            db = self._connection() if pending else None
+            if db is not None:
+                wanted = list(pending)
+                for start in range(0, len(wanted), self._SQLITE_BATCH):
+                    chunk = wanted[start : start + self._SQLITE_BATCH]
+                    rows = db.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                    ).fetchall()
+                    for key, blob in rows:
+                        vector = np.frombuffer(blob, dtype=np.float32)
+                        self._remember(key, vector)
+                        for index in pending.pop(key):
+                            vectors[index] = vector
+                            self.disk_hits += 1
+            self.misses += sum(len(indices) for indices in pending.values())
+        return vectors
+
+    def put_many(self, model: str, texts: List[str], vectors: List[np.ndarray]) -> None:
+        rows = []
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                key = self.key(model, text)
+                self._remember(key, vector)
+                rows.append((key, vector.tobytes()))
+            db = self._connection()
+            if db is not None:
+                with db:
+                    db.executemany("INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "size": len(self._memory),
+                "maxsize": self.maxsize,
+                "path": self.path,
+                "memoryHits": self.memory_hits,
+                "diskHits": self.disk_hits,
+                "misses": self.misses,
+                "hitRate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            }
+
+
+embedding_cache = EmbeddingCache(
+    int(os.getenv("CHROMA_SERVER_EMBEDDING_CACHE_SIZE", "10000")),
+    os.getenv("CHROMA_SERVER_EMBEDDING_CACHE_PATH", "./chroma_embedding_cache.sqlite3") or None,
+)
+# Chroma's default embedding function, created on first use. Used for
+# collection handles that carry no function of their own (e.g. fan-out
+# queries and warm-up); otherwise each collection embeds with its own.
+embedding_function: Any = None
+
+
+def _get_embedding_function() -> Any:
+    global embedding_function
+    if embedding_function is None:
+        from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+
+        embedding_function = DefaultEmbeddingFunction()
+    return embedding_function
+
+
+def _model_name(function: Any) -> str:
+    return function.name() if hasattr(function, "name") else type(function).__name__
+
+
+def collection_embedding_function(collection: Any) -> Any:
+    """The embedding function ``collection`` was opened with, else the server default."""
+    return getattr(collection, "_embedding_function", None) or _get_embedding_function()
+
+
+def embed_texts(texts: List[str], function: Any = None) -> List[np.ndarray]:
+    """Return ``function``'s embeddings for ``texts``, computing only those missing from the cache (blocking).
+
+    The cache key includes the function's name, so collections embedded with
+    different models never share vectors.
+    """
+    function = function if function is not None else _get_embedding_function()
+    model = _model_name(function)
+    vectors = embedding_cache.get_many(model, texts)
+    missing = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+    if missing:
+        computed = [np.asarray(vector, dtype=np.float32) for vector in function(missing)]
+        embedding_cache.put_many(model, missing, computed)
+        by_text = dict(zip(missing, computed))
+        vectors = [vector if vector is not None else by_text[text] for text, vector in zip(texts, vectors)]
+    return vectors  # type: ignore[return-value]
+
+class Warmup:
+    """Startup warm-up: loads the embedding model and each configured collection's index.
+
+    For every collection the handle is cached, then one stored vector is
+    queried back so the index is read from disk before real traffic arrives.
+    A failed step is logged and reported but does not keep the server unready.
+    """
+
+    def __init__(self, collections: List[str], embedding_function: bool):
+        self.collections = collections
+        self.embedding_function = embedding_function
+        self.ready = False
+        self.report: Dict[str, Any] = {}
+
+    @staticmethod
+    def _warm_collection(name: str) -> Tuple[Any, int]:
+        collection = client.get_collection(name=name)
+        count = collection.count()
+        if count:
+            sample = collection.get(limit=1, include=["embeddings"])
+            collection.query(query_embeddings=sample["embeddings"], n_results=1, include=[])
+        return collection, count
+
+    @staticmethod
+    def _warm_embedding_function() -> None:
+        _get_embedding_function()(["warm-up"])
+
+    async def _step(self, fn: Callable[..., T], *args: Any) -> Tuple[Optional[T], Dict[str, Any]]:
+        began = time.perf_counter()
+        try:
+            result = await read_executor.run(fn, *args)
+            status: Dict[str, Any] = {"status": "ok"}
+        except Exception as exc:
+            logger.warning("Warm-up step %s%r failed: %s", fn.__name__, args, exc)
+            result, status = None, {"status": "error", "error": str(exc)}
+        status["durationMs"] = round((time.perf_counter() - began) * 1000, 3)
+        return result, status
+
+    async def run(self) -> Dict[str, Any]:
+        began = time.perf_counter()
+        report: Dict[str, Any] = {"collections": {}}
+        if self.embedding_function:
+            _, report["embeddingFunction"] = await self._step(self._warm_embedding_function)
+        steps = await asyncio.gather(*(self._step(self._warm_collection, name) for name in self.collections))
+        for name, (result, status) in zip(self.collections, steps):
+            if result is not None:
+                collection, status["count"] = result
+                collection_cache.remember(client, collection)
+            report["collections"][name] = status
+        report["durationMs"] = round((time.perf_counter() - began) * 1000, 3)
+        self.report = report
+        self.ready = True
+        logger.info("Warm-up finished in %.0f ms", report["durationMs"])
+        return report
+
+    def stats(self) -> Dict[str, Any]:
+        return {"ready": self.ready, **self.report}
+
+
+warmup = Warmup(
+    collections=[name.strip() for name in os.getenv("CHROMA_SERVER_WARMUP_COLLECTIONS", "").split(",") if name.strip()],
+    embedding_function=os.getenv("CHROMA_SERVER_WARMUP_EMBEDDINGS", "1") != "0",
+)
+
 # Pydantic models for request/response
+class EncodedVectors(BaseModel):
+    """A row-major matrix of little-endian float32 values, base64 encoded.
+
+    Roughly 4x smaller than the same vectors as JSON numbers, and validated as
+    one string instead of float by float.
+    """
+
+    dtype: Literal["float32"] = "float32"
+    shape: Tuple[int, int]
+    data: str
+
+    _array: Optional[np.ndarray] = PrivateAttr(default=None)
+
+    @model_validator(mode="after")
+    def _decode(self) -> "EncodedVectors":
+        rows, dims = self.shape
+        if rows <= 0 or dims <= 0:
+            raise ValueError("shape must be [rows, dims] with rows > 0 and dims > 0")
+        try:
+            raw = base64.b64decode(self.data, validate=True)
+        except binascii.Error as exc:
+            raise ValueError("data is not valid base64") from exc
+        self._array = decode_vectors(raw, rows, dims)
+        return self
+
+    def to_array(self) -> np.ndarray:
+        return self._array
+
+    @classmethod
+    def from_array(cls, array: np.ndarray) -> "EncodedVectors":
+        matrix = np.ascontiguousarray(np.atleast_2d(array), dtype="<f4")
+        # Built from trusted data, so skip validation: responses may hold zero rows.
+        encoded = cls.model_construct(shape=matrix.shape, data=base64.b64encode(matrix.tobytes()).decode("ascii"))
+        encoded._array = matrix
+        return encoded
+
+
+def decode_vectors(raw: bytes, rows: int, dims: int) -> np.ndarray:
+    """View ``raw`` little-endian float32 bytes as a ``(rows, dims)`` array without copying."""
+    if len(raw) != rows * dims * 4:
+        raise ValueError(f"expected {rows * dims * 4} bytes for shape [{rows}, {dims}], got {len(raw)}")
+    return np.frombuffer(raw, dtype="<f4").reshape(rows, dims)
+
+
+Vectors = Union[EncodedVectors, List[List[float]]]
+EmbeddingEncoding = Literal["json", "base64"]
+QueryInclude = Literal["documents", "metadatas", "embeddings", "distances", "uris"]
+GetInclude = Literal["documents", "metadatas", "embeddings", "uris"]
+# Chroma's own defaults, spelled out so cache keys and batches compare equal.
+DEFAULT_QUERY_INCLUDE: List[QueryInclude] = ["metadatas", "documents", "distances"]
+DEFAULT_GET_INCLUDE: List[GetInclude] = ["metadatas", "documents"]
+
+
+def vectors_value(vectors: Optional[Vectors]) -> Union[np.ndarray, List[List[float]], None]:
+    return vectors.to_array() if isinstance(vectors, EncodedVectors) else vectors
+
+
+def encode_embeddings(matrix: Any, encoding: EmbeddingEncoding) -> Any:
+    array = np.asarray(matrix)
+    if encoding == "base64":
+        return EncodedVectors.from_array(array.reshape(-1, array.shape[-1]) if array.size else array.reshape(0, 1)).model_dump()
+    return array.tolist()
+
+
+def encode_result_embeddings(results: Dict[str, Any], encoding: EmbeddingEncoding, *, per_query: bool = True) -> Dict[str, Any]:
+    """Return ``results`` without ``None`` fields and with embeddings as JSON lists or base64 matrices.
+
+    ``per_query`` results (from ``collection.query``) hold one embedding matrix
+    per query; ``collection.get`` results hold a single matrix.
+    """
+    trimmed = {field: value for field, value in results.items() if value is not None}
+    embeddings = trimmed.get("embeddings")
+    if embeddings is not None:
+        if per_query:
+            trimmed["embeddings"] = [encode_embeddings(rows, encoding) for rows in embeddings]
+        else:
+            trimmed["embeddings"] = encode_embeddings(embeddings, encoding)
+    return trimmed
+
+
 class DocumentData(BaseModel):
     documents: List[str]
     metadatas: Optional[List[Dict[str, Any]]] = None
     ids: List[str]
-    embeddings: Optional[List[List[float]]] = None
+    embeddings: Optional[Vectors] = None
 
 
 class QueryData(BaseModel):
     query_texts: Optional[List[str]] = None
-    query_embeddings: Optional[List[List[float]]] = None
+    query_embeddings: Optional[Vectors] = None
     n_results: int = 10
     where: Optional[Dict[str, Any]] = None
     where_document: Optional[Dict[str, Any]] = None
+    include: List[QueryInclude] = DEFAULT_QUERY_INCLUDE
+    embedding_encoding: EmbeddingEncoding = "json"
+
+    @field_validator("include")
+    @classmethod
+    def _canonical_include(cls, value: List[str]) -> List[str]:
+        return sorted(set(value))
+
+    def cache_key(self) -> str:
+        """Canonical hash of the query (key order and whitespace do not matter)."""
+        canonical = json.dumps(self.model_dump(exclude={"embedding_encoding"}), sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+class FanOutQueryData(BaseModel):
+    collections: List[str] = Field(min_length=1)
+    query: QueryData
+
 
 @app.get("/")
 async def root():
@@ -74,8 +590,11 @@ async def root():
 async def create_collection(collection_name: str):
     """Create a new collection"""
     try:
-        collection = client.create_collection(name=collection_name)
+        collection = await run_write(client.create_collection, name=collection_name)
+        collection_cache.remember(client, collection)
         return {"message": f"Collection '{collection_name}' created successfully"}
+    except HTTPException:
+        raise
     except InternalError as exc:
         message = str(exc)
         if "already exists" in message.lower():
@@ -86,9 +605,17 @@ async def create_collection(collection_name: str):
         logger.exception("Unexpected error creating collection '%s'", collection_name)
         raise
 
-def _get_collection_or_404(collection_name: str):
+async def _get_collection_or_404(collection_name: str):
+    owner = client
+    cached = collection_cache.get(owner, collection_name)
+    if cached is not None:
+        return cached
     try:
-        return client.get_collection(name=collection_name)
+        collection = await run_read(owner.get_collection, name=collection_name)
+        collection_cache.remember(owner, collection)
+        return collection
+    except HTTPException:
+        raise
     except (NotFoundError, ValueError) as exc:
         raise HTTPException(status_code=404, detail=str(exc))
     except Exception as exc:
@@ -101,7 +628,7 @@ def _get_collection_or_404(collection_name: str):
 @app.post("/collections/{collection_name}/documents")
 async def add_documents(collection_name: str, data: DocumentData):
     """Add documents to a collection"""
-    collection = _get_collection_or_404(collection_name)
+    collection = await _get_collection_or_404(collection_name)
 
     add_params: Dict[str, Any] = {
         "documents": data.documents,
@@ -109,52 +636,652 @@ async def add_documents(collection_name: str, data: DocumentData):
         "ids": data.ids,
     }
     if data.embeddings is not None:
-        add_params["embeddings"] = data.embeddings
+        add_params["embeddings"] = vectors_value(data.embeddings)
 
-    try:
+    def add() -> None:
+        if "embeddings" not in add_params:
+            add_params["embeddings"] = embed_texts(data.documents, collection_embedding_function(collection))
         collection.add(**add_params)
+
+    try:
+        await run_write(add)
         return {"message": f"Added {len(data.documents)} documents to collection '{collection_name}'"}
     except HTTPException:
         raise
+    except NotFoundError as exc:
+        collection_cache.invalidate(collection_name)
+        raise HTTPException(status_code=404, detail=str(exc))
     except Exception as exc:
         logger.exception(
             "Unexpected error adding documents to collection '%s'", collection_name,
         )
         raise HTTPException(status_code=500, detail="Internal server error") from exc
+    finally:
+        bump_generation(collection_name)
+
+class QueryBatcher:
+    """Coalesces concurrent compatible queries into one ``collection.query`` call.
+
+    Queries against the same collection handle with equal vector dimension,
+    ``where``, ``where_document``, ``n_results`` and ``include`` are collected for up to
+    ``window`` seconds, or until ``max_queries`` query vectors are waiting, then embedded
+    and searched together on the read executor. Each caller gets back its own
+    slice of the combined result, so the window bounds the added latency. If
+    Chroma rejects a batch's data, its queries are retried one by one so only
+    the malformed one fails.
+    """
+
+    def __init__(self, window: float, max_queries: int):
+        self.window = window
+        self.max_queries = max_queries
+        self._groups: Dict[Any, Dict[str, Any]] = {}
+        self._tasks: Set["asyncio.Task[None]"] = set()
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.queries = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0 and self.max_queries > 1
+
+    async def query(self, collection, params: Dict[str, Any], texts: Optional[List[str]], embeddings: Optional[List[Any]]) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        filters = json.dumps(params, sort_keys=True)
+        # Only vectors of one dimension can be stacked; text queries are embedded by the collection.
+        dimension = len(embeddings[0]) if embeddings is not None and len(embeddings) else None
+        key = (id(loop), id(collection), dimension, filters)
+        future: "asyncio.Future[Dict[str, Any]]" = loop.create_future()
+        count = len(embeddings if embeddings is not None else texts or [])
+        with self._lock:
+            group = self._groups.get(key)
+            if group is None:
+                group = {"collection": collection, "params": params, "entries": [], "size": 0}
+                group["timer"] = loop.call_later(self.window, self._flush, key)
+                self._groups[key] = group
+            group["entries"].append((texts, embeddings, future))
+            group["size"] += count
+            full = group["size"] >= self.max_queries
+        if full:
+            self._flush(key)
+        return await future
+
+    def _flush(self, key: Any) -> None:
+        with self._lock:
+            group = self._groups.pop(key, None)
+        if group is None:
+            return
+        group["timer"].cancel()
+        # The loop only keeps a weak reference to tasks; hold one until it finishes.
+        task = asyncio.ensure_future(self._execute(group))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _execute(self, group: Dict[str, Any]) -> None:
+        self.batches += 1
+        self.queries += len(group["entries"])
+        await self._answer(group["collection"], group["params"], group["entries"])
+
+    async def _answer(self, collection, params: Dict[str, Any], entries: List[Any]) -> None:
+        function = collection_embedding_function(collection)
+
+        def run() -> Dict[str, Any]:
+            # Every text query in the batch is embedded in one call, then handed back in order.
+            texts = [text for entry_texts, embeddings, _ in entries if embeddings is None for text in entry_texts]
+            embedded = iter(embed_texts(texts, function) if texts else [])
+            # Callers may mix JSON lists and decoded float32 arrays; Chroma wants one type.
+            vectors = np.vstack([
+                np.asarray(embeddings if embeddings is not None else [next(embedded) for _ in entry_texts], dtype=np.float32)
+                for entry_texts, embeddings, _ in entries
+            ])
+            return collection.query(query_embeddings=vectors, **params)
+
+        try:
+            results = await run_read(run)
+        except BaseException as exc:
+            if len(entries) > 1 and isinstance(exc, _CLIENT_DATA_ERRORS):
+                # One malformed query must not fail the others, so answer each on its own.
+                await asyncio.gather(*(self._answer(collection, params, [entry]) for entry in entries))
+                return
+            for _, _, future in entries:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        start = 0
+        for texts, embeddings, future in entries:
+            end = start + len(embeddings if embeddings is not None else texts)
+            if not future.done():
+                future.set_result({
+                    field: value if field == "included" or value is None else value[start:end]
+                    for field, value in results.items()
+                })
+            start = end
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "windowMs": self.window * 1000,
+            "maxQueries": self.max_queries,
+            "batches": self.batches,
+            "queries": self.queries,
+        }
+
+
+# Opt-in: set CHROMA_SERVER_QUERY_BATCH_WINDOW_MS to a few milliseconds to enable.
+query_batcher = QueryBatcher(
+    window=float(os.getenv("CHROMA_SERVER_QUERY_BATCH_WINDOW_MS", "0")) / 1000,
+    max_queries=int(os.getenv("CHROMA_SERVER_QUERY_BATCH_MAX", "32")),
+)
+
+# Chroma errors caused by the records themselves rather than by the server.
+_CLIENT_DATA_ERRORS = (ValueError, InvalidArgumentError, InvalidDimensionException, DuplicateIDError)
+
+DEFAULT_INGEST_BATCH_SIZE = int(os.getenv("CHROMA_SERVER_INGEST_BATCH_SIZE", "256"))
+DEFAULT_INGEST_IN_FLIGHT = int(os.getenv("CHROMA_SERVER_INGEST_IN_FLIGHT", "2"))
+MAX_INGEST_IN_FLIGHT = 16
+
+
+class IngestError(ValueError):
+    """A malformed NDJSON ingest record."""
+
+
+async def _iter_ndjson_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, bytes]]:
+    """Yield ``(line_number, line)`` for each non-blank line of a streamed NDJSON body."""
+    buffer = b""
+    line_number = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield line_number, line
+    if buffer.strip():
+        yield line_number + 1, buffer
+
+
+def _parse_ingest_record(line: bytes, line_number: int) -> Dict[str, Any]:
+    try:
+        record = json.loads(line)
+    except ValueError as exc:
+        raise IngestError(f"Line {line_number}: invalid JSON") from exc
+    if not isinstance(record, dict) or not isinstance(record.get("id"), str):
+        raise IngestError(f"Line {line_number}: expected an object with string 'id' and 'document' fields")
+    # A record stored with only an embedding has no document to send.
+    document = record.get("document")
+    if not isinstance(document, str) and (document is not None or record.get("embedding") is None):
+        raise IngestError(f"Line {line_number}: expected an object with string 'id' and 'document' fields")
+    if record.get("metadata") is not None and not isinstance(record["metadata"], dict):
+        raise IngestError(f"Line {line_number}: 'metadata' must be an object")
+    if record.get("embedding") is not None and not isinstance(record["embedding"], list):
+        raise IngestError(f"Line {line_number}: 'embedding' must be an array of numbers")
+    return record
+
+
+async def _iter_ndjson_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[Dict[str, Any]]:
+    async for line_number, line in _iter_ndjson_lines(chunks):
+        yield _parse_ingest_record(line, line_number)
+
+
+def _upsert_batch(collection, records: List[Dict[str, Any]]) -> None:
+    """Upsert one batch, filling in missing embeddings through the embedding cache."""
+    missing = [index for index, record in enumerate(records) if record.get("embedding") is None]
+    embeddings: List[Any] = [record.get("embedding") for record in records]
+    if missing:
+        texts = [records[index]["document"] for index in missing]
+        for index, vector in zip(missing, embed_texts(texts, collection_embedding_function(collection))):
+            embeddings[index] = vector
+    metadatas = [record.get("metadata") or None for record in records]
+    collection.upsert(
+        ids=[record["id"] for record in records],
+        documents=[record.get("document") for record in records],
+        metadatas=metadatas if any(metadatas) else None,
+        embeddings=embeddings,
+    )
+
+
+async def ingest_records(
+    collection,
+    records: AsyncIterator[Dict[str, Any]],
+    *,
+    batch_size: int,
+    max_in_flight: int,
+) -> Tuple[Dict[str, Any], Optional[str]]:
+    """Group ``records`` into batches and upsert them with at most ``max_in_flight`` batches running.
+
+    Parsing continues while earlier batches are being written. A batch that
+    shares ids with a batch still in flight waits for it, so the last record
+    for an id wins across the whole stream. A malformed record stops the
+    ingest after everything before it has been upserted; its message is
+    returned alongside the summary.
+    """
+    started = time.perf_counter()
+    batches: List[Dict[str, Any]] = []
+    in_flight: Set["asyncio.Task[None]"] = set()
+    # Latest unfinished batch writing each id.
+    writers: Dict[str, "asyncio.Task[None]"] = {}
+    submitted = 0
+
+    async def run_batch(index: int, batch: List[Dict[str, Any]], after: Set["asyncio.Task[None]"]) -> None:
+        if after:
+            await asyncio.gather(*after, return_exceptions=True)
+        began = time.perf_counter()
+        summary: Dict[str, Any] = {"batch": index, "count": len(batch), "firstId": batch[0]["id"], "lastId": batch[-1]["id"]}
+        try:
+            await run_write(_upsert_batch, collection, batch)
+            summary["status"] = "ok"
+        except HTTPException as exc:
+            summary.update(status="error", error=str(exc.detail))
+        except _CLIENT_DATA_ERRORS as exc:
+            logger.warning(
+                "Rejected batch %d (%s..%s) for '%s': %s",
+                index, summary["firstId"], summary["lastId"], collection.name, exc,
+            )
+            summary.update(status="error", error=str(exc))
+        except Exception as exc:
+            logger.exception("Failed to upsert batch %d into '%s'", index, collection.name)
+            summary.update(status="error", error=str(exc))
+        bump_generation(collection.name)
+        summary["durationMs"] = round((time.perf_counter() - began) * 1000, 3)
+        batches.append(summary)
+
+    async def submit(batch: List[Dict[str, Any]]) -> None:
+        nonlocal submitted
+        # Upserts are idempotent per id, so the last record for an id wins.
+        batch = list({record["id"]: record for record in batch}.values())
+        while len(in_flight) >= max_in_flight:
+            await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+        ids = [record["id"] for record in batch]
+        after = {writers[record_id] for record_id in ids if record_id in writers}
+        task = asyncio.create_task(run_batch(submitted, batch, after))
+        submitted += 1
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+        writers.update(dict.fromkeys(ids, task))
+
+        def forget(done: "asyncio.Task[None]") -> None:
+            for record_id in ids:
+                if writers.get(record_id) is done:
+                    del writers[record_id]
+
+        task.add_done_callback(forget)
+
+    error: Optional[str] = None
+    batch: List[Dict[str, Any]] = []
+    received = 0
+    try:
+        async for record in records:
+            received += 1
+            batch.append(record)
+            if len(batch) >= batch_size:
+                await submit(batch)
+                batch = []
+    except IngestError as exc:
+        error = str(exc)
+    finally:
+        if batch:
+            await submit(batch)
+        if in_flight:
+            await asyncio.gather(*in_flight)
+
+    batches.sort(key=lambda summary: summary["batch"])
+    elapsed = time.perf_counter() - started
+    ingested = sum(summary["count"] for summary in batches if summary["status"] == "ok")
+    return {
+        "collection": collection.name,
+        "received": received,
+        "ingested": ingested,
+        "failedBatches": sum(1 for summary in batches if summary["status"] != "ok"),
+        "batches": batches,
+        "durationMs": round(elapsed * 1000, 3),
+        "documentsPerSecond": round(ingested / elapsed, 1) if elapsed > 0 else None,
+    }, error
+
+
+async def _ingest_request(collection, request: Request, batch_size: int, max_in_flight: int) -> JSONResponse:
+    batch_size = min(batch_size, await run_read(client.get_max_batch_size))
+
+    summary, error = await ingest_records(
+        collection,
+        _iter_ndjson_records(request.stream()),
+        batch_size=batch_size,
+        max_in_flight=max_in_flight,
+    )
+    if error is not None:
+        return JSONResponse(status_code=400, content={"detail": error, **summary})
+    return JSONResponse(status_code=207 if summary["failedBatches"] else 200, content=summary)
+
+
+@app.post("/collections/{collection_name}/ingest")
+async def ingest_documents(
+    collection_name: str,
+    request: Request,
+    batch_size: int = Query(DEFAULT_INGEST_BATCH_SIZE, ge=1),
+    max_in_flight: int = Query(DEFAULT_INGEST_IN_FLIGHT, ge=1, le=MAX_INGEST_IN_FLIGHT),
+):
+    """Stream NDJSON records (``{"id", "document", "metadata"?, "embedding"?}`` per line) into a collection"""
+    collection = await _get_collection_or_404(collection_name)
+    return await _ingest_request(collection, request, batch_size, max_in_flight)
+
+
+@app.post("/collections/{collection_name}/import")
+async def import_collection(
+    collection_name: str,
+    request: Request,
+    batch_size: int = Query(DEFAULT_INGEST_BATCH_SIZE, ge=1),
+    max_in_flight: int = Query(DEFAULT_INGEST_IN_FLIGHT, ge=1, le=MAX_INGEST_IN_FLIGHT),
+):
+    """Restore an ``/export`` dump, creating the collection if it does not exist"""
+    try:
+        collection = await run_write(client.get_or_create_collection, name=collection_name)
+    except HTTPException:
+        raise
+    except Exception as exc:
+        logger.exception("Failed to open collection '%s' for import", collection_name)
+        raise HTTPException(status_code=500, detail="Internal server error") from exc
+    collection_cache.remember(client, collection)
+    return await _ingest_request(collection, request, batch_size, max_in_flight)
+
+
+async def _run_collection_query(
+    collection_name: str,
+    cache_key: str,
+    params: Dict[str, Any],
+    texts: Optional[List[str]],
+    embeddings: Union[np.ndarray, List[List[float]], None],
+) -> Dict[str, Any]:
+    """Answer a query from the result cache, the batcher or a direct read."""
+    owner = client
+    key = (collection_name, collection_generation(collection_name), cache_key)
+    cached = query_cache.get(owner, key)
+    if cached is not None:
+        return cached
+
+    collection = await _get_collection_or_404(collection_name)
+
+    def run_query() -> Dict[str, Any]:
+        if embeddings is not None:
+            return collection.query(query_embeddings=embeddings, **params)
+        if texts is not None:
+            return collection.query(query_embeddings=embed_texts(texts, collection_embedding_function(collection)), **params)
+        return collection.query(**params)
+
+    try:
+        if query_batcher.enabled and (texts or (embeddings is not None and len(embeddings))):
+            results = await query_batcher.query(collection, params, texts, embeddings)
+        else:
+            results = await run_read(run_query)
+        query_cache.put(owner, key, results)
+        return results
+    except HTTPException:
+        raise
+    except NotFoundError as exc:
+        collection_cache.invalidate(collection_name)
+        raise HTTPException(status_code=404, detail=str(exc))
+    except Exception as exc:
+        logger.exception(
+            "Unexpected error querying collection '%s'", collection_name,
+        )
+        raise HTTPException(status_code=500, detail="Internal server error") from exc
+
 
 @app.post("/collections/{collection_name}/query")
 async def query_documents(collection_name: str, query: QueryData):
     """Query documents in a collection"""
-    collection = _get_collection_or_404(collection_name)
+    results = await _run_collection_query(
+        collection_name,
+        query.cache_key(),
+        {
+            "n_results": query.n_results,
+            "where": query.where,
+            "where_document": query.where_document,
+            "include": query.include,
+        },
+        query.query_texts,
+        vectors_value(query.query_embeddings),
+    )
+    return encode_result_embeddings(results, query.embedding_encoding)
+
+
+def _parse_vector_shape(value: Optional[str]) -> Tuple[int, int]:
+    try:
+        rows, dims = (int(part) for part in (value or "").split(","))
+    except ValueError:
+        raise HTTPException(status_code=422, detail="X-Vector-Shape must be 'rows,dims'")
+    if rows <= 0 or dims <= 0:
+        raise HTTPException(status_code=422, detail="X-Vector-Shape must be positive")
+    return rows, dims
+
+
+def _json_filter(name: str, value: Optional[str]) -> Optional[Dict[str, Any]]:
+    if value is None:
+        return None
+    try:
+        parsed = json.loads(value)
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=422, detail=f"{name} must be a JSON object")
+    if not isinstance(parsed, dict):
+        raise HTTPException(status_code=422, detail=f"{name} must be a JSON object")
+    return parsed
+
+
+def _include_arg(value: Optional[str], allowed: Any, default: List[str]) -> List[str]:
+    """Parse a comma-separated ``include`` query parameter against the ``allowed`` literal."""
+    if value is None:
+        return sorted(default)
+    fields = {part.strip() for part in value.split(",") if part.strip()}
+    unknown = fields - set(get_args(allowed))
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"include may only contain {', '.join(get_args(allowed))}")
+    return sorted(fields)
+
+
+@app.post("/collections/{collection_name}/query/binary")
+async def query_documents_binary(
+    collection_name: str,
+    request: Request,
+    n_results: int = Query(10, ge=1),
+    where: Optional[str] = Query(None),
+    where_document: Optional[str] = Query(None),
+    include: Optional[str] = Query(None),
+    embedding_encoding: EmbeddingEncoding = Query("json"),
+):
+    """Query with raw little-endian float32 query vectors (``application/octet-stream``).
+
+    The ``X-Vector-Shape: rows,dims`` header declares the matrix shape; filters
+    are JSON-encoded query parameters.
+    """
+    rows, dims = _parse_vector_shape(request.headers.get("x-vector-shape"))
+    body = await request.body()
+    try:
+        vectors = decode_vectors(body, rows, dims)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    params = {
+        "n_results": n_results,
+        "where": _json_filter("where", where),
+        "where_document": _json_filter("where_document", where_document),
+        "include": _include_arg(include, QueryInclude, DEFAULT_QUERY_INCLUDE),
+    }
+    digest = hashlib.sha256(json.dumps([params, rows, dims], sort_keys=True).encode("utf-8"))
+    digest.update(body)
+    results = await _run_collection_query(collection_name, f"binary:{digest.hexdigest()}", params, None, vectors)
+    return encode_result_embeddings(results, embedding_encoding)
+
+_MERGED_FIELDS = ("ids", "distances", "documents", "metadatas", "embeddings", "uris")
+
+
+def merge_top_k(results: List[Tuple[str, Dict[str, Any]]], n_results: int) -> Dict[str, Any]:
+    """Merge per-collection query results into one global top-``n_results`` per query.
+
+    Each collection's hits are already sorted by distance, so a lazy
+    ``heapq.merge`` only touches the rows it keeps. Every hit is tagged with its
+    collection in the parallel ``collections`` field.
+    """
+    fields = [field for field in _MERGED_FIELDS if results[0][1].get(field) is not None]
+    merged: Dict[str, Any] = {field: [] for field in fields}
+    merged["collections"] = []
+
+    def hits(name: str, result: Dict[str, Any], query_index: int):
+        for row, distance in enumerate(result["distances"][query_index]):
+            yield distance, name, result, row
+
+    for query_index in range(len(results[0][1]["ids"])):
+        streams = [hits(name, result, query_index) for name, result in results]
+        top = list(islice(heapq.merge(*streams, key=lambda hit: hit[0]), n_results))
+        for field in fields:
+            column = [result[field][query_index][row] for _, _, result, row in top]
+            merged[field].append(np.asarray(column) if field == "embeddings" else column)
+        merged["collections"].append([name for _, name, _, _ in top])
+    merged["included"] = [field for field in fields if field != "ids"]
+    return merged
+
 
-    query_params: Dict[str, Any] = {
+@app.post("/query")
+async def query_collections(data: FanOutQueryData):
+    """Query several collections at once and merge the hits into one ranking"""
+    query = data.query
+    names = list(dict.fromkeys(data.collections))
+    if query.query_embeddings is not None:
+        vectors = dict.fromkeys(names, vectors_value(query.query_embeddings))
+    elif query.query_texts is not None:
+        # Embed once per distinct embedding function instead of once per collection.
+        collections = await asyncio.gather(*(_get_collection_or_404(name) for name in names))
+        functions = {name: collection_embedding_function(collection) for name, collection in zip(names, collections)}
+        models = {_model_name(function): function for function in functions.values()}
+        embedded = await asyncio.gather(*(run_read(embed_texts, query.query_texts, function) for function in models.values()))
+        by_model = dict(zip(models, embedded))
+        vectors = {name: by_model[_model_name(function)] for name, function in functions.items()}
+    else:
+        raise HTTPException(status_code=422, detail="query_texts or query_embeddings is required")
+
+    params = {
         "n_results": query.n_results,
         "where": query.where,
         "where_document": query.where_document,
+        # Distances drive the merge, so they are always fetched.
+        "include": sorted(set(query.include) | {"distances"}),
+    }
+    cache_key = f"fanout:{query.cache_key()}"
+    results = await asyncio.gather(
+        *(_run_collection_query(name, cache_key, params, None, vectors[name]) for name in names)
+    )
+    merged = merge_top_k(list(zip(names, results)), query.n_results)
+    return encode_result_embeddings(merged, query.embedding_encoding)
+
+
+MAX_PAGE_SIZE = int(os.getenv("CHROMA_SERVER_MAX_PAGE_SIZE", "1000"))
+
+
+@app.get("/collections/{collection_name}/documents")
+async def list_documents(
+    collection_name: str,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    include: Optional[str] = Query(None),
+    where: Optional[str] = Query(None),
+    where_document: Optional[str] = Query(None),
+    embedding_encoding: EmbeddingEncoding = Query("json"),
+):
+    """Page through the documents of a collection"""
+    collection = await _get_collection_or_404(collection_name)
+    params = {
+        "limit": limit,
+        "offset": offset,
+        "include": _include_arg(include, GetInclude, DEFAULT_GET_INCLUDE),
+        "where": _json_filter("where", where),
+        "where_document": _json_filter("where_document", where_document),
     }
-    if query.query_texts is not None:
-        query_params["query_texts"] = query.query_texts
-    if query.query_embeddings is not None:
-        query_params["query_embeddings"] = query.query_embeddings
 
     try:
-        results = collection.query(**query_params)
-        return results
+        results = await run_read(collection.get, **params)
     except HTTPException:
         raise
+    except NotFoundError as exc:
+        collection_cache.invalidate(collection_name)
+        raise HTTPException(status_code=404, detail=str(exc))
     except Exception as exc:
         logger.exception(
-            "Unexpected error querying collection '%s'", collection_name,
+            "Unexpected error listing documents in collection '%s'", collection_name,
         )
         raise HTTPException(status_code=500, detail="Internal server error") from exc
 
+    page = encode_result_embeddings(results, embedding_encoding, per_query=False)
+    page["limit"] = limit
+    page["offset"] = offset
+    page["nextOffset"] = offset + limit if len(results["ids"]) == limit else None
+    return page
+
+DEFAULT_EXPORT_PAGE_SIZE = int(os.getenv("CHROMA_SERVER_EXPORT_PAGE_SIZE", "500"))
+
+
+def _export_lines(page: Dict[str, Any]) -> bytes:
+    """Render one ``collection.get`` page as NDJSON records accepted by ``/ingest``."""
+    embeddings = page.get("embeddings")
+    lines = []
+    for index, record_id in enumerate(page["ids"]):
+        record: Dict[str, Any] = {"id": record_id}
+        if page["documents"][index] is not None:
+            record["document"] = page["documents"][index]
+        if page["metadatas"][index]:
+            record["metadata"] = page["metadatas"][index]
+        if embeddings is not None:
+            # float32 -> float -> float32 round-trips exactly, so restores skip re-embedding.
+            record["embedding"] = embeddings[index].tolist()
+        lines.append(json.dumps(record, separators=(",", ":")))
+    return ("\n".join(lines) + "\n").encode("utf-8") if lines else b""
+
+
+@app.get("/collections/{collection_name}/export")
+async def export_collection(
+    collection_name: str,
+    embeddings: bool = Query(False),
+    page_size: int = Query(DEFAULT_EXPORT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    """Stream a collection as NDJSON, one page of ``collection.get`` at a time.
+
+    Only one page is held in memory. Writes made while the export runs may
+    shift later pages; quiesce writers for a consistent dump.
+    """
+    collection = await _get_collection_or_404(collection_name)
+    include = ["documents", "metadatas"] + (["embeddings"] if embeddings else [])
+
+    async def fetch(offset: int) -> Dict[str, Any]:
+        return await run_read(collection.get, limit=page_size, offset=offset, include=include)
+
+    try:
+        first = await fetch(0)
+    except NotFoundError as exc:
+        collection_cache.invalidate(collection_name)
+        raise HTTPException(status_code=404, detail=str(exc))
+
+    async def stream() -> AsyncIterator[bytes]:
+        page, offset = first, 0
+        while True:
+            yield _export_lines(page)
+            if len(page["ids"]) < page_size:
+                return
+            offset += page_size
+            try:
+                page = await fetch(offset)
+            except Exception:
+                # Headers are already sent; a truncated body is the only signal left.
+                logger.exception("Export of collection '%s' failed at offset %d", collection_name, offset)
+                return
+
+    return StreamingResponse(
+        stream(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{collection_name}.ndjson"'},
+    )
+
 @app.get("/collections/{collection_name}")
 async def get_collection_info(collection_name: str):
     """Get information about a collection"""
-    collection = _get_collection_or_404(collection_name)
+    collection = await _get_collection_or_404(collection_name)
 
     try:
-        count = collection.count()
+        count = await run_read(collection.count)
         return {
             "name": collection_name,
             "count": count,
@@ -162,6 +1289,9 @@ async def get_collection_info(collection_name: str):
         }
     except HTTPException:
         raise
+    except NotFoundError as exc:
+        collection_cache.invalidate(collection_name)
+        raise HTTPException(status_code=404, detail=str(exc))
     except Exception as exc:
         logger.exception(
             "Unexpected error retrieving info for collection '%s'", collection_name,
@@ -172,10 +1302,83 @@ async def get_collection_info(collection_name: str):
 async def list_collections():
     """List all collections"""
     try:
-        collections = client.list_collections()
+        owner = client
+        collections = await run_read(owner.list_collections)
+        for collection in collections:
+            collection_cache.remember(owner, collection)
         return [{"name": c.name, "id": c.id} for c in collections]
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@app.get("/ready")
+async def readiness():
+    """Readiness probe: 503 until the startup warm-up has finished"""
+    return JSONResponse(status_code=200 if warmup.ready else 503, content=warmup.stats())
+
+
+@app.get("/stats")
+async def get_stats():
+    """Cache and executor statistics"""
+    return {
+        "queryCache": query_cache.stats(),
+        "collectionCache": collection_cache.stats(),
+        "embeddingCache": embedding_cache.stats(),
+        "queryBatcher": query_batcher.stats(),
+        "executors": {"read": read_executor.stats(), "write": write_executor.stats()},
+    }
+
+
+class CollectionUpdate(BaseModel):
+    name: Optional[str] = None
+    metadata: Optional[Dict[str, Any]] = None
+
+
+@app.patch("/collections/{collection_name}")
+async def update_collection(collection_name: str, update: CollectionUpdate):
+    """Rename a collection and/or replace its metadata"""
+    collection = await _get_collection_or_404(collection_name)
+
+    try:
+        await run_write(collection.modify, name=update.name, metadata=update.metadata)
+    except HTTPException:
+        raise
+    except NotFoundError as exc:
+        collection_cache.invalidate(collection_name)
+        raise HTTPException(status_code=404, detail=str(exc))
+    except InternalError as exc:
+        message = str(exc)
+        if "already exists" in message.lower() or "unique constraint" in message.lower():
+            raise HTTPException(status_code=409, detail=f"Collection [{update.name}] already exists")
+        logger.exception("Failed to update collection '%s'", collection_name)
+        raise HTTPException(status_code=500, detail="Internal server error") from exc
+    finally:
+        collection_cache.invalidate(collection_name)
+        bump_generation(collection_name)
+        if update.name:
+            collection_cache.invalidate(update.name)
+            bump_generation(update.name)
+    return {"name": update.name or collection_name, "metadata": collection.metadata}
+
+
+@app.delete("/collections/{collection_name}")
+async def delete_collection(collection_name: str):
+    """Delete a collection"""
+    try:
+        await run_write(client.delete_collection, name=collection_name)
+    except HTTPException:
+        raise
+    except (NotFoundError, ValueError) as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+    except Exception as exc:
+        logger.exception("Unexpected error deleting collection '%s'", collection_name)
+        raise HTTPException(status_code=500, detail="Internal server error") from exc
+    finally:
+        collection_cache.invalidate(collection_name)
+        bump_generation(collection_name)
+    return {"message": f"Collection '{collection_name}' deleted successfully"}
+
+
 if __name__ == "__main__":
     uvicorn.run(app, host="127.0.0.1", port=8000)
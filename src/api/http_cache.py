@@ -0,0 +1,96 @@
+"""HTTP validators, ``Cache-Control`` and pre-compressed bodies for read-mostly routes."""
+from __future__ import annotations
+
+import gzip
+import hashlib
+from functools import cached_property
+from threading import Lock
+from typing import Any, Callable, Tuple
+
+from flask import Response, current_app, jsonify, request
+
+DEFAULT_MAX_AGE = 60
+# Bodies smaller than this are not worth a gzip round trip.
+MIN_GZIP_BYTES = 1024
+
+
+class PreparedBody:
+    """A JSON body serialized once, with its content-hash ETag and a lazily built gzip variant."""
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self.etag = hashlib.sha256(data).hexdigest()[:32]
+
+    @cached_property
+    def gzipped(self) -> bytes:
+        return gzip.compress(self.data, compresslevel=9, mtime=0)
+
+
+def prepare_json(payload: Any) -> PreparedBody:
+    return PreparedBody(f"{current_app.json.dumps(payload)}\n".encode("utf-8"))
+
+
+class VersionedBody:
+    """Memoizes the :class:`PreparedBody` of whatever object currently represents a version.
+
+    ``get`` re-serializes only when handed a different ``version`` object, so
+    encoding, hashing and compression happen once per knowledge-base version.
+    """
+
+    def __init__(self) -> None:
+        self._current: Tuple[object, PreparedBody] | None = None
+        self._lock = Lock()
+
+    def get(self, version: object, payload: Callable[[], Any]) -> PreparedBody:
+        current = self._current
+        if current is not None and current[0] is version:
+            return current[1]
+        with self._lock:
+            current = self._current
+            if current is None or current[0] is not version:
+                current = (version, prepare_json(payload()))
+                self._current = current
+        return current[1]
+
+
+def _accepts_gzip() -> bool:
+    return request.accept_encodings["gzip"] > 0
+
+
+def _with_validators(response: Response, etag: str, max_age: int) -> Response:
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+def _not_modified(etag: str, max_age: int) -> Response | None:
+    if request.if_none_match.contains_weak(etag):
+        return _with_validators(Response(status=304), etag, max_age)
+    return None
+
+
+def send_prepared(body: PreparedBody, *, max_age: int = DEFAULT_MAX_AGE) -> Response:
+    """Serve ``body`` with an ETag, answering ``If-None-Match`` with 304 and gzip when accepted."""
+    use_gzip = len(body.data) >= MIN_GZIP_BYTES and _accepts_gzip()
+    etag = f"{body.etag}-gzip" if use_gzip else body.etag
+    not_modified = _not_modified(etag, max_age)
+    if not_modified is not None:
+        return not_modified
+    response = Response(body.gzipped if use_gzip else body.data, status=200, mimetype="application/json")
+    if use_gzip:
+        response.content_encoding = "gzip"
+    return _with_validators(response, etag, max_age)
+
+
+def conditional_json(version: str, build: Callable[[], Any], *, max_age: int = DEFAULT_MAX_AGE) -> Response:
+    """Serve a deterministic JSON response whose ETag is derived from ``version`` and the request URL.
+
+    A matching ``If-None-Match`` is answered with 304 before ``build`` runs.
+    """
+    etag = hashlib.sha256(f"{version}\0{request.full_path}".encode("utf-8")).hexdigest()[:32]
+    not_modified = _not_modified(etag, max_age)
+    if not_modified is not None:
+        return not_modified
+    return _with_validators(jsonify(build()), etag, max_age)
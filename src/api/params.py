@@ -0,0 +1,41 @@
+"""Helpers for parsing and validating query string parameters."""
+from __future__ import annotations
+
+from flask import request
+
+from .errors import ValidationError
+
+
+def int_arg(name: str, default: int, *, minimum: int = 0, maximum: int | None = None) -> int:
+    """Read an integer query parameter, raising ``ValidationError`` when invalid."""
+    raw = request.args.get(name)
+    if raw is None or raw.strip() == "":
+        return default
+    try:
+        value = int(raw)
+    except ValueError as exc:
+        raise ValidationError(f"Query parameter '{name}' must be an integer.") from exc
+    if value < minimum or (maximum is not None and value > maximum):
+        bounds = f"between {minimum} and {maximum}" if maximum is not None else f"at least {minimum}"
+        raise ValidationError(f"Query parameter '{name}' must be {bounds}.")
+    return value
+
+
+def float_arg(name: str, default: float, *, minimum: float, maximum: float) -> float:
+    """Read a float query parameter constrained to ``[minimum, maximum]``."""
+    raw = request.args.get(name)
+    if raw is None or raw.strip() == "":
+        return default
+    try:
+        value = float(raw)
+    except ValueError as exc:
+        raise ValidationError(f"Query parameter '{name}' must be a number.") from exc
+    if not minimum <= value <= maximum:
+        raise ValidationError(f"Query parameter '{name}' must be between {minimum} and {maximum}.")
+    return value
+
+
+def str_arg(name: str) -> str | None:
+    """Return a stripped query parameter or ``None`` when it is missing or blank."""
+    value = request.args.get(name, "").strip()
+    return value or None
@@ -1,27 +1,129 @@
 """Knowledge base API endpoints."""
 from __future__ import annotations
 
-from flask import Blueprint, jsonify, request
+from typing import List
+
+from flask import Blueprint, Response, request
 
 from ...knowledge_service import KnowledgeService
+from ...semantic_service import SEARCH_MODES, SemanticSearchService
+from ...services.knowledge import KnowledgeService as NotesService
 from ..errors import ValidationError
+from ..http_cache import DEFAULT_MAX_AGE, VersionedBody, conditional_json, send_prepared
+from ..params import float_arg, int_arg, str_arg
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+DEFAULT_SUGGESTIONS = 10
+DEFAULT_CONTEXT_BUDGET = 4000
+MAX_CONTEXT_BUDGET = 200_000
+CONTEXT_UNITS = ("chars", "tokens")
+
+
+def _category_args() -> List[str]:
+    categories: List[str] = []
+    for raw in request.args.getlist("category"):
+        categories.extend(part.strip() for part in raw.split(",") if part.strip())
+    return categories
+
 
+def create_knowledge_blueprint(
+    service: KnowledgeService,
+    notes: NotesService | None = None,
+    semantic: SemanticSearchService | None = None,
+    *,
+    max_age: int = DEFAULT_MAX_AGE,
+) -> Blueprint:
+    """Knowledge routes are served with ETags derived from the knowledge-base version.
+
+    The full payload is encoded and gzip-compressed once per version; query
+    routes answer ``If-None-Match`` with 304 before doing any work.
+    """
 
-def create_knowledge_blueprint(service: KnowledgeService) -> Blueprint:
     bp = Blueprint("knowledge", __name__, url_prefix="/api/knowledge")
+    knowledge_body = VersionedBody()
+    notes_body = VersionedBody()
+
+    def knowledge_version() -> str:
+        snapshot = service.snapshot()
+        return knowledge_body.get(snapshot, lambda: snapshot.payload).etag
+
+    def notes_version() -> str:
+        if notes is None:
+            return ""
+        payload = notes.load()
+        return notes_body.get(payload, lambda: payload).etag
 
     @bp.get("/")
-    def get_knowledge() -> tuple:
-        payload = service.all()
-        return jsonify(payload), 200
+    def get_knowledge() -> Response:
+        snapshot = service.snapshot()
+        return send_prepared(knowledge_body.get(snapshot, lambda: snapshot.payload), max_age=max_age)
 
     @bp.get("/search")
-    def search_knowledge() -> tuple:
+    def search_knowledge() -> Response:
         query = request.args.get("q", "").strip()
         if not query:
             raise ValidationError("Query parameter 'q' is required.")
-        results = service.search(query)
-        return jsonify(results), 200
+        limit = int_arg("limit", DEFAULT_LIMIT, minimum=1, maximum=MAX_LIMIT)
+        offset = int_arg("offset", 0)
+        categories = _category_args()
+        return conditional_json(
+            knowledge_version(),
+            lambda: service.search(query, limit=limit, offset=offset, categories=categories),
+            max_age=max_age,
+        )
 
-    return bp
+    @bp.get("/suggest")
+    def suggest() -> Response:
+        query = str_arg("q")
+        if not query:
+            raise ValidationError("Query parameter 'q' is required.")
+        limit = int_arg("limit", DEFAULT_SUGGESTIONS, minimum=1, maximum=MAX_LIMIT)
+
+        def build() -> dict:
+            candidates = service.suggest(query, limit=limit)
+            if notes is not None:
+                candidates.extend(notes.suggest(query, limit=limit))
+            candidates.sort(key=lambda item: item["score"], reverse=True)
+            suggestions, seen = [], set()
+            for candidate in candidates:
+                text = candidate["text"].casefold()
+                if text not in seen:
+                    seen.add(text)
+                    suggestions.append(candidate)
+            return {"query": query, "suggestions": suggestions[:limit]}
+
+        return conditional_json(f"{knowledge_version()}:{notes_version()}", build, max_age=max_age)
+
+    if notes is not None:
 
+        @bp.get("/context")
+        def get_context() -> Response:
+            query = str_arg("q")
+            if not query:
+                raise ValidationError("Query parameter 'q' is required.")
+            unit = str_arg("unit") or "chars"
+            if unit not in CONTEXT_UNITS:
+                raise ValidationError("Query parameter 'unit' must be 'chars' or 'tokens'.")
+            budget = int_arg("budget", DEFAULT_CONTEXT_BUDGET, minimum=1, maximum=MAX_CONTEXT_BUDGET)
+            return conditional_json(notes_version(), lambda: notes.context(query, budget=budget, unit=unit), max_age=max_age)
+
+    if semantic is not None:
+
+        @bp.get("/semantic")
+        def semantic_search() -> Response:
+            query = str_arg("q")
+            if not query:
+                raise ValidationError("Query parameter 'q' is required.")
+            mode = str_arg("mode") or "semantic"
+            if mode not in SEARCH_MODES:
+                raise ValidationError("Query parameter 'mode' must be 'semantic' or 'hybrid'.")
+            k = int_arg("k", 10, minimum=1, maximum=MAX_LIMIT)
+            alpha = float_arg("alpha", 0.5, minimum=0.0, maximum=1.0)
+            return conditional_json(
+                f"{knowledge_version()}:{notes_version()}",
+                lambda: semantic.search(query, k=k, mode=mode, alpha=alpha),
+                max_age=max_age,
+            )
+
+    return bp
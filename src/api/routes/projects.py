@@ -5,6 +5,7 @@ from flask import Blueprint, jsonify, request
 
 from ...project_service import ProjectService
 from ..errors import ValidationError
+from ..streaming import stream_json_array
 
 
 def _json_body() -> dict:
@@ -20,9 +21,8 @@ def create_projects_blueprint(service: ProjectService) -> Blueprint:
     bp = Blueprint("projects", __name__, url_prefix="/api/projects")
 
     @bp.get("/")
-    def list_projects() -> tuple:
-        projects = service.list_projects()
-        return jsonify({"projects": projects}), 200
+    def list_projects():
+        return stream_json_array(service.iter_projects(), key="projects")
 
     @bp.post("/")
     def create_project() -> tuple:
@@ -47,9 +47,8 @@ def create_projects_blueprint(service: ProjectService) -> Blueprint:
         return ("", 204)
 
     @bp.get("/<project_id>/assets")
-    def list_assets(project_id: str) -> tuple:
-        assets = service.list_assets(project_id)
-        return jsonify({"assets": assets}), 200
+    def list_assets(project_id: str):
+        return stream_json_array(service.iter_assets(project_id), key="assets")
 
     @bp.post("/<project_id>/assets")
     def create_asset(project_id: str) -> tuple:
@@ -0,0 +1,43 @@
+"""Full-text search endpoints."""
+from __future__ import annotations
+
+from flask import Blueprint, jsonify
+
+from ...project_service import ProjectService
+from ..errors import ValidationError
+from ..params import int_arg, str_arg
+
+DEFAULT_LIMIT = 20
+DEFAULT_SUGGESTIONS = 10
+MAX_LIMIT = 100
+
+
+def create_search_blueprint(service: ProjectService) -> Blueprint:
+    bp = Blueprint("search", __name__, url_prefix="/api/search")
+
+    @bp.get("")
+    def search_assets() -> tuple:
+        query = str_arg("q")
+        if not query:
+            raise ValidationError("Query parameter 'q' is required.")
+        results = service.search_assets(
+            query,
+            project_id=str_arg("project"),
+            asset_type=str_arg("type"),
+            limit=int_arg("limit", DEFAULT_LIMIT, minimum=1, maximum=MAX_LIMIT),
+        )
+        return jsonify(results), 200
+
+    @bp.get("/suggest")
+    def suggest_asset_names() -> tuple:
+        query = str_arg("q")
+        if not query:
+            raise ValidationError("Query parameter 'q' is required.")
+        results = service.suggest_asset_names(
+            query,
+            project_id=str_arg("project"),
+            limit=int_arg("limit", DEFAULT_SUGGESTIONS, minimum=1, maximum=MAX_LIMIT),
+        )
+        return jsonify(results), 200
+
+    return bp
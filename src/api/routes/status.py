@@ -4,19 +4,29 @@ from __future__ import annotations
 from datetime import datetime
 from flask import Blueprint, jsonify
 
+from ...asset_indexer import AssetIndexer
+from ...knowledge_service import KnowledgeService
 
-def _status_payload(status: str) -> dict:
-    return {
-        "status": status,
-        "timestamp": datetime.utcnow().isoformat() + "Z",
-    }
 
-
-def create_status_blueprint() -> Blueprint:
+def create_status_blueprint(
+    knowledge_service: KnowledgeService | None = None,
+    asset_indexer: AssetIndexer | None = None,
+) -> Blueprint:
     """Expose health routes for both legacy and namespaced clients."""
 
     bp = Blueprint("status", __name__)
 
+    def _status_payload(status: str) -> dict:
+        payload = {
+            "status": status,
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+        }
+        if knowledge_service is not None:
+            payload["knowledge"] = {**knowledge_service.reload_status(), "searchCache": knowledge_service.cache_stats()}
+        if asset_indexer is not None:
+            payload["assetIndex"] = asset_indexer.stats()
+        return payload
+
     @bp.get("/status")
     def status_root() -> tuple:
         return jsonify({"status": "running"}), 200
@@ -0,0 +1,45 @@
+"""Helpers for streaming large JSON list payloads."""
+from __future__ import annotations
+
+from typing import Any, Iterable, Iterator
+
+from flask import Response, current_app, stream_with_context
+
+DEFAULT_CHUNK_SIZE = 32
+
+
+def iter_json_array(items: Iterable[Any], *, key: str | None = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """Yield a JSON array (optionally wrapped in ``{key: [...]}``) piece by piece.
+
+    Items are serialized one at a time with the application's JSON provider so the
+    output matches ``jsonify``; encoded items are flushed every ``chunk_size`` items.
+    """
+
+    dumps = current_app.json.dumps
+    prefix = f"{dumps(key)}:[" if key is not None else "["
+    yield "{" + prefix if key is not None else prefix
+
+    buffer: list[str] = []
+    first = True
+    for item in items:
+        encoded = dumps(item)
+        buffer.append(encoded if first else "," + encoded)
+        first = False
+        if len(buffer) >= chunk_size:
+            yield "".join(buffer)
+            buffer.clear()
+    if buffer:
+        yield "".join(buffer)
+
+    yield "]}" if key is not None else "]"
+
+
+def stream_json_array(items: Iterable[Any], *, key: str | None = None, status: int = 200, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Response:
+    """Return a streamed ``application/json`` response for ``items``.
+
+    Any lookups that may fail (missing resources, validation) must happen before
+    calling this helper; once streaming starts the status code is already sent.
+    """
+
+    body = stream_with_context(iter_json_array(items, key=key, chunk_size=chunk_size))
+    return Response(body, status=status, mimetype="application/json")
@@ -0,0 +1,242 @@
+"""Background sync of project assets into a Chroma collection for retrieval."""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+from .chroma_sync import HASH_KEY, content_hash, stored_hashes
+from .models import Asset
+from .project_service import AssetMutation
+
+logger = logging.getLogger("flask-api-service")
+
+DEFAULT_COLLECTION = "workspace-assets"
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_FLUSH_INTERVAL = 0.5
+
+Embed = Callable[[List[str]], Sequence[Sequence[float]]]
+
+
+def document_id(project_id: str, asset_id: str) -> str:
+    # Asset ids are only unique within a project.
+    return f"{project_id}:{asset_id}"
+
+
+def asset_document(asset: Asset) -> str:
+    """Text embedded for ``asset``: summary, content and tags."""
+    parts = [asset.summary or "", asset.content, " ".join(asset.tags)]
+    return "\n\n".join(part.strip() for part in parts if part and part.strip())
+
+
+@dataclass(frozen=True)
+class _Pending:
+    document: str | None
+    metadata: Dict[str, Any] | None
+
+    @property
+    def deleted(self) -> bool:
+        return self.document is None
+
+
+def _render(project_id: str, asset: Asset | None) -> _Pending:
+    document = asset_document(asset) if asset is not None else ""
+    if asset is None or not document:
+        # Nothing to retrieve: keep it out of the collection.
+        return _Pending(None, None)
+    metadata = {"id": asset.id, "projectId": project_id, "name": asset.name, "type": asset.type}
+    return _Pending(document, {**metadata, HASH_KEY: content_hash(document, metadata)})
+
+
+class AssetIndexer:
+    """Mirrors :class:`ProjectService` asset mutations into one Chroma collection.
+
+    :meth:`handle` is subscribed to the service and only records the latest
+    state of each asset, so API writes never wait on Chroma. A daemon thread
+    drains the pending assets every ``flush_interval`` seconds (or once
+    ``batch_size`` are waiting), skips those whose content hash is unchanged,
+    and upserts/deletes the rest in batches. Failed batches are retried on the
+    next pass. :meth:`catch_up` reconciles the collection with the store after
+    a restart, when mutations may have been missed.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        collection_name: str = DEFAULT_COLLECTION,
+        *,
+        embed: Embed | None = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+    ) -> None:
+        self._client = client
+        self.collection_name = collection_name
+        self._embed = embed
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._collection: Any = None
+        self._pending: Dict[str, _Pending] = {}
+        self._hashes: Dict[str, str] = {}
+        # Until a catch-up has read the collection, unknown ids may still be stored there.
+        self._synced = False
+        self._lock = threading.Lock()
+        self._process_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._catch_up_source: Callable[[], Iterable[Tuple[str, Asset]]] | None = None
+        self.upserted = 0
+        self.deleted = 0
+        self.skipped = 0
+        self.failures = 0
+        self.last_batch_ms: float | None = None
+
+    def collection(self) -> Any:
+        if self._collection is None:
+            self._collection = self._client.get_or_create_collection(self.collection_name)
+        return self._collection
+
+    # ------------------------------------------------------------------
+    # Producer side
+    def handle(self, mutations: List[AssetMutation]) -> None:
+        """:class:`ProjectService` listener: record the latest state of each mutated asset."""
+        rendered = {
+            document_id(mutation.project_id, mutation.asset_id): _render(
+                mutation.project_id, mutation.asset if mutation.kind == "upsert" else None
+            )
+            for mutation in mutations
+        }
+        with self._lock:
+            self._pending.update(rendered)
+            size = len(self._pending)
+        if size >= self.batch_size:
+            self._wake.set()
+
+    # ------------------------------------------------------------------
+    # Background thread
+    def start(self, catch_up: Callable[[], Iterable[Tuple[str, Asset]]] | None = None) -> None:
+        """Start the worker; ``catch_up`` (e.g. ``service.asset_items``) is reconciled first."""
+        if self._thread is not None:
+            return
+        self._catch_up_source = catch_up
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="asset-indexer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = 5.0) -> None:
+        """Flush what is pending and stop the worker."""
+        thread = self._thread
+        if thread is None:
+            return
+        self._stop.set()
+        self._wake.set()
+        thread.join(timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        if self._catch_up_source is not None:
+            try:
+                self.catch_up(self._catch_up_source)
+            except Exception:
+                logger.exception("Asset index catch-up failed")
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+        self.flush()
+
+    # ------------------------------------------------------------------
+    # Consumer side
+    def flush(self) -> int:
+        """Write every pending asset now; returns the number of Chroma writes made."""
+        with self._process_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            items = [(doc_id, item) for doc_id, item in pending.items() if self._is_change(doc_id, item)]
+            self.skipped += len(pending) - len(items)
+            for start in range(0, len(items), self.batch_size):
+                batch = items[start : start + self.batch_size]
+                try:
+                    self._write(batch)
+                except Exception:
+                    self.failures += 1
+                    logger.exception("Failed to index %d assets into '%s'", len(batch), self.collection_name)
+                    self._requeue(batch)
+            return len(items)
+
+    def _is_change(self, doc_id: str, item: _Pending) -> bool:
+        known = self._hashes.get(doc_id)
+        if item.deleted:
+            return known is not None or not self._synced
+        return known != item.metadata[HASH_KEY]
+
+    def _write(self, batch: List[Tuple[str, _Pending]]) -> None:
+        began = time.perf_counter()
+        collection = self.collection()
+        upserts = [(doc_id, item) for doc_id, item in batch if not item.deleted]
+        deletes = [doc_id for doc_id, item in batch if item.deleted]
+        if upserts:
+            documents = [item.document for _, item in upserts]
+            params: Dict[str, Any] = {
+                "ids": [doc_id for doc_id, _ in upserts],
+                "documents": documents,
+                "metadatas": [item.metadata for _, item in upserts],
+            }
+            if self._embed is not None:
+                params["embeddings"] = [list(vector) for vector in self._embed(documents)]
+            collection.upsert(**params)
+            for doc_id, item in upserts:
+                self._hashes[doc_id] = item.metadata[HASH_KEY]
+            self.upserted += len(upserts)
+        if deletes:
+            collection.delete(ids=deletes)
+            for doc_id in deletes:
+                self._hashes.pop(doc_id, None)
+            self.deleted += len(deletes)
+        self.last_batch_ms = round((time.perf_counter() - began) * 1000, 3)
+
+    def _requeue(self, batch: List[Tuple[str, _Pending]]) -> None:
+        with self._lock:
+            for doc_id, item in batch:
+                # A newer mutation recorded meanwhile wins over the failed one.
+                self._pending.setdefault(doc_id, item)
+
+    def catch_up(self, source: Callable[[], Iterable[Tuple[str, Asset]]]) -> int:
+        """Reconcile the collection with the store listed by ``source``; returns the writes made.
+
+        Stored content hashes are read back from the collection, so only assets
+        that changed while the indexer was not running are re-embedded.
+        """
+        with self._process_lock:
+            with self._lock:
+                # Everything pending is older than the snapshot taken below.
+                self._pending.clear()
+            stored = stored_hashes(self.collection())
+            current = {document_id(project_id, asset.id): _render(project_id, asset) for project_id, asset in source()}
+            self._hashes = stored
+            self._synced = True
+            with self._lock:
+                for doc_id, item in current.items():
+                    self._pending.setdefault(doc_id, item)
+                for doc_id in stored.keys() - current.keys():
+                    self._pending.setdefault(doc_id, _Pending(None, None))
+        written = self.flush()
+        logger.info("Asset index caught up: %d of %d assets rewritten", written, len(current))
+        return written
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "collection": self.collection_name,
+            "running": self._thread is not None and self._thread.is_alive(),
+            "pending": pending,
+            "indexed": len(self._hashes),
+            "upserted": self.upserted,
+            "deleted": self.deleted,
+            "skipped": self.skipped,
+            "failures": self.failures,
+            "lastBatchMs": self.last_batch_ms,
+        }
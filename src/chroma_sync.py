@@ -0,0 +1,82 @@
+"""Helpers for keeping a Chroma collection in step with a local source by content hash."""
+from __future__ import annotations
+
+import hashlib
+import time
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+# Metadata key under which every synced record stores the hash of what was embedded.
+HASH_KEY = "contentHash"
+
+
+def content_hash(document: str, metadata: Dict[str, Any]) -> str:
+    """SHA-256 over ``document`` and ``metadata`` (key order does not matter)."""
+    digest = hashlib.sha256(document.encode("utf-8"))
+    for key in sorted(metadata):
+        digest.update(f"\0{key}={metadata[key]}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def stored_hashes(collection: Any, *, page_size: int = 1000) -> Dict[str, str]:
+    """Return ``{id: content hash}`` for every record in ``collection`` without loading documents.
+
+    Records written without a hash map to ``""`` so they always count as changed.
+    """
+    hashes: Dict[str, str] = {}
+    offset = 0
+    while True:
+        page = collection.get(limit=page_size, offset=offset, include=["metadatas"])
+        for record_id, metadata in zip(page["ids"], page["metadatas"]):
+            hashes[record_id] = (metadata or {}).get(HASH_KEY, "")
+        if len(page["ids"]) < page_size:
+            return hashes
+        offset += page_size
+
+
+def sync_records(
+    collection: Any,
+    records: Dict[str, Tuple[str, Dict[str, Any]]],
+    *,
+    embed: Callable[[List[str]], Sequence[Sequence[float]]] | None = None,
+    batch_size: int = 256,
+    dry_run: bool = False,
+) -> Dict[str, Any]:
+    """Make ``collection`` hold exactly ``records`` (``{id: (document, metadata)}``).
+
+    Only records whose content hash differs from the stored one are upserted
+    (and therefore embedded); ids no longer present are deleted. An unchanged
+    source costs one metadata scan and no embedding work.
+    """
+    started = time.perf_counter()
+    stored = stored_hashes(collection)
+    changed: List[Tuple[str, str, Dict[str, Any]]] = []
+    for record_id, (document, metadata) in records.items():
+        digest = content_hash(document, metadata)
+        if stored.get(record_id) != digest:
+            changed.append((record_id, document, {**metadata, HASH_KEY: digest}))
+    removed = sorted(stored.keys() - records.keys())
+
+    if not dry_run:
+        for start in range(0, len(changed), batch_size):
+            batch = changed[start : start + batch_size]
+            params: Dict[str, Any] = {
+                "ids": [record_id for record_id, _, _ in batch],
+                "documents": [document for _, document, _ in batch],
+                "metadatas": [metadata for _, _, metadata in batch],
+            }
+            if embed is not None:
+                params["embeddings"] = [list(vector) for vector in embed(params["documents"])]
+            collection.upsert(**params)
+        for start in range(0, len(removed), batch_size):
+            collection.delete(ids=removed[start : start + batch_size])
+
+    return {
+        "collection": collection.name,
+        "total": len(records),
+        "added": sum(1 for record_id, _, _ in changed if record_id not in stored),
+        "updated": sum(1 for record_id, _, _ in changed if record_id in stored),
+        "deleted": len(removed),
+        "unchanged": len(records) - len(changed),
+        "dryRun": dry_run,
+        "durationMs": round((time.perf_counter() - started) * 1000, 3),
+    }
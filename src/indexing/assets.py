@@ -0,0 +1,98 @@
+"""Full-text index over project assets."""
+from __future__ import annotations
+
+from threading import RLock
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from ..models import Asset, Project
+from .inverted import InvertedIndex
+from .trigram import TrigramIndex
+
+AssetKey = Tuple[str, str]
+
+
+def asset_fields(asset: Asset) -> Tuple[str, str, str, str]:
+    """Return the searchable text of ``asset`` (name, summary, tags, content)."""
+    return (asset.name, asset.summary or "", " ".join(asset.tags), asset.content)
+
+
+class AssetSearchIndex:
+    """Keeps an :class:`InvertedIndex` of asset text keyed by ``(project_id, asset_id)``."""
+
+    def __init__(self) -> None:
+        self._index = InvertedIndex()
+        self._names = TrigramIndex()
+        self._types: Dict[AssetKey, str] = {}
+        self._by_project: Dict[str, Set[str]] = {}
+        self._lock = RLock()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def rebuild(self, projects: Iterable[Project]) -> None:
+        with self._lock:
+            self._index.clear()
+            self._names.clear()
+            self._types.clear()
+            self._by_project.clear()
+            for project in projects:
+                self.index_project(project)
+
+    def index_project(self, project: Project) -> None:
+        """(Re)index every asset of ``project``, dropping assets it no longer has."""
+        with self._lock:
+            self.remove_project(project.id)
+            for asset in project.assets:
+                self.index_asset(project.id, asset)
+
+    def index_asset(self, project_id: str, asset: Asset) -> None:
+        key = (project_id, asset.id)
+        with self._lock:
+            self._index.add(key, asset_fields(asset))
+            self._names.add(key, asset.name)
+            self._types[key] = asset.type
+            self._by_project.setdefault(project_id, set()).add(asset.id)
+
+    def remove_asset(self, project_id: str, asset_id: str) -> None:
+        key = (project_id, asset_id)
+        with self._lock:
+            self._index.remove(key)
+            self._names.remove(key)
+            self._types.pop(key, None)
+            asset_ids = self._by_project.get(project_id)
+            if asset_ids is not None:
+                asset_ids.discard(asset_id)
+                if not asset_ids:
+                    del self._by_project[project_id]
+
+    def remove_project(self, project_id: str) -> None:
+        with self._lock:
+            for asset_id in list(self._by_project.get(project_id, ())):
+                self.remove_asset(project_id, asset_id)
+
+    def search(
+        self,
+        query: str,
+        *,
+        project_id: Optional[str] = None,
+        asset_type: Optional[str] = None,
+        limit: int = 20,
+    ) -> List[Tuple[str, str, float]]:
+        """Return ``(project_id, asset_id, score)`` tuples ranked by relevance."""
+
+        def accept(key: AssetKey) -> bool:
+            if project_id is not None and key[0] != project_id:
+                return False
+            if asset_type is not None and self._types.get(key) != asset_type:
+                return False
+            return True
+
+        with self._lock:
+            hits = self._index.search(query, limit=limit, accept=accept)
+        return [(hit.doc_id[0], hit.doc_id[1], hit.score) for hit in hits]
+
+    def suggest_names(self, query: str, *, project_id: Optional[str] = None, limit: int = 10) -> List[Tuple[str, str, str, float]]:
+        """Return ``(project_id, asset_id, name, score)`` for asset names similar to ``query``."""
+        accept = (lambda key: key[0] == project_id) if project_id is not None else None
+        matches = self._names.suggest(query, limit=limit, accept=accept)
+        return [(match.key[0], match.key[1], match.text, match.score) for match in matches]
@@ -0,0 +1,382 @@
+"""Incrementally maintained inverted index with BM25 ranking."""
+from __future__ import annotations
+
+import heapq
+import math
+from bisect import bisect_left
+from dataclasses import dataclass
+from threading import RLock
+from typing import Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .text import Analyzer, ParsedQuery, parse_query, tokenize
+
+# Positions inserted between fields so phrases never match across field boundaries.
+_FIELD_GAP = 16
+_MAX_PREFIX_EXPANSIONS = 64
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    """A ranked match returned by :class:`InvertedIndex.search`."""
+
+    doc_id: Hashable
+    score: float
+
+
+def top_hits(scores: Dict[Hashable, float], limit: Optional[int] = None) -> List[SearchHit]:
+    """Order ``scores`` best first, keeping only ``limit`` hits when given."""
+    items = scores.items()
+    if limit is not None:
+        ranked = heapq.nlargest(limit, items, key=lambda item: item[1])
+    else:
+        ranked = sorted(items, key=lambda item: item[1], reverse=True)
+    return [SearchHit(doc_id=doc_id, score=round(score, 6)) for doc_id, score in ranked]
+
+
+class InvertedIndex:
+    """Positional inverted index supporting term, phrase and prefix queries.
+
+    Documents can be added, replaced and removed at any time; the index keeps
+    per-term postings with token positions plus the document lengths needed for
+    BM25 scoring, so no rebuild is required after a mutation. Adjacent term
+    pairs are indexed too, so phrase candidates come from set intersections
+    rather than position scans. :meth:`top` answers bounded queries from
+    per-term postings ordered by score contribution and stops as soon as no
+    unseen document can enter the top ``limit``.
+    """
+
+    def __init__(self, *, analyzer: Analyzer = tokenize, k1: float = 1.2, b: float = 0.75) -> None:
+        self.analyzer = analyzer
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[Hashable, List[int]]] = {}
+        self._pairs: Dict[Tuple[str, str], Set[Hashable]] = {}
+        self._doc_terms: Dict[Hashable, tuple[str, ...]] = {}
+        self._doc_pairs: Dict[Hashable, tuple[Tuple[str, str], ...]] = {}
+        self._doc_lengths: Dict[Hashable, int] = {}
+        # Insertion sequence, used to break score ties in the order documents were added.
+        self._doc_seq: Dict[Hashable, int] = {}
+        self._next_seq = 0
+        self._total_length = 0
+        self._sorted_terms: List[str] | None = None
+        self._norms: Dict[Hashable, float] | None = None
+        self._impacts: Dict[str, List[Tuple[float, int, Hashable]]] = {}
+        self._lock = RLock()
+
+    def __getstate__(self) -> Dict[str, object]:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        # Impact lists are a query-time cache and are rebuilt on demand.
+        state["_impacts"] = {}
+        return state
+
+    def __setstate__(self, state: Dict[str, object]) -> None:
+        self.__dict__.update(state)
+        self._lock = RLock()
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+    def __contains__(self, doc_id: Hashable) -> bool:
+        return doc_id in self._doc_lengths
+
+    # ------------------------------------------------------------------
+    # Mutation
+    def add(self, doc_id: Hashable, fields: str | Iterable[str | None]) -> None:
+        """Index ``fields`` under ``doc_id``, replacing any previous version."""
+        if isinstance(fields, str):
+            fields = (fields,)
+
+        positions: Dict[str, List[int]] = {}
+        pairs: Dict[Tuple[str, str], None] = {}
+        position = 0
+        length = 0
+        for text in fields:
+            tokens = self.analyzer(text or "")
+            for token in tokens:
+                positions.setdefault(token, []).append(position)
+                position += 1
+            pairs.update(dict.fromkeys(zip(tokens, tokens[1:])))
+            length += len(tokens)
+            position += _FIELD_GAP
+
+        with self._lock:
+            self._remove_locked(doc_id)
+            for term, term_positions in positions.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = {}
+                    self._sorted_terms = None
+                postings[doc_id] = term_positions
+            for pair in pairs:
+                self._pairs.setdefault(pair, set()).add(doc_id)
+            self._doc_terms[doc_id] = tuple(positions)
+            self._doc_pairs[doc_id] = tuple(pairs)
+            self._doc_lengths[doc_id] = length
+            self._doc_seq[doc_id] = self._next_seq
+            self._next_seq += 1
+            self._total_length += length
+            self._norms = None
+            self._impacts = {}
+
+    def remove(self, doc_id: Hashable) -> bool:
+        """Drop ``doc_id`` from the index. Returns ``False`` if it was absent."""
+        with self._lock:
+            return self._remove_locked(doc_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._postings.clear()
+            self._pairs.clear()
+            self._doc_terms.clear()
+            self._doc_pairs.clear()
+            self._doc_lengths.clear()
+            self._doc_seq.clear()
+            self._total_length = 0
+            self._sorted_terms = None
+            self._norms = None
+            self._impacts = {}
+
+    def _remove_locked(self, doc_id: Hashable) -> bool:
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return False
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+                self._sorted_terms = None
+        for pair in self._doc_pairs.pop(doc_id, ()):
+            docs = self._pairs.get(pair)
+            if docs is not None:
+                docs.discard(doc_id)
+                if not docs:
+                    del self._pairs[pair]
+        self._doc_seq.pop(doc_id, None)
+        self._total_length -= self._doc_lengths.pop(doc_id, 0)
+        self._norms = None
+        self._impacts = {}
+        return True
+
+    # ------------------------------------------------------------------
+    # Querying
+    def expand_prefix(self, prefix: str, *, limit: int = _MAX_PREFIX_EXPANSIONS) -> List[str]:
+        """Return indexed terms starting with ``prefix`` in lexical order."""
+        with self._lock:
+            if self._sorted_terms is None:
+                self._sorted_terms = sorted(self._postings)
+            terms = self._sorted_terms
+            matches: List[str] = []
+            for index in range(bisect_left(terms, prefix), len(terms)):
+                term = terms[index]
+                if not term.startswith(prefix) or len(matches) >= limit:
+                    break
+                matches.append(term)
+            return matches
+
+    def rank(self, query: str | ParsedQuery, *, accept: Callable[[Hashable], bool] | None = None) -> Dict[Hashable, float]:
+        """Return unsorted BM25 scores for every document matching ``query``.
+
+        Plain terms and prefix expansions are OR-ed together and contribute to
+        the score; every quoted phrase must appear verbatim in a matching document.
+        ``accept`` filters the matching document ids.
+        """
+
+        parsed = query if isinstance(query, ParsedQuery) else parse_query(query, self.analyzer)
+        if parsed.is_empty():
+            return {}
+
+        with self._lock:
+            if not self._doc_lengths:
+                return {}
+
+            groups = self._groups(parsed)
+            required = self._phrase_matches(parsed.phrases) if parsed.phrases else None
+            if required is not None and not required:
+                return {}
+
+            norms = self._length_norms()
+            doc_count = len(self._doc_lengths)
+            scores: Dict[Hashable, float] = {}
+            for group in groups:
+                best: Dict[Hashable, float] = {} if len(group) > 1 else scores
+                for term in group:
+                    postings = self._postings.get(term)
+                    if not postings:
+                        continue
+                    weight = self._weight(term, doc_count)
+                    for doc_id, term_positions in postings.items():
+                        tf = len(term_positions)
+                        value = weight * tf / (tf + norms[doc_id])
+                        if best is scores:
+                            scores[doc_id] = scores.get(doc_id, 0.0) + value
+                        elif value > best.get(doc_id, 0.0):
+                            best[doc_id] = value
+                if best is not scores:
+                    for doc_id, value in best.items():
+                        scores[doc_id] = scores.get(doc_id, 0.0) + value
+
+        if required is not None:
+            scores = {doc_id: score for doc_id, score in scores.items() if doc_id in required}
+        if accept is not None:
+            scores = {doc_id: score for doc_id, score in scores.items() if accept(doc_id)}
+        return scores
+
+    def search(
+        self,
+        query: str | ParsedQuery,
+        *,
+        limit: Optional[int] = None,
+        accept: Callable[[Hashable], bool] | None = None,
+    ) -> List[SearchHit]:
+        """Return the best ``limit`` hits for ``query`` (all hits when ``None``)."""
+        if limit is not None:
+            return self.top(query, limit, accept=accept)[0]
+        return top_hits(self.rank(query, accept=accept))
+
+    def top(
+        self,
+        query: str | ParsedQuery,
+        limit: int,
+        *,
+        accept: Callable[[Hashable], bool] | None = None,
+    ) -> Tuple[List[SearchHit], int]:
+        """Return the best ``limit`` hits for ``query`` and the number of matching documents.
+
+        Gives the same hits as ``search(query, limit=limit)``, but only scores
+        documents until the best remaining contribution of every query term
+        (threshold algorithm) can no longer beat the ``limit``-th hit.
+        """
+
+        parsed = query if isinstance(query, ParsedQuery) else parse_query(query, self.analyzer)
+        if parsed.is_empty():
+            return [], 0
+
+        with self._lock:
+            groups = [[term for term in group if term in self._postings] for group in self._groups(parsed)]
+            groups = [group for group in groups if group]
+            if not groups:
+                return [], 0
+            if parsed.phrases:
+                matching = self._phrase_matches(parsed.phrases)
+            else:
+                matching = set().union(*(self._postings[term] for group in groups for term in group))
+            if accept is not None:
+                matching = {doc_id for doc_id in matching if accept(doc_id)}
+            if limit <= 0 or not matching:
+                return [], len(matching)
+
+            norms = self._length_norms()
+            doc_count = len(self._doc_lengths)
+            weighted = [[(self._postings[term], self._weight(term, doc_count), term) for term in group] for group in groups]
+            streams: List[Iterator[Tuple[float, int, Hashable]]] = [
+                heapq.merge(*(self._impact_list(term, weight, norms) for _, weight, term in group)) for group in weighted
+            ]
+            # Best unread contribution of each group: no unseen document can score above their sum.
+            bounds = [0.0] * len(streams)
+            # Always read the globally best remaining posting, so low-impact terms
+            # (e.g. "the") are only read once everything better has been.
+            frontier: List[Tuple[float, int, int, Hashable]] = []
+            for index, stream in enumerate(streams):
+                entry = next(stream, None)
+                if entry is not None:
+                    frontier.append((entry[0], entry[1], index, entry[2]))
+                    bounds[index] = -entry[0]
+            heapq.heapify(frontier)
+            # Min-heap of (score, -sequence, doc id): the current worst kept hit is at the top.
+            kept: List[Tuple[float, int, Hashable]] = []
+            seen: Set[Hashable] = set()
+            while frontier:
+                _, sequence, index, doc_id = heapq.heappop(frontier)
+                entry = next(streams[index], None)
+                if entry is None:
+                    bounds[index] = 0.0
+                else:
+                    heapq.heappush(frontier, (entry[0], entry[1], index, entry[2]))
+                    bounds[index] = -entry[0]
+                if doc_id not in seen and doc_id in matching:
+                    seen.add(doc_id)
+                    # Same arithmetic, in the same order, as rank().
+                    norm = norms[doc_id]
+                    score = 0.0
+                    for group in weighted:
+                        best = 0.0
+                        for postings, weight, _ in group:
+                            term_positions = postings.get(doc_id)
+                            if term_positions:
+                                tf = len(term_positions)
+                                best = max(best, weight * tf / (tf + norm))
+                        score += best
+                    item = (score, -sequence, doc_id)
+                    if len(kept) < limit:
+                        heapq.heappush(kept, item)
+                    elif item > kept[0]:
+                        heapq.heapreplace(kept, item)
+                if len(kept) >= limit and sum(bounds) <= kept[0][0]:
+                    break
+
+        hits = [SearchHit(doc_id=doc_id, score=round(score, 6)) for score, _, doc_id in sorted(kept, reverse=True)]
+        return hits, len(matching)
+
+    def _groups(self, parsed: ParsedQuery) -> List[List[str]]:
+        # Each group contributes the best score of its alternatives, so a
+        # prefix matching many terms does not dominate the ranking.
+        groups: List[List[str]] = [[term] for term in parsed.terms]
+        groups.extend([term] for phrase in parsed.phrases for term in phrase)
+        groups.extend(self.expand_prefix(prefix) for prefix in parsed.prefixes)
+        return groups
+
+    def _weight(self, term: str, doc_count: int) -> float:
+        df = len(self._postings[term])
+        return (self.k1 + 1.0) * math.log(1.0 + (doc_count - df + 0.5) / (df + 0.5))
+
+    def _impact_list(self, term: str, weight: float, norms: Dict[Hashable, float]) -> List[Tuple[float, int, Hashable]]:
+        """``term``'s postings as ``(-score, sequence, doc id)``, best first; cached until the next mutation."""
+        impacts = self._impacts.get(term)
+        if impacts is None:
+            sequence = self._doc_seq
+            impacts = sorted(
+                (-(weight * len(positions) / (len(positions) + norms[doc_id])), sequence[doc_id], doc_id)
+                for doc_id, positions in self._postings[term].items()
+            )
+            self._impacts[term] = impacts
+        return impacts
+
+    def _length_norms(self) -> Dict[Hashable, float]:
+        if self._norms is None:
+            avg_length = (self._total_length / len(self._doc_lengths)) or 1.0
+            k1, b = self.k1, self.b
+            self._norms = {
+                doc_id: k1 * (1.0 - b + b * length / avg_length) for doc_id, length in self._doc_lengths.items()
+            }
+        return self._norms
+
+    def _phrase_matches(self, phrases: List[List[str]]) -> set:
+        matched: set | None = None
+        for phrase in phrases:
+            # Documents holding every adjacent pair of the phrase; for two-term
+            # phrases that is exactly the set of matches.
+            candidates = sorted((self._pairs.get(pair, set()) for pair in zip(phrase, phrase[1:])), key=len)
+            docs = candidates[0].intersection(*candidates[1:])
+            if matched is not None:
+                docs.intersection_update(matched)
+            if len(phrase) > 2:
+                docs = self._verify_phrase(phrase, docs)
+            matched = docs
+            if not matched:
+                return set()
+        return matched or set()
+
+    def _verify_phrase(self, phrase: List[str], docs: set) -> set:
+        postings = [self._postings[term] for term in phrase]
+        found = set()
+        for doc_id in docs:
+            following = [set(term_postings[doc_id]) for term_postings in postings[1:]]
+            for start in postings[0][doc_id]:
+                if all(start + offset + 1 in positions for offset, positions in enumerate(following)):
+                    found.add(doc_id)
+                    break
+        return found
@@ -0,0 +1,168 @@
+"""Offline latent semantic index built with NumPy.
+
+Documents are turned into hashed TF-IDF vectors (stemmed unigrams and
+bigrams), reduced with a randomized truncated SVD and stored as L2-normalized
+float32 rows. Queries are projected into the same space and ranked with a
+single matrix-vector product, so related wording ("dolly shot", "tracking
+move") lands close together without any external embedding service.
+"""
+from __future__ import annotations
+
+import json
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+from .text import analyze
+
+DEFAULT_FEATURES = 1 << 12
+DEFAULT_DIMENSIONS = 128
+FORMAT_VERSION = 1
+
+
+def _features(text: str) -> List[str]:
+    tokens = analyze(text)
+    return tokens + [f"{left} {right}" for left, right in zip(tokens, tokens[1:])]
+
+
+def hashed_counts(texts: Sequence[str], n_features: int) -> np.ndarray:
+    """Return a dense ``(len(texts), n_features)`` float32 matrix of sublinear hashed term counts."""
+    matrix = np.zeros((len(texts), n_features), dtype=np.float32)
+    for row, text in enumerate(texts):
+        columns = [zlib.crc32(feature.encode("utf-8")) % n_features for feature in _features(text)]
+        np.add.at(matrix[row], columns, 1.0)
+    np.log1p(matrix, out=matrix)
+    return matrix
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32, copy=False)
+
+
+def _randomized_svd(matrix: np.ndarray, rank: int, *, n_iter: int = 4, seed: int = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Truncated SVD via randomized range finding (Halko et al.)."""
+    rng = np.random.default_rng(seed)
+    oversample = min(rank + 10, min(matrix.shape))
+    sketch = matrix @ rng.standard_normal((matrix.shape[1], oversample)).astype(np.float32)
+    basis, _ = np.linalg.qr(sketch)
+    for _ in range(n_iter):
+        basis, _ = np.linalg.qr(matrix.T @ basis)
+        basis, _ = np.linalg.qr(matrix @ basis)
+    small = basis.T @ matrix
+    u_small, singular, vt = np.linalg.svd(small, full_matrices=False)
+    return (basis @ u_small)[:, :rank], singular[:rank], vt[:rank]
+
+
+@dataclass
+class SemanticIndex:
+    """Dense LSA vectors for a fixed set of documents."""
+
+    ids: List[str]
+    vectors: np.ndarray  # (n_docs, dims) float32, rows L2-normalized
+    components: np.ndarray  # (n_features, dims) float32
+    idf: np.ndarray  # (n_features,) float32
+    source_hash: str = ""
+
+    @property
+    def n_features(self) -> int:
+        return int(self.idf.shape[0])
+
+    @classmethod
+    def build(
+        cls,
+        documents: Sequence[Tuple[str, str]],
+        *,
+        n_features: int = DEFAULT_FEATURES,
+        dimensions: int = DEFAULT_DIMENSIONS,
+        source_hash: str = "",
+    ) -> "SemanticIndex":
+        ids = [doc_id for doc_id, _ in documents]
+        counts = hashed_counts([text for _, text in documents], n_features)
+        doc_freq = np.count_nonzero(counts, axis=0).astype(np.float32)
+        idf = (np.log((1.0 + len(ids)) / (1.0 + doc_freq)) + 1.0).astype(np.float32)
+        tfidf = _normalize_rows(counts * idf)
+
+        rank = max(1, min(dimensions, len(ids), n_features))
+        if len(ids) == 0:
+            return cls(ids=[], vectors=np.zeros((0, 1), np.float32), components=np.zeros((n_features, 1), np.float32), idf=idf, source_hash=source_hash)
+        _, singular, vt = _randomized_svd(tfidf, rank)
+        keep = singular > 1e-6
+        components = np.ascontiguousarray(vt[keep].T, dtype=np.float32)
+        vectors = _normalize_rows(tfidf @ components)
+        return cls(ids=ids, vectors=vectors, components=components, idf=idf, source_hash=source_hash)
+
+    def embed(self, text: str) -> np.ndarray:
+        """Project ``text`` into the index space as a unit float32 vector."""
+        counts = hashed_counts([text], self.n_features)
+        projected = _normalize_rows((counts * self.idf) @ self.components)
+        return projected[0]
+
+    def query(self, text: str, *, k: int = 10) -> List[Tuple[str, float]]:
+        """Return up to ``k`` ``(doc_id, cosine)`` pairs with positive similarity, best first."""
+        if not self.ids:
+            return []
+        scores = self.scores(text)
+        k = min(k, scores.shape[0])
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self.ids[i], float(scores[i])) for i in top if scores[i] > 0]
+
+    def scores(self, text: str) -> np.ndarray:
+        """Cosine similarity of ``text`` against every document."""
+        return self.vectors @ self.embed(text)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    def save(self, directory: str | Path) -> None:
+        """Write ``.npy`` arrays (memory-mappable) plus a JSON sidecar to ``directory``."""
+        target = Path(directory)
+        target.mkdir(parents=True, exist_ok=True)
+        for name, array in (("vectors", self.vectors), ("components", self.components), ("idf", self.idf)):
+            temp = target / f"{name}.tmp.npy"
+            np.save(temp, np.ascontiguousarray(array, dtype="<f4"))
+            temp.replace(target / f"{name}.npy")
+        meta = {"version": FORMAT_VERSION, "sourceHash": self.source_hash, "ids": self.ids}
+        temp_meta = target / "meta.json.tmp"
+        temp_meta.write_text(json.dumps(meta), encoding="utf-8")
+        temp_meta.replace(target / "meta.json")
+
+    @classmethod
+    def load(cls, directory: str | Path) -> "SemanticIndex | None":
+        """Memory-map a saved index; returns ``None`` when it is missing or incompatible."""
+        source = Path(directory)
+        try:
+            meta = json.loads((source / "meta.json").read_text(encoding="utf-8"))
+            if meta.get("version") != FORMAT_VERSION:
+                return None
+            return cls(
+                ids=list(meta["ids"]),
+                vectors=np.load(source / "vectors.npy", mmap_mode="r"),
+                components=np.load(source / "components.npy", mmap_mode="r"),
+                idf=np.load(source / "idf.npy", mmap_mode="r"),
+                source_hash=str(meta.get("sourceHash", "")),
+            )
+        except (OSError, ValueError, KeyError):
+            return None
+
+
+def hybrid_scores(
+    semantic: Mapping[str, float],
+    lexical: Mapping[str, float],
+    *,
+    alpha: float = 0.5,
+) -> Dict[str, float]:
+    """Blend cosine scores with BM25 scores normalized by their maximum.
+
+    ``alpha`` weights the semantic side; ``1 - alpha`` weights the lexical side.
+    """
+
+    top_lexical = max(lexical.values(), default=0.0) or 1.0
+    combined: Dict[str, float] = {}
+    for doc_id in set(semantic) | set(lexical):
+        combined[doc_id] = alpha * max(semantic.get(doc_id, 0.0), 0.0) + (1.0 - alpha) * lexical.get(doc_id, 0.0) / top_lexical
+    return combined
@@ -0,0 +1,104 @@
+"""Tokenization and query parsing shared by the search indexes."""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Callable, List
+
+_TOKEN_RE = re.compile(r"[^\W_]+", re.UNICODE)
+_QUERY_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+_ES_ENDINGS = ("sses", "shes", "ches", "xes", "zes")
+_UNDOUBLED = frozenset("lsz")
+_VOWELS = frozenset("aeiouy")
+
+Analyzer = Callable[[str], List[str]]
+
+
+def tokenize(text: str) -> List[str]:
+    """Split ``text`` into lowercase alphanumeric tokens."""
+    if not text:
+        return []
+    return _TOKEN_RE.findall(text.casefold())
+
+
+def stem(token: str) -> str:
+    """Conflate common English inflections ("moves", "moving", "move" -> "mov").
+
+    This is deliberately much lighter than a Porter stemmer: it strips plural,
+    ``-ing``/``-ed``/``-ly`` endings and a trailing ``e`` so that the indexed and
+    queried forms of a word agree; it never has to produce a real word.
+    """
+
+    if len(token) <= 3 or not token.isalpha():
+        return token
+    base = token
+    if base.endswith("ies") and len(base) > 4:
+        base = base[:-3] + "y"
+    elif base.endswith(_ES_ENDINGS):
+        base = base[:-2]
+    elif base.endswith("s") and not base.endswith(("ss", "us", "is")):
+        base = base[:-1]
+    elif base.endswith("ingly") and len(base) > 7:
+        base = base[:-5]
+    elif base.endswith("ing") and len(base) > 5:
+        base = base[:-3]
+    elif base.endswith("edly") and len(base) > 6:
+        base = base[:-4]
+    elif base.endswith("ed") and len(base) > 4:
+        base = base[:-2]
+    elif base.endswith("ly") and len(base) > 5:
+        base = base[:-2]
+    if base != token and len(base) > 2 and base[-1] == base[-2] and base[-1] not in _UNDOUBLED | _VOWELS:
+        base = base[:-1]
+    if len(base) > 3 and base.endswith("e"):
+        base = base[:-1]
+    return base
+
+
+def analyze(text: str) -> List[str]:
+    """Tokenize ``text`` and apply :func:`stem` to every token."""
+    return [stem(token) for token in tokenize(text)]
+
+
+@dataclass
+class ParsedQuery:
+    """Structured representation of a free-text search query."""
+
+    terms: List[str] = field(default_factory=list)
+    phrases: List[List[str]] = field(default_factory=list)
+    prefixes: List[str] = field(default_factory=list)
+
+    def is_empty(self) -> bool:
+        return not (self.terms or self.phrases or self.prefixes)
+
+
+def parse_query(query: str, analyzer: Analyzer = tokenize) -> ParsedQuery:
+    """Parse ``query`` into plain terms, ``"quoted phrases"`` and ``prefix*`` terms.
+
+    Terms and phrases are normalized with ``analyzer``; prefixes are lowercased
+    and only shortened by it, so they still match the beginning of indexed terms.
+    """
+
+    parsed = ParsedQuery()
+    for phrase, word in _QUERY_RE.findall(query or ""):
+        if phrase:
+            tokens = analyzer(phrase)
+            if len(tokens) > 1:
+                parsed.phrases.append(tokens)
+            else:
+                parsed.terms.extend(tokens)
+        elif word.endswith("*") and len(word) > 1:
+            prefix_tokens = tokenize(word[:-1])
+            if prefix_tokens:
+                parsed.terms.extend(analyzer(" ".join(prefix_tokens[:-1])))
+                prefix = prefix_tokens[-1]
+                # Indexed terms may be stemmed; widen the prefix to the stem when
+                # the analyzer only shortened it ("lens*" -> "len*").
+                normalized = analyzer(prefix)
+                if normalized and prefix.startswith(normalized[0]):
+                    prefix = normalized[0]
+                parsed.prefixes.append(prefix)
+        else:
+            parsed.terms.extend(analyzer(word))
+    return parsed
@@ -0,0 +1,187 @@
+"""Character-trigram index for typo-tolerant lookups and autocomplete."""
+from __future__ import annotations
+
+import heapq
+import math
+from collections import Counter
+from dataclasses import dataclass
+from threading import RLock
+from typing import Callable, Dict, FrozenSet, Hashable, List, Set
+
+from .text import tokenize
+
+DEFAULT_THRESHOLD = 0.45
+# Minimum per-word similarity for a vocabulary word to count as a match.
+WORD_THRESHOLD = 0.3
+# Weight of "how much of the candidate the query covers" versus per-word similarity.
+_COVERAGE_WEIGHT = 0.15
+# Entries scored per query; very common words would otherwise pull in the whole index.
+MAX_CANDIDATES = 200
+
+
+def word_trigrams(word: str) -> FrozenSet[str]:
+    """Return the trigrams of ``word`` padded like PostgreSQL's ``pg_trgm``."""
+    padded = f"  {word} "
+    return frozenset(padded[index : index + 3] for index in range(len(padded) - 2))
+
+
+@dataclass(frozen=True)
+class TrigramMatch:
+    key: Hashable
+    text: str
+    score: float
+
+
+class TrigramIndex:
+    """Fuzzy matcher for short strings (titles, names, list items).
+
+    Trigrams are indexed per distinct word, so a misspelt query word is
+    compared with vocabulary words rather than whole strings: "cinematograhy"
+    still finds "cinematography" inside a long sentence. The last query word is
+    also treated as a prefix to support search-as-you-type. A candidate's score
+    is the mean best similarity of each query word, nudged towards candidates
+    that consist mostly of matched words.
+    """
+
+    def __init__(self) -> None:
+        self._gram_words: Dict[str, Set[str]] = {}
+        self._word_grams: Dict[str, FrozenSet[str]] = {}
+        self._word_keys: Dict[str, Set[Hashable]] = {}
+        self._key_words: Dict[Hashable, FrozenSet[str]] = {}
+        self._texts: Dict[Hashable, str] = {}
+        self._lock = RLock()
+
+    def __getstate__(self) -> Dict[str, object]:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, object]) -> None:
+        self.__dict__.update(state)
+        self._lock = RLock()
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def add(self, key: Hashable, text: str) -> None:
+        words = frozenset(tokenize(text))
+        with self._lock:
+            self.remove(key)
+            if not words:
+                return
+            for word in words:
+                keys = self._word_keys.get(word)
+                if keys is None:
+                    keys = self._word_keys[word] = set()
+                    grams = self._word_grams[word] = word_trigrams(word)
+                    for gram in grams:
+                        self._gram_words.setdefault(gram, set()).add(word)
+                keys.add(key)
+            self._key_words[key] = words
+            self._texts[key] = text
+
+    def remove(self, key: Hashable) -> None:
+        with self._lock:
+            words = self._key_words.pop(key, None)
+            self._texts.pop(key, None)
+            for word in words or ():
+                keys = self._word_keys.get(word)
+                if keys is None:
+                    continue
+                keys.discard(key)
+                if keys:
+                    continue
+                del self._word_keys[word]
+                for gram in self._word_grams.pop(word, ()):
+                    gram_words = self._gram_words.get(gram)
+                    if gram_words is not None:
+                        gram_words.discard(word)
+                        if not gram_words:
+                            del self._gram_words[gram]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._gram_words.clear()
+            self._word_grams.clear()
+            self._word_keys.clear()
+            self._key_words.clear()
+            self._texts.clear()
+
+    def _similar_words(self, word: str, *, prefix: bool) -> Dict[str, float]:
+        grams = word_trigrams(word)
+        overlaps: Counter = Counter()
+        for gram in grams:
+            overlaps.update(self._gram_words.get(gram, ()))
+        # Jaccard similarity never exceeds overlap / len(grams), so words sharing
+        # fewer trigrams than this cannot reach the threshold.
+        min_overlap = math.ceil(WORD_THRESHOLD * len(grams))
+        similar: Dict[str, float] = {}
+        for candidate, overlap in overlaps.items():
+            is_prefix = prefix and candidate.startswith(word)
+            if overlap < min_overlap and not is_prefix:
+                continue
+            score = overlap / (len(grams) + len(self._word_grams[candidate]) - overlap)
+            if is_prefix:
+                score = max(score, 0.8 + 0.2 * len(word) / len(candidate))
+            if score >= WORD_THRESHOLD:
+                similar[candidate] = score
+        return similar
+
+    def _candidates(
+        self, similar: List[Dict[str, float]], accept: Callable[[Hashable], bool] | None
+    ) -> List[Hashable]:
+        """Collect at most ``MAX_CANDIDATES`` keys, rarest query word and closest words first.
+
+        Entries that miss the rarest query word lose most of their score anyway,
+        so very common words only contribute when the rarer ones run short.
+        """
+        ordered = sorted(similar, key=lambda scores: sum(len(self._word_keys[word]) for word in scores))
+        seen: Set[Hashable] = set()
+        candidates: List[Hashable] = []
+        for scores in ordered:
+            for word in sorted(scores, key=scores.__getitem__, reverse=True):
+                for key in self._word_keys[word]:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    if accept is not None and not accept(key):
+                        continue
+                    candidates.append(key)
+                    if len(candidates) >= MAX_CANDIDATES:
+                        return candidates
+        return candidates
+
+    def suggest(
+        self,
+        query: str,
+        *,
+        limit: int = 10,
+        threshold: float = DEFAULT_THRESHOLD,
+        accept: Callable[[Hashable], bool] | None = None,
+    ) -> List[TrigramMatch]:
+        """Return up to ``limit`` entries whose similarity to ``query`` is at least ``threshold``."""
+        query_words = tokenize(query)
+        if not query_words:
+            return []
+        with self._lock:
+            last = len(query_words) - 1
+            similar = [
+                self._similar_words(query_word, prefix=position == last)
+                for position, query_word in enumerate(query_words)
+            ]
+            scored = []
+            for key in self._candidates(similar, accept):
+                words = self._key_words[key]
+                total = 0.0
+                matched = 0
+                for scores in similar:
+                    common = scores.keys() & words
+                    if common:
+                        total += max(scores[word] for word in common)
+                        matched += 1
+                coverage = min(1.0, matched / len(words))
+                score = (1.0 - _COVERAGE_WEIGHT) * total / len(query_words) + _COVERAGE_WEIGHT * coverage
+                if score >= threshold:
+                    scored.append((score, key))
+            best_keys = heapq.nlargest(limit, scored, key=lambda item: (item[0], -len(self._texts[item[1]])))
+            return [TrigramMatch(key=key, text=self._texts[key], score=round(score, 4)) for score, key in best_keys]
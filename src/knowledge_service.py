@@ -2,17 +2,93 @@
 from __future__ import annotations
 
 import json
+import logging
+import threading
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List
+from typing import Callable, Collection, Dict, List, Optional, Tuple
+
+from .cache import LRUCache
+from .indexing.inverted import InvertedIndex, top_hits
+from .indexing.text import analyze
+from .indexing.trigram import TrigramIndex
+from .knowledge_snapshot import CompiledKnowledge, digest_files
+
+logger = logging.getLogger("flask-api-service")
+
+DEFAULT_RELOAD_INTERVAL = 2.0
+DEFAULT_CACHE_SIZE = 512
+DEFAULT_CACHE_TTL = 300.0
+
+
+@dataclass(frozen=True)
+class KnowledgeSnapshot:
+    """Parsed knowledge base together with the search index built from it."""
+
+    payload: Dict
+    entries: List[Dict]
+    index: InvertedIndex
+    suggestions: TrigramIndex = field(default_factory=TrigramIndex)
+    signature: Tuple[int, int] | None = None
+    loaded_at: datetime | None = None
+
+
+def _build_snapshot(payload: Dict, signature: Tuple[int, int] | None = None) -> KnowledgeSnapshot:
+    entries: List[Dict] = []
+    index = InvertedIndex(analyzer=analyze)
+    suggestions = TrigramIndex()
+    for category in payload.get("categories", []):
+        if category.get("title"):
+            suggestions.add(("category", category.get("id")), str(category["title"]))
+        for entry in category.get("entries", []):
+            enriched = dict(entry)
+            enriched["categoryId"] = category.get("id")
+            enriched["categoryTitle"] = category.get("title")
+            index.add(len(entries), (entry.get("question", ""), entry.get("answer", "")))
+            if entry.get("question"):
+                suggestions.add(("entry", len(entries)), str(entry["question"]))
+            entries.append(enriched)
+    return KnowledgeSnapshot(
+        payload=payload,
+        entries=entries,
+        index=index,
+        suggestions=suggestions,
+        signature=signature,
+        loaded_at=datetime.now(timezone.utc),
+    )
 
 
 class KnowledgeService:
-    def __init__(self, path: str | Path = "data/knowledge_base.json") -> None:
+    """Serves ``knowledge_base.json`` from an immutable, atomically swapped snapshot.
+
+    Every request reads ``self._snapshot`` exactly once, so a reload that lands
+    mid-request never mixes the old payload with the new index. The first
+    snapshot is taken from ``compiled`` when its source hash still matches.
+    Search results are memoized in an LRU cache that is cleared on reload.
+    """
+
+    def __init__(
+        self,
+        path: str | Path = "data/knowledge_base.json",
+        *,
+        compiled: CompiledKnowledge | None = None,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        cache_ttl: float | None = DEFAULT_CACHE_TTL,
+    ) -> None:
         self.path = Path(path)
         self.path.parent.mkdir(parents=True, exist_ok=True)
         if not self.path.exists():
             self.path.write_text(json.dumps({"categories": []}, indent=2), encoding="utf-8")
-        self._cache: Dict | None = None
+        self._snapshot: KnowledgeSnapshot | None = None
+        self._compiled = compiled
+        self._reload_lock = threading.Lock()
+        self._reloads = 0
+        self._failed_signature: Tuple[int, int] | None = None
+        self._watcher: threading.Thread | None = None
+        self._stop_watching = threading.Event()
+        self._listeners: List[Callable[[], None]] = []
+        self._search_cache: LRUCache[Tuple[KnowledgeSnapshot, Dict]] = LRUCache(cache_size, cache_ttl)
 
     def _load(self) -> Dict:
         payload = json.loads(self.path.read_text(encoding="utf-8"))
@@ -20,20 +96,164 @@ class KnowledgeService:
             payload["categories"] = []
         return payload
 
+    def _signature(self) -> Tuple[int, int] | None:
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def source_hash(self) -> str:
+        return digest_files([self.path])
+
+    def _from_compiled(self, signature: Tuple[int, int] | None) -> KnowledgeSnapshot | None:
+        compiled, self._compiled = self._compiled, None
+        if compiled is None:
+            return None
+        snapshot = compiled.section("knowledge", self.source_hash())
+        if snapshot is None:
+            logger.info("Compiled knowledge snapshot %s is stale; rebuilding from %s", compiled.path, self.path)
+            return None
+        return replace(snapshot, signature=signature, loaded_at=datetime.now(timezone.utc))
+
+    def snapshot(self) -> KnowledgeSnapshot:
+        """Return the snapshot currently in service (loading it on first use)."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._reload_lock:
+                if self._snapshot is None:
+                    signature = self._signature()
+                    self._snapshot = self._from_compiled(signature) or _build_snapshot(self._load(), signature)
+                snapshot = self._snapshot
+        return snapshot
+
+    # ------------------------------------------------------------------
+    # Hot reload
+    def reload_if_changed(self) -> bool:
+        """Re-parse and re-index the file if it changed, then swap the snapshot in.
+
+        Returns ``True`` when a new snapshot was installed. Parse errors are
+        logged and leave the previous snapshot in service.
+        """
+
+        with self._reload_lock:
+            signature = self._signature()
+            current = self._snapshot
+            if signature is None or signature == self._failed_signature:
+                return False
+            if current is not None and current.signature == signature:
+                return False
+            try:
+                snapshot = _build_snapshot(self._load(), signature)
+            except (OSError, ValueError) as exc:
+                self._failed_signature = signature
+                logger.warning("Keeping previous knowledge base; failed to reload %s: %s", self.path, exc)
+                return False
+            self._failed_signature = None
+            self._snapshot = snapshot
+            self._search_cache.clear()
+            if current is not None:
+                self._reloads += 1
+                logger.info("Reloaded knowledge base from %s", self.path)
+            for listener in self._listeners:
+                listener()
+            return True
+
+    def subscribe(self, listener: Callable[[], None]) -> None:
+        """Call ``listener`` after every reload that installs a new snapshot.
+
+        Listeners run on the reloading thread (usually the watcher), so they
+        should only enqueue work.
+        """
+        self._listeners.append(listener)
+
+    def start_watching(self, interval: float = DEFAULT_RELOAD_INTERVAL) -> None:
+        """Poll the file's mtime/size every ``interval`` seconds in a daemon thread."""
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self.snapshot()
+        self._stop_watching.clear()
+
+        def watch() -> None:
+            while not self._stop_watching.wait(interval):
+                try:
+                    self.reload_if_changed()
+                except Exception:  # pragma: no cover - keep the watcher alive
+                    logger.exception("Knowledge base watcher failed")
+
+        self._watcher = threading.Thread(target=watch, name="knowledge-reload", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self) -> None:
+        self._stop_watching.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def reload_status(self) -> Dict:
+        snapshot = self._snapshot
+        loaded_at = snapshot.loaded_at if snapshot is not None else None
+        return {
+            "reloads": self._reloads,
+            "lastReloadAt": loaded_at.isoformat().replace("+00:00", "Z") if loaded_at else None,
+            "watching": self._watcher is not None and self._watcher.is_alive(),
+        }
+
+    def cache_stats(self) -> Dict:
+        return self._search_cache.stats()
+
     def all(self) -> Dict:
-        if self._cache is None:
-            self._cache = self._load()
-        return self._cache
+        return self.snapshot().payload
+
+    def search(
+        self,
+        query: str,
+        *,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        categories: Collection[str] | None = None,
+    ) -> Dict:
+        """Rank entries against ``query`` with BM25 over questions and answers.
+
+        Results are cached per snapshot under the case- and whitespace-normalized
+        query plus the paging and category filters.
+        """
+        snapshot = self.snapshot()
+        key = (" ".join(query.casefold().split()), limit, offset, tuple(sorted(set(categories or ()))))
+        cached = self._search_cache.get(key)
+        if cached is not None and cached[0] is snapshot:
+            return {**cached[1], "query": query}
+
+        accept = None
+        if categories:
+            wanted = set(categories)
+            accept = lambda position: snapshot.entries[position]["categoryId"] in wanted  # noqa: E731
 
-    def search(self, query: str) -> Dict[str, List[Dict]]:
-        query_lower = query.lower()
+        if limit is None:
+            scores = snapshot.index.rank(query, accept=accept)
+            hits, total = top_hits(scores), len(scores)
+        else:
+            hits, total = snapshot.index.top(query, offset + limit, accept=accept)
         results: List[Dict] = []
-        for category in self.all().get("categories", []):
-            for entry in category.get("entries", []):
-                if query_lower in entry.get("question", "").lower() or query_lower in entry.get("answer", "").lower():
-                    enriched = dict(entry)
-                    enriched["categoryId"] = category.get("id")
-                    enriched["categoryTitle"] = category.get("title")
-                    results.append(enriched)
-        return {"query": query, "results": results}
+        for hit in hits[offset:]:
+            enriched = dict(snapshot.entries[hit.doc_id])
+            enriched["score"] = hit.score
+            results.append(enriched)
+        response = {"query": query, "results": results, "total": total, "offset": offset, "limit": limit}
+        self._search_cache.put(key, (snapshot, response))
+        return response
 
+    def suggest(self, query: str, *, limit: int = 10) -> List[Dict]:
+        """Typo-tolerant completions drawn from entry questions and category titles."""
+        snapshot = self.snapshot()
+        suggestions: List[Dict] = []
+        for match in snapshot.suggestions.suggest(query, limit=limit):
+            kind, key = match.key
+            if kind == "entry":
+                entry = snapshot.entries[key]
+                suggestion = {"text": match.text, "kind": "question", "categoryId": entry["categoryId"]}
+            else:
+                suggestion = {"text": match.text, "kind": "category", "categoryId": key}
+            suggestion["score"] = match.score
+            suggestions.append(suggestion)
+        return suggestions
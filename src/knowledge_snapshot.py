@@ -0,0 +1,219 @@
+"""Precompiled, memory-mapped snapshot of both knowledge sources.
+
+``python build_knowledge_snapshot.py build`` compiles ``data/knowledge_base.json``
+and ``loop/knowledge/*.md`` into one versioned file holding the parsed entries,
+the extracted note lists, chunk text, the BM25 and trigram indexes and the
+semantic vectors. At startup the services open it with
+:meth:`CompiledKnowledge.open` and use a section only while its source hash
+still matches the files on disk; a stale section falls back to a live build.
+
+Layout::
+
+    magic (8 bytes) | format version (uint32 LE) | header length (uint32 LE)
+    header (UTF-8 JSON) | sections, each aligned to 64 bytes
+
+Structured sections are pickles, unpickled on first use. Array sections are
+raw little-endian float32 exposed as read-only NumPy views onto the memory map.
+Unpickling runs code, so only open snapshots produced by this build step.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import mmap
+import os
+import pickle
+import struct
+import sys
+from dataclasses import replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from .indexing.semantic import DEFAULT_DIMENSIONS, SemanticIndex
+
+logger = logging.getLogger("flask-api-service")
+
+MAGIC = b"KNOWSNAP"
+FORMAT_VERSION = 2
+DEFAULT_SNAPSHOT_PATH = "data/knowledge.snapshot"
+_PREAMBLE = struct.Struct("<8sII")
+_ALIGNMENT = 64
+_SEMANTIC_ARRAYS = ("vectors", "components", "idf")
+
+
+def digest_files(paths: Iterable[Path]) -> str:
+    """SHA-256 over the names and contents of ``paths``; missing files hash as absent."""
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(path.name.encode("utf-8") + b"\0")
+        try:
+            digest.update(path.read_bytes())
+        except (FileNotFoundError, NotADirectoryError):
+            digest.update(b"\xffmissing")
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+class CompiledKnowledge:
+    """Read-only view over a snapshot file produced by :func:`build`."""
+
+    def __init__(self, path: Path, buffer: mmap.mmap, header: Dict[str, Any], data_offset: int) -> None:
+        self.path = path
+        self.header = header
+        self._buffer = buffer
+        self._data_offset = data_offset
+        self._sections: Dict[str, Any] = {}
+
+    @classmethod
+    def open(cls, path: str | Path) -> "CompiledKnowledge | None":
+        """Memory-map ``path``; returns ``None`` when it is missing or not a compatible snapshot."""
+        source = Path(path)
+        try:
+            with source.open("rb") as handle:
+                buffer = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        try:
+            magic, version, header_length = _PREAMBLE.unpack_from(buffer, 0)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                logger.warning("Ignoring knowledge snapshot %s with unsupported format", source)
+                return None
+            header = json.loads(buffer[_PREAMBLE.size : _PREAMBLE.size + header_length].decode("utf-8"))
+        except (struct.error, ValueError) as exc:
+            logger.warning("Ignoring unreadable knowledge snapshot %s: %s", source, exc)
+            return None
+        return cls(source, buffer, header, _aligned(_PREAMBLE.size + header_length))
+
+    def _view(self, name: str) -> memoryview:
+        offset, length = self.header["sections"][name][:2]
+        start = self._data_offset + offset
+        return memoryview(self._buffer)[start : start + length]
+
+    def section(self, name: str, source_hash: str) -> Any | None:
+        """Return the unpickled section ``name`` if it was compiled from sources hashing to ``source_hash``."""
+        if self.header.get("sources", {}).get(name) != source_hash:
+            return None
+        if name not in self._sections:
+            self._sections[name] = pickle.loads(self._view(name))
+        return self._sections[name]
+
+    def semantic_index(self, source_hash: str) -> SemanticIndex | None:
+        """Return the semantic index backed by the memory map, or ``None`` when it is stale."""
+        meta = self.header.get("semantic")
+        if not meta or meta.get("sourceHash") != source_hash:
+            return None
+        arrays = {}
+        for name in _SEMANTIC_ARRAYS:
+            offset, length, shape = self.header["sections"][name]
+            arrays[name] = np.frombuffer(self._buffer, dtype="<f4", count=length // 4, offset=self._data_offset + offset).reshape(shape)
+        return SemanticIndex(ids=list(meta["ids"]), source_hash=source_hash, **arrays)
+
+
+def write_snapshot(
+    output: str | Path,
+    *,
+    sections: Dict[str, Tuple[str, Any]],
+    semantic: SemanticIndex | None = None,
+) -> Dict[str, Any]:
+    """Write ``{name: (source_hash, obj)}`` sections (plus an optional semantic index) atomically."""
+    blobs: List[Tuple[str, bytes, Sequence[int] | None]] = [
+        (name, pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL), None) for name, (_, obj) in sections.items()
+    ]
+    header: Dict[str, Any] = {
+        "version": FORMAT_VERSION,
+        "createdAt": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+        "sources": {name: source_hash for name, (source_hash, _) in sections.items()},
+        "sections": {},
+    }
+    if semantic is not None:
+        header["semantic"] = {"sourceHash": semantic.source_hash, "ids": semantic.ids}
+        for name in _SEMANTIC_ARRAYS:
+            array = np.ascontiguousarray(getattr(semantic, name), dtype="<f4")
+            blobs.append((name, array.tobytes(), list(array.shape)))
+
+    offset = 0
+    for name, blob, shape in blobs:
+        header["sections"][name] = [offset, len(blob)] + ([shape] if shape is not None else [])
+        offset = _aligned(offset + len(blob))
+    encoded = json.dumps(header).encode("utf-8")
+
+    target = Path(output)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    temp = target.with_name(f"{target.name}.tmp")
+    with temp.open("wb") as handle:
+        handle.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(encoded)))
+        handle.write(encoded)
+        data_offset = _aligned(_PREAMBLE.size + len(encoded))
+        for name, blob, _ in blobs:
+            handle.seek(data_offset + header["sections"][name][0])
+            handle.write(blob)
+        handle.truncate()
+        handle.flush()
+        os.fsync(handle.fileno())
+    temp.replace(target)
+    return header
+
+
+def build(
+    knowledge_path: str | Path,
+    notes_dir: str | Path,
+    output: str | Path = DEFAULT_SNAPSHOT_PATH,
+    *,
+    dimensions: int = DEFAULT_DIMENSIONS,
+) -> Dict[str, Any]:
+    """Compile both knowledge sources and every index into ``output``; returns the header."""
+    from .knowledge_service import KnowledgeService
+    from .semantic_service import SemanticSearchService
+    from .services.knowledge import KnowledgeService as NotesService
+
+    knowledge = KnowledgeService(knowledge_path)
+    notes = NotesService(base_path=notes_dir)
+    hashes = (knowledge.source_hash(), notes.source_hash())
+
+    snapshot = replace(knowledge.snapshot(), signature=None, loaded_at=None)
+    notes_state = notes.compiled_state()
+    semantic = SemanticSearchService(knowledge, notes, dimensions=dimensions).index()
+    if (knowledge.source_hash(), notes.source_hash()) != hashes:
+        raise RuntimeError("Knowledge sources changed while the snapshot was being built; run the build again.")
+
+    return write_snapshot(
+        output,
+        sections={"knowledge": (hashes[0], snapshot), "notes": (hashes[1], notes_state)},
+        semantic=semantic,
+    )
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="build_knowledge_snapshot.py", description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_parser = commands.add_parser("build", help="compile the knowledge sources into a snapshot")
+    build_parser.add_argument("--knowledge", default="data/knowledge_base.json", help="knowledge base JSON file")
+    build_parser.add_argument("--notes", default="loop/knowledge", help="directory of markdown notes")
+    build_parser.add_argument("--output", default=DEFAULT_SNAPSHOT_PATH, help="snapshot file to write")
+    build_parser.add_argument("--dimensions", type=int, default=DEFAULT_DIMENSIONS, help="semantic vector size")
+    inspect_parser = commands.add_parser("inspect", help="print the header of an existing snapshot")
+    inspect_parser.add_argument("path", nargs="?", default=DEFAULT_SNAPSHOT_PATH)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        header = build(args.knowledge, args.notes, args.output, dimensions=args.dimensions)
+        size = Path(args.output).stat().st_size
+        print(f"Wrote {args.output} ({size} bytes, {len(header['semantic']['ids'])} semantic documents)")
+        return 0
+
+    compiled = CompiledKnowledge.open(args.path)
+    if compiled is None:
+        print(f"{args.path} is missing or not a knowledge snapshot", file=sys.stderr)
+        return 1
+    summary = {key: value for key, value in compiled.header.items() if key != "semantic"}
+    print(json.dumps(summary, indent=2))
+    return 0
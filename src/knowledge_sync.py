@@ -0,0 +1,56 @@
+"""Incremental re-indexing of the markdown notes into a Chroma collection.
+
+``python sync_knowledge_notes.py`` chunks ``loop/knowledge/*.md`` exactly like
+the notes service, hashes every chunk and writes only the difference to the
+collection: new and edited chunks are upserted (and embedded), chunks whose
+section disappeared are deleted. Re-running it on unchanged notes performs no
+embedding and no writes.
+
+It writes to the Chroma directory directly, around ``chroma_server``, so the
+server's query cache never learns about the change. The default directory is
+therefore not the server's ``./chroma_db``; syncing into a store that the
+server uses must happen while the server is stopped.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Any, Dict, Sequence, Tuple
+
+from .chroma_sync import sync_records
+from .services.knowledge import KnowledgeChunk
+from .services.knowledge import KnowledgeService as NotesService
+
+DEFAULT_COLLECTION = "knowledge-notes"
+# Deliberately not chroma_server's store (./chroma_db).
+DEFAULT_CHROMA_PATH = "./knowledge_chroma_db"
+
+
+def chunk_record(chunk: KnowledgeChunk) -> Tuple[str, Dict[str, Any]]:
+    """Document text (heading plus body) and metadata stored for ``chunk``."""
+    document = f"{chunk.heading}\n\n{chunk.text}" if chunk.heading else chunk.text
+    return document, {"source": chunk.source, "title": chunk.title, "heading": chunk.heading}
+
+
+def sync_notes(collection: Any, notes_dir: str | Path | None = None, **options: Any) -> Dict[str, Any]:
+    """Bring ``collection`` in line with the notes under ``notes_dir``; see :func:`sync_records`."""
+    chunks = NotesService(base_path=notes_dir).chunks()
+    return sync_records(collection, {chunk.id: chunk_record(chunk) for chunk in chunks}, **options)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="sync_knowledge_notes.py", description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", default="loop/knowledge", help="directory of markdown notes")
+    parser.add_argument("--chroma-path", default=DEFAULT_CHROMA_PATH, help="persistent Chroma directory (stop chroma_server before pointing this at its store)")
+    parser.add_argument("--collection", default=DEFAULT_COLLECTION, help="collection to sync into")
+    parser.add_argument("--batch-size", type=int, default=256, help="chunks per upsert")
+    parser.add_argument("--dry-run", action="store_true", help="report the difference without writing")
+    args = parser.parse_args(argv)
+
+    import chromadb
+
+    collection = chromadb.PersistentClient(path=args.chroma_path).get_or_create_collection(args.collection)
+    summary = sync_notes(collection, args.notes, batch_size=args.batch_size, dry_run=args.dry_run)
+    print(json.dumps(summary, indent=2))
+    return 0
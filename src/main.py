@@ -1,31 +1,82 @@
 """Application factory wiring together the API services."""
 from __future__ import annotations
 
+import os
+
 from flask import Flask, jsonify
 
 from src.api.errors import ApiError, ErrorDetail, NotFoundError
 from src.api.routes.knowledge import create_knowledge_blueprint
 from src.api.routes.projects import create_projects_blueprint
+from src.api.routes.search import create_search_blueprint
 from src.api.routes.status import create_status_blueprint
+from src.asset_indexer import DEFAULT_COLLECTION, AssetIndexer
 from src.knowledge_service import KnowledgeService
+from src.knowledge_snapshot import DEFAULT_SNAPSHOT_PATH, CompiledKnowledge
 from src.logger import setup_logger
 from src.project_service import ProjectService
+from src.semantic_service import SemanticSearchService
+from src.services.knowledge import KnowledgeService as NotesService
 from src.store import ProjectStore
 
 
-def create_app() -> Flask:
-    """Create and configure the Flask application."""
+def create_app(*, start_background: bool = False) -> Flask:
+    """Create and configure the Flask application.
+
+    Background threads (the knowledge reload watcher and the asset indexer)
+    are only started when ``start_background`` is set, so building an app for
+    tests or tooling has no side effects; the serving entry points pass ``True``.
+    """
 
     app = Flask(__name__)
     logger = setup_logger()
 
     store = ProjectStore()
     project_service = ProjectService(store)
-    knowledge_service = KnowledgeService()
+    asset_indexer = None
+    asset_index_path = os.getenv("ASSET_INDEX_CHROMA_PATH", "")
+    if asset_index_path:
+        import chromadb
+
+        asset_indexer = AssetIndexer(
+            chromadb.PersistentClient(path=asset_index_path),
+            os.getenv("ASSET_INDEX_COLLECTION", DEFAULT_COLLECTION),
+            flush_interval=float(os.getenv("ASSET_INDEX_FLUSH_INTERVAL", "0.5")),
+        )
+        if start_background:
+            # Without the worker nothing would drain the mutations; its catch-up covers them.
+            project_service.subscribe(asset_indexer.handle)
+            asset_indexer.start(catch_up=project_service.asset_items)
+    compiled = CompiledKnowledge.open(os.getenv("KNOWLEDGE_SNAPSHOT_PATH", DEFAULT_SNAPSHOT_PATH))
+    knowledge_service = KnowledgeService(
+        compiled=compiled,
+        cache_size=int(os.getenv("KNOWLEDGE_SEARCH_CACHE_SIZE", "512")),
+        cache_ttl=float(os.getenv("KNOWLEDGE_SEARCH_CACHE_TTL", "300")),
+    )
+    reload_interval = float(os.getenv("KNOWLEDGE_RELOAD_INTERVAL", "2.0"))
+    if start_background and reload_interval > 0:
+        knowledge_service.start_watching(reload_interval)
+    notes_service = NotesService(compiled=compiled)
+    semantic_service = SemanticSearchService(
+        knowledge_service,
+        notes_service,
+        index_dir=os.getenv("KNOWLEDGE_SEMANTIC_INDEX_DIR", "data/semantic_index"),
+        compiled=compiled,
+    )
+    # Rebuild the semantic index off the request path whenever the watcher reloads.
+    knowledge_service.subscribe(semantic_service.refresh)
 
-    app.register_blueprint(create_status_blueprint())
+    app.register_blueprint(create_status_blueprint(knowledge_service, asset_indexer))
     app.register_blueprint(create_projects_blueprint(project_service))
-    app.register_blueprint(create_knowledge_blueprint(knowledge_service))
+    app.register_blueprint(
+        create_knowledge_blueprint(
+            knowledge_service,
+            notes_service,
+            semantic_service,
+            max_age=int(os.getenv("KNOWLEDGE_CACHE_MAX_AGE", "60")),
+        )
+    )
+    app.register_blueprint(create_search_blueprint(project_service))
 
     @app.errorhandler(ApiError)
     def handle_api_error(exc: ApiError):
@@ -48,4 +99,11 @@ def create_app() -> Flask:
     return app
 
 
-app = create_app()
+def __getattr__(name: str) -> Flask:
+    # ``src.main:app`` is built on first access (e.g. by a WSGI server) rather
+    # than on import, so importing anything under ``src`` never builds services.
+    if name == "app":
+        app = create_app(start_background=True)
+        globals()["app"] = app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,11 +1,13 @@
 """Business logic for manipulating projects and assets."""
 from __future__ import annotations
 
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Dict, List
+from typing import Callable, Dict, Iterator, List, Literal, Tuple
 from uuid import uuid4
 
 from .api.errors import ConflictError, NotFoundError, ValidationError
+from .indexing.assets import AssetSearchIndex
 from .models import Asset, Project
 from .schemas import (
     AssetCreate,
@@ -22,12 +24,45 @@ def _utcnow() -> datetime:
     return datetime.now(timezone.utc)
 
 
+@dataclass(frozen=True)
+class AssetMutation:
+    """An asset that was created/updated (``upsert``) or removed (``delete``) after a successful save."""
+
+    kind: Literal["upsert", "delete"]
+    project_id: str
+    asset_id: str
+    asset: Asset | None = None
+
+
+AssetListener = Callable[[List[AssetMutation]], None]
+
+
 class ProjectService:
     """High level operations for working with projects."""
 
     def __init__(self, store: ProjectStore) -> None:
         self._store = store
         self._projects: Dict[str, Project] = self._store.load()
+        self._search_index = AssetSearchIndex()
+        self._search_index.rebuild(self._projects.values())
+        self._listeners: List[AssetListener] = []
+
+    def subscribe(self, listener: AssetListener) -> None:
+        """Call ``listener`` with the asset mutations of every successful write.
+
+        Listeners run on the request thread, so they should only enqueue work.
+        """
+        self._listeners.append(listener)
+
+    def _emit(self, mutations: List[AssetMutation]) -> None:
+        if not mutations:
+            return
+        for listener in self._listeners:
+            listener(mutations)
+
+    def asset_items(self) -> List[Tuple[str, Asset]]:
+        """Return ``(project_id, asset)`` for every asset in the store."""
+        return [(project.id, asset) for project in list(self._projects.values()) for asset in list(project.assets)]
 
     # ------------------------------------------------------------------
     # Persistence helpers
@@ -43,12 +78,16 @@ class ProjectService:
     # ------------------------------------------------------------------
     # Project operations
     def list_projects(self) -> List[Dict]:
+        return list(self.iter_projects())
+
+    def iter_projects(self) -> Iterator[Dict]:
+        """Yield serialized projects, most recently updated first, one at a time."""
         projects = sorted(
             self._projects.values(),
             key=lambda project: project.updated_at,
             reverse=True,
         )
-        return [project.model_dump(by_alias=True, mode="json") for project in projects]
+        return (project.model_dump(by_alias=True, mode="json") for project in projects)
 
     def create_project(self, payload: Dict) -> Dict:
         data = ProjectCreate.model_validate(payload or {})
@@ -63,6 +102,8 @@ class ProjectService:
 
         self._projects[project.id] = project
         self._save()
+        self._search_index.index_project(project)
+        self._emit([AssetMutation("upsert", project.id, asset.id, asset) for asset in project.assets])
         return project.model_dump(by_alias=True, mode="json")
 
     def get_project(self, project_id: str) -> Dict:
@@ -82,19 +123,33 @@ class ProjectService:
         updated = project.model_copy(update={**updates, "updated_at": _utcnow()}, deep=True)
         self._projects[project_id] = updated
         self._save()
+        if data.assets is not None:
+            self._search_index.index_project(updated)
+            kept = {asset.id for asset in updated.assets}
+            self._emit(
+                [AssetMutation("delete", project_id, asset.id) for asset in project.assets if asset.id not in kept]
+                + [AssetMutation("upsert", project_id, asset.id, asset) for asset in updated.assets]
+            )
         return updated.model_dump(by_alias=True, mode="json")
 
     def delete_project(self, project_id: str) -> None:
         if project_id not in self._projects:
             raise NotFoundError(f"Project '{project_id}' was not found.")
-        del self._projects[project_id]
+        removed = self._projects.pop(project_id)
         self._save()
+        self._search_index.remove_project(project_id)
+        self._emit([AssetMutation("delete", project_id, asset.id) for asset in removed.assets])
 
     # ------------------------------------------------------------------
     # Asset operations
     def list_assets(self, project_id: str) -> List[Dict]:
+        return list(self.iter_assets(project_id))
+
+    def iter_assets(self, project_id: str) -> Iterator[Dict]:
+        """Yield serialized assets lazily; raises ``NotFoundError`` eagerly."""
         project = self._get_project(project_id)
-        return [asset.model_dump(by_alias=True, mode="json") for asset in project.assets]
+        assets = list(project.assets)
+        return (asset.model_dump(by_alias=True, mode="json") for asset in assets)
 
     def add_asset(self, project_id: str, payload: Dict) -> Dict:
         project = self._get_project(project_id)
@@ -111,6 +166,8 @@ class ProjectService:
         project.assets.append(asset)
         project.updated_at = _utcnow()
         self._save()
+        self._search_index.index_asset(project_id, asset)
+        self._emit([AssetMutation("upsert", project_id, asset.id, asset)])
         return asset.model_dump(by_alias=True, mode="json")
 
     def get_asset(self, project_id: str, asset_id: str) -> Dict:
@@ -134,6 +191,8 @@ class ProjectService:
                 project.assets[index] = updated
                 project.updated_at = _utcnow()
                 self._save()
+                self._search_index.index_asset(project_id, updated)
+                self._emit([AssetMutation("upsert", project_id, asset_id, updated)])
                 return updated.model_dump(by_alias=True, mode="json")
         raise NotFoundError(f"Asset '{asset_id}' was not found in project '{project_id}'.")
 
@@ -145,6 +204,43 @@ class ProjectService:
         project.assets = filtered
         project.updated_at = _utcnow()
         self._save()
+        self._search_index.remove_asset(project_id, asset_id)
+        self._emit([AssetMutation("delete", project_id, asset_id)])
+
+    def search_assets(
+        self,
+        query: str,
+        *,
+        project_id: str | None = None,
+        asset_type: str | None = None,
+        limit: int = 20,
+    ) -> Dict:
+        if project_id is not None:
+            self._get_project(project_id)
+        results: List[Dict] = []
+        for hit_project_id, asset_id, score in self._search_index.search(
+            query, project_id=project_id, asset_type=asset_type, limit=limit
+        ):
+            project = self._projects.get(hit_project_id)
+            asset = next((item for item in project.assets if item.id == asset_id), None) if project else None
+            if asset is None:
+                continue
+            enriched = asset.model_dump(by_alias=True, mode="json")
+            enriched["projectId"] = hit_project_id
+            enriched["score"] = score
+            results.append(enriched)
+        return {"query": query, "results": results}
+
+    def suggest_asset_names(self, query: str, *, project_id: str | None = None, limit: int = 10) -> Dict:
+        if project_id is not None:
+            self._get_project(project_id)
+        suggestions = [
+            {"text": name, "projectId": hit_project_id, "assetId": asset_id, "score": score}
+            for hit_project_id, asset_id, name, score in self._search_index.suggest_names(
+                query, project_id=project_id, limit=limit
+            )
+        ]
+        return {"query": query, "suggestions": suggestions}
 
     # ------------------------------------------------------------------
     # Timelines & generation
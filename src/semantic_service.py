@@ -0,0 +1,200 @@
+"""Semantic (LSA) search across knowledge entries and markdown notes."""
+from __future__ import annotations
+
+import hashlib
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Lock, RLock, Thread
+from typing import Any, Dict, List, Sequence, Tuple
+
+from .indexing.semantic import DEFAULT_DIMENSIONS, SemanticIndex, hybrid_scores
+from .knowledge_service import KnowledgeService, KnowledgeSnapshot
+from .knowledge_snapshot import CompiledKnowledge
+from .services.knowledge import KnowledgeChunk
+from .services.knowledge import KnowledgeService as NotesService
+
+logger = logging.getLogger("flask-api-service")
+
+SEARCH_MODES = ("semantic", "hybrid")
+
+
+def _entry_id(position: int) -> str:
+    return f"entry:{position}"
+
+
+def _note_id(chunk_id: str) -> str:
+    return f"note:{chunk_id}"
+
+
+def source_hash(documents: Sequence[Tuple[str, str]]) -> str:
+    digest = hashlib.sha256()
+    for doc_id, text in documents:
+        digest.update(doc_id.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(text.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def collect_documents(snapshot: KnowledgeSnapshot, chunks: Sequence[KnowledgeChunk]) -> List[Tuple[str, str]]:
+    """Return ``(doc_id, text)`` pairs for every entry and note chunk."""
+    documents = [
+        (_entry_id(position), f"{entry.get('question', '')}\n{entry.get('answer', '')}")
+        for position, entry in enumerate(snapshot.entries)
+    ]
+    documents.extend((_note_id(chunk.id), f"{chunk.heading}\n{chunk.text}") for chunk in chunks)
+    return documents
+
+
+@dataclass(frozen=True)
+class _State:
+    snapshot: KnowledgeSnapshot
+    notes_version: object
+    chunks: Dict[str, KnowledgeChunk]
+    index: SemanticIndex
+
+    def serves(self, snapshot: KnowledgeSnapshot, notes_version: object) -> bool:
+        return self.snapshot is snapshot and self.notes_version is notes_version
+
+
+class SemanticSearchService:
+    """Keeps a :class:`SemanticIndex` in step with both knowledge sources.
+
+    The first index is built on first use. After that, a change to the
+    knowledge snapshot or the notes payload starts a rebuild in a background
+    thread (see :meth:`refresh`) and searches keep using the previous index
+    until the new one is swapped in. The first index comes from ``compiled``
+    when its source hash matches; otherwise, with ``index_dir`` set, vectors
+    are persisted as memory-mapped float32 arrays and reused across restarts
+    while the source hash still matches.
+    """
+
+    def __init__(
+        self,
+        knowledge: KnowledgeService,
+        notes: NotesService | None = None,
+        *,
+        index_dir: str | Path | None = None,
+        dimensions: int = DEFAULT_DIMENSIONS,
+        compiled: CompiledKnowledge | None = None,
+    ) -> None:
+        self.knowledge = knowledge
+        self.notes = notes
+        self.index_dir = Path(index_dir) if index_dir else None
+        self.dimensions = dimensions
+        self._compiled = compiled
+        self._state: _State | None = None
+        self._failed: Tuple[KnowledgeSnapshot, object] | None = None
+        self._lock = RLock()
+        self._rebuild_lock = Lock()
+        self._rebuilder: Thread | None = None
+
+    def _sources(self) -> Tuple[KnowledgeSnapshot, object]:
+        return self.knowledge.snapshot(), self.notes.load() if self.notes is not None else None
+
+    def _build(self, snapshot: KnowledgeSnapshot, notes_version: object) -> _State:
+        chunks = self.notes.chunks() if self.notes is not None else []
+        documents = collect_documents(snapshot, chunks)
+        digest = source_hash(documents)
+        compiled, self._compiled = self._compiled, None
+        index = compiled.semantic_index(digest) if compiled is not None else None
+        if index is None and self.index_dir:
+            index = SemanticIndex.load(self.index_dir)
+        if index is None or index.source_hash != digest:
+            index = SemanticIndex.build(documents, dimensions=self.dimensions, source_hash=digest)
+            if self.index_dir:
+                try:
+                    index.save(self.index_dir)
+                except OSError as exc:
+                    logger.warning("Could not persist semantic index to %s: %s", self.index_dir, exc)
+        return _State(
+            snapshot=snapshot,
+            notes_version=notes_version,
+            chunks={chunk.id: chunk for chunk in chunks},
+            index=index,
+        )
+
+    def _current(self, *, wait: bool = False) -> _State:
+        """Return the state to serve; a stale one is kept, and rebuilt in the background, unless ``wait``."""
+        state = self._state
+        snapshot, notes_version = self._sources()
+        if state is not None and state.serves(snapshot, notes_version):
+            return state
+        if state is not None and not wait:
+            failed = self._failed
+            if failed is None or failed[0] is not snapshot or failed[1] is not notes_version:
+                self.refresh()
+            return state
+        with self._lock:
+            state = self._state
+            if state is None or not state.serves(snapshot, notes_version):
+                state = self._state = self._build(snapshot, notes_version)
+            return state
+
+    def refresh(self) -> None:
+        """Rebuild the index in a background thread if either source changed since the last build.
+
+        Meant as the knowledge reload hook; it only starts the thread, and at
+        most one rebuild runs at a time.
+        """
+        with self._rebuild_lock:
+            if self._rebuilder is not None and self._rebuilder.is_alive():
+                return
+            self._rebuilder = Thread(target=self._rebuild, name="semantic-rebuild", daemon=True)
+            self._rebuilder.start()
+
+    def _rebuild(self) -> None:
+        # Loop until the installed index matches the sources, so a change that
+        # lands mid-build is picked up without another trigger.
+        while True:
+            snapshot, notes_version = self._sources()
+            with self._lock:
+                state = self._state
+                if state is not None and state.serves(snapshot, notes_version):
+                    return
+                try:
+                    self._state = self._build(snapshot, notes_version)
+                except Exception:
+                    self._failed = (snapshot, notes_version)
+                    logger.exception("Keeping the previous semantic index; rebuilding it failed")
+                    return
+                self._failed = None
+
+    def index(self) -> SemanticIndex:
+        """Return the index for the current knowledge and notes, waiting for a rebuild if needed."""
+        return self._current(wait=True).index
+
+    def _lexical(self, state: _State, query: str) -> Dict[str, float]:
+        scores = {_entry_id(position): score for position, score in state.snapshot.index.rank(query).items()}
+        if self.notes is not None:
+            scores.update((_note_id(chunk_id), score) for chunk_id, score in self.notes.rank_chunks(query).items())
+        return scores
+
+    def _describe(self, state: _State, doc_id: str) -> Dict[str, Any] | None:
+        kind, _, key = doc_id.partition(":")
+        if kind == "entry":
+            return {"kind": "entry", **state.snapshot.entries[int(key)]}
+        chunk = state.chunks.get(key)
+        return {"kind": "note", **chunk.to_dict()} if chunk is not None else None
+
+    def search(self, query: str, *, k: int = 10, mode: str = "semantic", alpha: float = 0.5) -> Dict[str, Any]:
+        """Return the top ``k`` documents by cosine similarity, or blended with BM25 in ``hybrid`` mode."""
+        state = self._current()
+        if mode == "hybrid":
+            semantic = dict(state.index.query(query, k=max(k * 5, 50)))
+            ranked = sorted(hybrid_scores(semantic, self._lexical(state, query), alpha=alpha).items(), key=lambda item: item[1], reverse=True)
+        else:
+            ranked = state.index.query(query, k=k)
+
+        results: List[Dict[str, Any]] = []
+        for doc_id, score in ranked:
+            described = self._describe(state, doc_id)
+            if described is None:
+                continue
+            described["id"] = doc_id
+            described["score"] = round(float(score), 6)
+            results.append(described)
+            if len(results) >= k:
+                break
+        return {"query": query, "mode": mode, "results": results}
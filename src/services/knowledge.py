@@ -1,23 +1,245 @@
 """Service for loading the film production knowledge base."""
 from __future__ import annotations
 
+import logging
+import math
+import re
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List
+from threading import RLock
+from typing import Any, Dict, List, Tuple
+
+from src.indexing.inverted import InvertedIndex
+from src.indexing.text import analyze
+from src.indexing.trigram import TrigramIndex
+from src.knowledge_snapshot import CompiledKnowledge, digest_files
+
+logger = logging.getLogger("flask-api-service")
+
+KNOWN_FILES: Dict[str, str] = {
+    "cameraMovements": "camera_movement_notes.md",
+    "filmTechniques": "film_techniques_notes.md",
+    "storyStructures": "story_structures_notes.md",
+    "sceneWritingTechniques": "scene_writing_and_opening_hooks.md",
+    "screenplayArchetypes": "screenplay_conventions_and_archetypes.md",
+    "screenwritingDay6": "screenwriting_day6_notes.md",
+    "screenwritingLogline": "screenwriting_logline_plot_exposure_notes.md",
+    "storyIdeaGeneration": "story_idea_generation_notes.md",
+    "subtextNotes": "subtext_notes.md",
+    "fracturedLoop": "fractured_loop_build_system_notes.md",
+}
+
+# (st_mtime_ns, st_size) of a source file, or None when it does not exist.
+Signature = Tuple[int, int] | None
+
+MAX_CHUNK_CHARS = 1500
+CHARS_PER_TOKEN = 4
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_SLUG_RE = re.compile(r"[^a-z0-9]+")
+
+
+@dataclass(frozen=True)
+class KnowledgeChunk:
+    """A heading-delimited section of one markdown note."""
+
+    id: str
+    source: str
+    title: str
+    heading: str
+    text: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "source": self.source, "title": self.title, "heading": self.heading, "text": self.text}
+
+
+@dataclass(frozen=True)
+class _ParsedNote:
+    signature: Signature
+    markdown: str
+    items: List[str]
+    chunks: Tuple[KnowledgeChunk, ...] = ()
+
+
+def _key_for(filename: str) -> str:
+    """Derive a payload key for markdown files that are not in ``KNOWN_FILES``."""
+    words = [word for word in Path(filename).stem.replace("-", "_").split("_") if word]
+    if not words:
+        return Path(filename).stem
+    return words[0].lower() + "".join(word[:1].upper() + word[1:] for word in words[1:])
+
+
+def _payload_key(filename: str) -> str:
+    for key, known in KNOWN_FILES.items():
+        if known == filename:
+            return key
+    return _key_for(filename)
+
+
+def _title_for(filename: str) -> str:
+    return filename.replace("_", " ").replace(".md", "").title()
+
+
+def _slug(text: str) -> str:
+    return _SLUG_RE.sub("-", text.casefold()).strip("-") or "section"
+
+
+def _split_long(text: str, limit: int) -> List[str]:
+    """Split ``text`` on paragraph, then line boundaries into pieces of at most ``limit`` chars."""
+    if len(text) <= limit:
+        return [text]
+    pieces: List[str] = []
+    current = ""
+    for block in re.split(r"\n\s*\n", text):
+        parts = [block] if len(block) <= limit else block.splitlines()
+        for part in parts:
+            while len(part) > limit:
+                pieces.append(part[:limit])
+                part = part[limit:]
+            separator = "\n\n" if block is part else "\n"
+            if current and len(current) + len(separator) + len(part) > limit:
+                pieces.append(current)
+                current = ""
+            current = f"{current}{separator}{part}" if current else part
+    if current:
+        pieces.append(current)
+    return [piece.strip() for piece in pieces if piece.strip()]
+
+
+def chunk_markdown(filename: str, markdown: str, *, max_chars: int = MAX_CHUNK_CHARS) -> List[KnowledgeChunk]:
+    """Split a note into heading-delimited chunks with stable ids.
+
+    Ids have the form ``<file stem>/<heading slug>``; repeated headings get a
+    ``-2``, ``-3`` suffix and sections longer than ``max_chars`` are split into
+    ``.1``, ``.2`` parts, so ids only change when the note's structure does.
+    """
+
+    stem = Path(filename).stem
+    title = _title_for(filename)
+    sections: List[Tuple[str, List[str]]] = [("", [])]
+    for line in markdown.splitlines():
+        match = _HEADING_RE.match(line.strip())
+        if match:
+            sections.append((match.group(2).strip(), []))
+        else:
+            sections[-1][1].append(line)
+
+    chunks: List[KnowledgeChunk] = []
+    seen: Dict[str, int] = {}
+    for heading, lines in sections:
+        body = "\n".join(lines).strip()
+        if not body and not heading:
+            continue
+        slug = _slug(heading) if heading else "intro"
+        seen[slug] = seen.get(slug, 0) + 1
+        base_id = f"{stem}/{slug}" if seen[slug] == 1 else f"{stem}/{slug}-{seen[slug]}"
+        parts = _split_long(body, max_chars) or [""]
+        for index, part in enumerate(parts, start=1):
+            chunk_id = base_id if len(parts) == 1 else f"{base_id}.{index}"
+            chunks.append(KnowledgeChunk(id=chunk_id, source=filename, title=title, heading=heading, text=part))
+    return chunks
+
+
+def _chunk_cost(chunk: KnowledgeChunk, unit: str) -> int:
+    chars = len(chunk.heading) + len(chunk.text) + 1
+    return math.ceil(chars / CHARS_PER_TOKEN) if unit == "tokens" else chars
 
 
 class KnowledgeService:
-    """Loads markdown snippets and exposes structured knowledge categories."""
+    """Loads markdown snippets and exposes structured knowledge categories.
 
-    def __init__(self, *, base_path: str | Path | None = None) -> None:
+    Parsed notes are cached per file and keyed by modification time and size, so
+    ``load`` only re-reads files that changed and returns the memoized payload
+    when none did. Markdown files added to the directory are picked up
+    automatically under a camelCase key derived from their filename. The first
+    load seeds the cache and indexes from ``compiled`` when its source hash
+    still matches the notes on disk.
+    """
+
+    def __init__(self, *, base_path: str | Path | None = None, compiled: CompiledKnowledge | None = None) -> None:
         repo_root = Path(__file__).resolve().parents[2]
         knowledge_root = Path(base_path) if base_path else repo_root / "loop" / "knowledge"
         self.base_path = knowledge_root
+        self._notes: Dict[str, _ParsedNote] = {}
+        self._payload: Dict[str, Any] | None = None
+        self._payload_key: Tuple[Tuple[str, str, Signature], ...] | None = None
+        self._chunks: Dict[str, KnowledgeChunk] = {}
+        self._chunk_index = InvertedIndex(analyzer=analyze)
+        self._item_index = TrigramIndex()
+        self._compiled = compiled
+        self._lock = RLock()
+
+    def _signature(self, filename: str) -> Signature:
+        try:
+            stat = (self.base_path / filename).stat()
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _sources(self) -> Tuple[Tuple[str, str, Signature], ...]:
+        """Return ``(key, filename, signature)`` for known files, then any extra notes."""
+        sources = [(key, filename, self._signature(filename)) for key, filename in KNOWN_FILES.items()]
+        known = set(KNOWN_FILES.values())
+        if self.base_path.is_dir():
+            extra = sorted(path.name for path in self.base_path.glob("*.md") if path.name not in known)
+            sources.extend((_key_for(filename), filename, self._signature(filename)) for filename in extra)
+        return tuple(sources)
+
+    def source_hash(self) -> str:
+        return digest_files(self.base_path / filename for _, filename, _ in self._sources())
+
+    def compiled_state(self) -> Dict[str, Any]:
+        """Return the parsed notes and indexes in the form stored by the knowledge snapshot."""
+        with self._lock:
+            self.load()
+            return {
+                "notes": {filename: (note.markdown, note.items, note.chunks) for filename, note in self._notes.items()},
+                "chunkIndex": self._chunk_index,
+                "itemIndex": self._item_index,
+            }
 
-    def _read_markdown(self, relative_path: str) -> str:
-        file_path = self.base_path / relative_path
-        if not file_path.exists():
-            return ""
-        return file_path.read_text(encoding="utf-8")
+    def _restore_compiled(self, sources: Tuple[Tuple[str, str, Signature], ...]) -> None:
+        compiled, self._compiled = self._compiled, None
+        if compiled is None or self._notes:
+            return
+        state = compiled.section("notes", digest_files(self.base_path / filename for _, filename, _ in sources))
+        if state is None:
+            logger.info("Compiled knowledge snapshot %s is stale; parsing notes in %s", compiled.path, self.base_path)
+            return
+        signatures = {filename: signature for _, filename, signature in sources}
+        for filename, (markdown, items, chunks) in state["notes"].items():
+            self._notes[filename] = _ParsedNote(signature=signatures.get(filename), markdown=markdown, items=items, chunks=chunks)
+            self._chunks.update((chunk.id, chunk) for chunk in chunks)
+        self._chunk_index = state["chunkIndex"]
+        self._item_index = state["itemIndex"]
+
+    def _parse(self, filename: str, signature: Signature) -> _ParsedNote:
+        cached = self._notes.get(filename)
+        if cached is not None and cached.signature == signature:
+            return cached
+        markdown = (self.base_path / filename).read_text(encoding="utf-8") if signature is not None else ""
+        note = _ParsedNote(
+            signature=signature,
+            markdown=markdown,
+            items=self._extract_list_items(markdown),
+            chunks=tuple(chunk_markdown(filename, markdown)),
+        )
+        self._unindex(filename, cached)
+        for chunk in note.chunks:
+            self._chunks[chunk.id] = chunk
+            self._chunk_index.add(chunk.id, (chunk.title, chunk.heading, chunk.text))
+        for item in note.items:
+            self._item_index.add((filename, item), item)
+        self._notes[filename] = note
+        return note
+
+    def _unindex(self, filename: str, note: _ParsedNote | None) -> None:
+        if note is None:
+            return
+        for chunk in note.chunks:
+            self._chunks.pop(chunk.id, None)
+            self._chunk_index.remove(chunk.id)
+        for item in note.items:
+            self._item_index.remove((filename, item))
 
     @staticmethod
     def _extract_list_items(markdown: str) -> List[str]:
@@ -32,34 +254,73 @@ class KnowledgeService:
                 candidate = stripped[3:].strip()
                 if 0 < len(candidate) < 80:
                     items.append(candidate)
-        seen = []
-        for item in items:
-            if item not in seen:
-                seen.append(item)
-        return seen
+        return list(dict.fromkeys(items))
 
     def load(self) -> Dict[str, Any]:
-        files = {
-            "cameraMovements": "camera_movement_notes.md",
-            "filmTechniques": "film_techniques_notes.md",
-            "storyStructures": "story_structures_notes.md",
-            "sceneWritingTechniques": "scene_writing_and_opening_hooks.md",
-            "screenplayArchetypes": "screenplay_conventions_and_archetypes.md",
-            "screenwritingDay6": "screenwriting_day6_notes.md",
-            "screenwritingLogline": "screenwriting_logline_plot_exposure_notes.md",
-            "storyIdeaGeneration": "story_idea_generation_notes.md",
-            "subtextNotes": "subtext_notes.md",
-            "fracturedLoop": "fractured_loop_build_system_notes.md",
-        }
-
-        payload: Dict[str, Any] = {}
-        full_context_parts: List[str] = ["# Film Production Knowledge Base\n"]
-
-        for key, filename in files.items():
-            markdown = self._read_markdown(filename)
-            payload[key] = self._extract_list_items(markdown)
-            title = filename.replace("_", " ").replace(".md", "").title()
-            full_context_parts.append(f"## {title}\n{markdown}\n")
-
-        payload["fullContext"] = "\n".join(full_context_parts).strip()
-        return payload
+        """Return the knowledge payload; the same object is returned until a note changes."""
+        with self._lock:
+            sources = self._sources()
+            if self._payload is not None and sources == self._payload_key:
+                return self._payload
+            self._restore_compiled(sources)
+
+            payload: Dict[str, Any] = {}
+            full_context_parts: List[str] = ["# Film Production Knowledge Base\n"]
+            for key, filename, signature in sources:
+                note = self._parse(filename, signature)
+                payload[key] = note.items
+                full_context_parts.append(f"## {_title_for(filename)}\n{note.markdown}\n")
+
+            live = {filename for _, filename, _ in sources}
+            for filename in list(self._notes):
+                if filename not in live:
+                    self._unindex(filename, self._notes.pop(filename))
+
+            payload["fullContext"] = "\n".join(full_context_parts).strip()
+            self._payload = payload
+            self._payload_key = sources
+            return payload
+
+    def chunks(self) -> List[KnowledgeChunk]:
+        """Return every chunk of the current notes in source order."""
+        with self._lock:
+            self.load()
+            return [chunk for note in self._notes.values() for chunk in note.chunks]
+
+    def rank_chunks(self, query: str) -> Dict[str, float]:
+        """Return unsorted BM25 scores keyed by chunk id."""
+        with self._lock:
+            self.load()
+            return self._chunk_index.rank(query)
+
+    def context(self, query: str, *, budget: int, unit: str = "chars") -> Dict[str, Any]:
+        """Return the best-ranked chunks for ``query`` whose combined size fits ``budget``.
+
+        ``unit`` is ``"chars"`` or ``"tokens"`` (estimated as four characters per
+        token). Chunks that do not fit are skipped in favour of smaller,
+        lower-ranked ones rather than truncated.
+        """
+
+        with self._lock:
+            self.load()
+            hits = self._chunk_index.search(query)
+            selected: List[Dict[str, Any]] = []
+            used = 0
+            for hit in hits:
+                chunk = self._chunks[hit.doc_id]
+                cost = _chunk_cost(chunk, unit)
+                if used + cost > budget:
+                    continue
+                used += cost
+                selected.append({**chunk.to_dict(), "score": hit.score})
+        return {"query": query, "budget": budget, "unit": unit, "used": used, "matched": len(hits), "chunks": selected}
+
+    def suggest(self, query: str, *, limit: int = 10) -> List[Dict[str, Any]]:
+        """Typo-tolerant completions drawn from the extracted list items of every note."""
+        with self._lock:
+            self.load()
+            matches = self._item_index.suggest(query, limit=limit)
+        return [
+            {"text": match.text, "kind": "item", "key": _payload_key(match.key[0]), "source": match.key[0], "score": match.score}
+            for match in matches
+        ]
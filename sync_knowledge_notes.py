@@ -0,0 +1,12 @@
+"""Re-index changed knowledge notes into Chroma.
+
+Usage: ``python sync_knowledge_notes.py [--dry-run]`` (see ``--help``).
+"""
+from __future__ import annotations
+
+import sys
+
+from src.knowledge_sync import main
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,31 @@
+import pytest
+
+
+class CountingEmbed:
+    """Deterministic 3-d embedding function that records every text it embeds.
+
+    Usable as a plain ``embed`` callable and as a Chroma embedding function.
+    """
+
+    def __init__(self, name="counting"):
+        self._name = name
+        self.embedded = []
+        self.calls = []
+
+    def name(self):
+        return self._name
+
+    @staticmethod
+    def is_legacy():
+        return True
+
+    def __call__(self, input):
+        self.calls.append(list(input))
+        self.embedded.extend(input)
+        return [[float(len(text)), float(text.count("a")), 1.0] for text in input]
+
+
+@pytest.fixture
+def counting_embed():
+    """Factory for :class:`CountingEmbed` instances."""
+    return CountingEmbed
@@ -0,0 +1,93 @@
+import sys
+import threading
+from pathlib import Path
+
+import chromadb
+import pytest
+
+# Ensure the application package is importable when running tests directly.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.asset_indexer import AssetIndexer
+from src.project_service import ProjectService
+from src.store import ProjectStore
+
+
+@pytest.fixture
+def chroma(tmp_path):
+    return chromadb.PersistentClient(path=str(tmp_path / "chroma"))
+
+
+@pytest.fixture
+def service(tmp_path):
+    return ProjectService(ProjectStore(tmp_path / "projects.json"))
+
+
+def _indexer(chroma, service, embed, **kwargs):
+    indexer = AssetIndexer(chroma, "test-assets", embed=embed, **kwargs)
+    service.subscribe(indexer.handle)
+    return indexer
+
+
+def test_mutations_are_batched_and_unchanged_assets_skipped(chroma, service, counting_embed):
+    embed = counting_embed()
+    indexer = _indexer(chroma, service, embed)
+    service.create_project({"id": "p-1", "assets": [{"id": "a-1", "content": "Rain on glass", "tags": ["noir"]}]})
+    service.add_asset("p-1", {"id": "a-2", "content": "Sunrise", "summary": "Opening"})
+    service.update_asset("p-1", "a-2", {"content": "Sunset"})
+
+    assert indexer.flush() == 2
+    stored = indexer.collection().get(include=["documents", "metadatas"])
+    assert stored["ids"] == ["p-1:a-1", "p-1:a-2"]
+    assert stored["documents"] == ["Rain on glass\n\nnoir", "Opening\n\nSunset"]
+    assert {key: stored["metadatas"][1][key] for key in ("id", "projectId")} == {"id": "a-2", "projectId": "p-1"}
+
+    service.update_asset("p-1", "a-1", {"name": "Renamed only in title"})
+    service.update_asset("p-1", "a-2", {"content": "Sunset"})
+    service.delete_asset("p-1", "a-1")
+    assert indexer.flush() == 1
+    assert indexer.collection().get()["ids"] == ["p-1:a-2"]
+    assert indexer.stats()["skipped"] == 1
+    assert embed.embedded == ["Rain on glass\n\nnoir", "Opening\n\nSunset"]
+
+
+def test_catch_up_reconciles_changes_made_while_stopped(chroma, service, tmp_path, counting_embed):
+    first = _indexer(chroma, service, counting_embed())
+    service.create_project({"id": "p-1", "assets": [{"id": f"a-{i}", "content": f"scene {i}"} for i in range(3)]})
+    first.flush()
+
+    # Edits made while no indexer is subscribed, then a restart.
+    service = ProjectService(ProjectStore(tmp_path / "projects.json"))
+    service.update_asset("p-1", "a-0", {"content": "scene zero, rewritten"})
+    service.delete_asset("p-1", "a-1")
+    service.add_asset("p-1", {"id": "a-3", "content": "scene 3"})
+    embed = counting_embed()
+    restarted = _indexer(chroma, service, embed)
+
+    assert restarted.catch_up(service.asset_items) == 3
+    assert sorted(restarted.collection().get()["ids"]) == ["p-1:a-0", "p-1:a-2", "p-1:a-3"]
+    assert embed.embedded == ["scene zero, rewritten", "scene 3"]
+    assert restarted.catch_up(service.asset_items) == 0
+
+
+def test_background_thread_keeps_writes_off_the_request_path(chroma, service, counting_embed):
+    flushed = threading.Event()
+    embed = counting_embed()
+
+    def slow_embed(documents):
+        flushed.set()
+        return embed(documents)
+
+    indexer = _indexer(chroma, service, slow_embed, flush_interval=0.01)
+    indexer.start(catch_up=service.asset_items)
+    try:
+        service.create_project({"id": "p-1", "assets": [{"id": "a-1", "content": "Rain"}]})
+        assert flushed.wait(5)
+    finally:
+        indexer.stop()
+
+    assert indexer.collection().get()["ids"] == ["p-1:a-1"]
+    assert indexer.stats()["running"] is False
+    service.delete_project("p-1")
+    assert indexer.flush() == 1
+    assert indexer.collection().count() == 0
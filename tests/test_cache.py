@@ -0,0 +1,49 @@
+import sys
+from pathlib import Path
+
+# Ensure the application package is importable when running tests directly.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.cache import LRUCache
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2, ttl=None)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats() | {"hitRate": None} == {
+        "size": 2,
+        "maxsize": 2,
+        "ttl": None,
+        "hits": 3,
+        "misses": 1,
+        "evictions": 1,
+        "expirations": 0,
+        "hitRate": None,
+    }
+
+
+def test_lru_cache_expires_entries_after_ttl():
+    now = [0.0]
+    cache = LRUCache(maxsize=4, ttl=10.0, clock=lambda: now[0])
+    cache.put("a", 1)
+
+    now[0] = 9.0
+    assert cache.get("a") == 1
+    now[0] = 10.5
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+    assert len(cache) == 0
+
+
+def test_lru_cache_with_zero_size_stores_nothing():
+    cache = LRUCache(maxsize=0)
+    cache.put("a", 1)
+
+    assert cache.get("a") is None
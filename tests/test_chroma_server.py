@@ -1,7 +1,15 @@
+import asyncio
+import base64
+import importlib.util
+import json
+import os
 import sys
+import threading
 from pathlib import Path
 
 import chromadb
+import httpx
+import numpy as np
 import pytest
 from fastapi.testclient import TestClient
 
@@ -118,3 +126,542 @@ def test_collection_not_found_returns_404(api_client, method, path, payload):
 
     assert response.status_code == 404
     assert "missing" in response.json()["detail"].lower()
+
+
+def test_saturated_executor_returns_503_with_retry_after(api_client, monkeypatch):
+    client, _ = api_client
+    # Created first so its handle is cached and the page read itself hits the full pool.
+    client.post("/collections/busy")
+    executor = chroma_server.ChromaExecutor("test-read", workers=1, max_queue=0, retry_after=3)
+    monkeypatch.setattr(chroma_server, "read_executor", executor)
+    started, release = threading.Event(), threading.Event()
+
+    def block():
+        started.set()
+        release.wait(5)
+
+    worker = threading.Thread(target=lambda: asyncio.run(executor.run(block)))
+    worker.start()
+    try:
+        assert started.wait(5)
+        busy = client.get("/collections")
+        page = client.get("/collections/busy/documents")
+        root = client.get("/")
+    finally:
+        release.set()
+        worker.join()
+
+    assert busy.status_code == 503
+    assert busy.headers["Retry-After"] == "3"
+    assert (page.status_code, page.headers["Retry-After"]) == (503, "3")
+    assert root.status_code == 200
+    assert executor.stats()["rejected"] == 2
+    assert client.get("/collections").status_code == 200
+
+
+def test_cancelled_calls_hold_their_executor_slot_until_the_thread_finishes():
+    executor = chroma_server.ChromaExecutor("test-cancel", workers=1, max_queue=0)
+    started, release = threading.Event(), threading.Event()
+
+    def block():
+        started.set()
+        release.wait(5)
+
+    async def cancel_while_running():
+        task = asyncio.ensure_future(executor.run(block))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        pending = executor.stats()["pending"]
+        with pytest.raises(chroma_server.HTTPException):
+            await executor.run(block)
+        return pending
+
+    try:
+        assert asyncio.run(cancel_while_running()) == 1
+    finally:
+        release.set()
+    executor._pool.shutdown(wait=True)
+    assert executor.stats() == {"workers": 1, "maxQueue": 0, "pending": 0, "rejected": 1}
+
+
+def test_collection_handles_are_cached_and_invalidated(api_client, monkeypatch):
+    client, _ = api_client
+    cache = chroma_server.CollectionCache(maxsize=4)
+    monkeypatch.setattr(chroma_server, "collection_cache", cache)
+
+    client.post("/collections/cached-one")
+    lookups = []
+    get_collection = chroma_server.client.get_collection
+    monkeypatch.setattr(chroma_server.client, "get_collection", lambda **kwargs: lookups.append(kwargs) or get_collection(**kwargs))
+
+    assert client.get("/collections/cached-one").status_code == 200
+    assert client.get("/collections/cached-one").status_code == 200
+    assert lookups == []
+
+    renamed = client.patch("/collections/cached-one", json={"name": "cached-two"})
+    assert renamed.status_code == 200
+    assert client.get("/collections/cached-one").status_code == 404
+    assert client.get("/collections/cached-two").json()["name"] == "cached-two"
+
+    assert client.delete("/collections/cached-two").status_code == 200
+    assert client.get("/collections/cached-two").status_code == 404
+    assert client.delete("/collections/cached-two").status_code == 404
+    assert cache.stats()["size"] == 0
+
+
+def test_collection_cache_evicts_least_recently_used():
+    cache = chroma_server.CollectionCache(maxsize=2)
+    owner = object()
+
+    class Handle:
+        def __init__(self, name):
+            self.name = name
+
+    for name in ("one", "two", "three"):
+        cache.remember(owner, Handle(name))
+
+    assert cache.get(owner, "one") is None
+    assert cache.get(owner, "three").name == "three"
+    assert cache.get(object(), "three") is None
+    assert cache.stats()["evictions"] == 1
+
+
+def _ndjson(records):
+    return "\n".join(json.dumps(record) for record in records) + "\n"
+
+
+def _records(count, start=0):
+    return [
+        {"id": f"doc-{i}", "document": f"document {i}", "metadata": {"n": i} if i % 2 else None, "embedding": [1.0, i / 10, 0.0]}
+        for i in range(start, start + count)
+    ]
+
+
+def test_ndjson_ingest_upserts_in_batches(api_client):
+    client, _ = api_client
+    client.post("/collections/ingest-target")
+
+    response = client.post(
+        "/collections/ingest-target/ingest?batch_size=3&max_in_flight=2",
+        content=_ndjson(_records(10)),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+
+    assert response.status_code == 200
+    summary = response.json()
+    assert summary["received"] == summary["ingested"] == 10
+    assert [(batch["batch"], batch["count"], batch["status"]) for batch in summary["batches"]] == [
+        (0, 3, "ok"),
+        (1, 3, "ok"),
+        (2, 3, "ok"),
+        (3, 1, "ok"),
+    ]
+    assert summary["batches"][3]["firstId"] == "doc-9"
+
+    retry = client.post("/collections/ingest-target/ingest", content=_ndjson(_records(10)))
+    assert retry.status_code == 200
+    assert client.get("/collections/ingest-target").json()["count"] == 10
+
+
+def test_ndjson_ingest_stops_at_malformed_line(api_client):
+    client, _ = api_client
+    client.post("/collections/ingest-broken")
+    body = _ndjson(_records(4)) + "{not json}\n" + _ndjson(_records(2, start=4))
+
+    response = client.post("/collections/ingest-broken/ingest?batch_size=3", content=body)
+
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Line 5")
+    assert response.json()["ingested"] == 4
+    assert client.get("/collections/ingest-broken").json()["count"] == 4
+    assert client.post("/collections/missing/ingest", content=_ndjson(_records(1))).status_code == 404
+
+
+def test_ndjson_ingest_keeps_last_record_per_id_and_warns_on_bad_data(api_client, caplog):
+    client, _ = api_client
+    client.post("/collections/ingest-dupes")
+    records = _records(3) + [{"id": "doc-1", "document": "doc one, revised", "embedding": [1.0, 0.5, 0.0]}]
+    bad = [{"id": "short", "document": "two dims", "embedding": [1.0, 0.0]}]
+
+    response = client.post("/collections/ingest-dupes/ingest?batch_size=10", content=_ndjson(records))
+    with caplog.at_level("WARNING", logger="chroma_server"):
+        rejected = client.post("/collections/ingest-dupes/ingest", content=_ndjson(bad))
+
+    assert response.status_code == 200 and response.json()["ingested"] == 3
+    stored = client.get("/collections/ingest-dupes/documents").json()
+    assert dict(zip(stored["ids"], stored["documents"]))["doc-1"] == "doc one, revised"
+    assert rejected.status_code == 207
+    assert [record.levelname for record in caplog.records] == ["WARNING"]
+    assert "(short..short)" in caplog.records[0].getMessage() and not caplog.records[0].exc_info
+
+
+def test_ndjson_ingest_keeps_last_record_per_id_across_concurrent_batches(api_client, monkeypatch):
+    client, _ = api_client
+    client.post("/collections/ingest-order")
+    upsert_batch = chroma_server._upsert_batch
+
+    def slow_first_batch(collection, records):
+        if records[0]["document"] == "first":
+            threading.Event().wait(0.2)
+        upsert_batch(collection, records)
+
+    monkeypatch.setattr(chroma_server, "_upsert_batch", slow_first_batch)
+    records = [
+        {"id": "doc-1", "document": "first", "embedding": [1.0, 0.0, 0.0]},
+        {"id": "doc-2", "document": "other", "embedding": [0.0, 1.0, 0.0]},
+        {"id": "doc-1", "document": "second", "embedding": [1.0, 0.1, 0.0]},
+        {"id": "doc-3", "document": "third", "embedding": [0.0, 0.0, 1.0]},
+    ]
+
+    response = client.post("/collections/ingest-order/ingest?batch_size=2&max_in_flight=2", content=_ndjson(records))
+
+    assert response.status_code == 200 and response.json()["ingested"] == 4
+    stored = client.get("/collections/ingest-order/documents").json()
+    assert dict(zip(stored["ids"], stored["documents"]))["doc-1"] == "second"
+
+
+def test_query_results_are_cached_until_the_collection_changes(api_client, monkeypatch):
+    client, _ = api_client
+    cache = chroma_server.OwnedLRUCache(maxsize=8)
+    monkeypatch.setattr(chroma_server, "query_cache", cache)
+    client.post("/collections/query-cache")
+    client.post("/collections/query-cache/ingest", content=_ndjson(_records(3)))
+    query = {"query_embeddings": [[0.0, 0.0, 1.0]], "n_results": 1}
+
+    first = client.post("/collections/query-cache/query", json=query)
+    again = client.post("/collections/query-cache/query", json=dict(reversed(list(query.items()))))
+    assert again.json() == first.json()
+    assert cache.stats()["hits"] == 1
+
+    client.post(
+        "/collections/query-cache/documents",
+        json={"documents": ["exact"], "ids": ["exact"], "embeddings": [[0.0, 0.0, 1.0]]},
+    )
+    changed = client.post("/collections/query-cache/query", json=query)
+
+    assert changed.json()["ids"] == [["exact"]]
+    stats = client.get("/stats").json()["queryCache"]
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+    assert stats["hitRate"] == pytest.approx(1 / 3, abs=1e-4)
+
+
+def _create_with_function(name, function):
+    # As created by another client: the handle carries the collection's own function.
+    collection = chroma_server.client.create_collection(name, embedding_function=function)
+    chroma_server.collection_cache.remember(chroma_server.client, collection)
+
+
+def test_embedding_cache_skips_recomputing_known_texts(api_client, monkeypatch, tmp_path, counting_embed):
+    client, _ = api_client
+    function = counting_embed()
+    monkeypatch.setattr(chroma_server, "embedding_cache", chroma_server.EmbeddingCache(16, str(tmp_path / "embeddings.sqlite3")))
+    _create_with_function("embedded", function)
+    records = [{"id": f"doc-{i}", "document": "banana" + "!" * i} for i in range(4)]
+
+    assert client.post("/collections/embedded/ingest", content=_ndjson(records)).status_code == 200
+    assert client.post("/collections/embedded/ingest", content=_ndjson(records)).status_code == 200
+    client.post("/collections/embedded/documents", json={"documents": ["banana", "cherry"], "ids": ["dup", "new"]})
+    query = client.post("/collections/embedded/query", json={"query_texts": ["banana!!"], "n_results": 1})
+
+    assert function.embedded == ["banana" + "!" * i for i in range(4)] + ["cherry"]
+    assert query.json()["ids"] == [["doc-2"]]
+
+    restarted = chroma_server.EmbeddingCache(16, str(tmp_path / "embeddings.sqlite3"))
+    vectors = restarted.get_many("counting", ["banana!", "unknown"])
+    assert vectors[0].tolist() == [7.0, 3.0, 1.0]
+    assert vectors[1] is None
+    assert restarted.stats()["diskHits"] == 1
+
+    other = counting_embed(name="other")
+    _create_with_function("embedded-other", other)
+    client.post("/collections/embedded-other/documents", json={"documents": ["banana"], "ids": ["dup"]})
+    assert other.embedded == ["banana"]
+
+
+def test_query_batcher_coalesces_concurrent_queries(api_client, monkeypatch):
+    client, _ = api_client
+    batcher = chroma_server.QueryBatcher(window=0.05, max_queries=4)
+    monkeypatch.setattr(chroma_server, "query_batcher", batcher)
+    monkeypatch.setattr(chroma_server, "query_cache", chroma_server.OwnedLRUCache(maxsize=0))
+    client.post("/collections/batched")
+    client.post("/collections/batched/ingest", content=_ndjson(_records(5)))
+    vectors = [[1.0, i / 10, 0.0] for i in range(5)]
+
+    async def fire():
+        transport = httpx.ASGITransport(app=chroma_server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return await asyncio.gather(
+                *(http.post("/collections/batched/query", json={"query_embeddings": [vector], "n_results": 1}) for vector in vectors)
+            )
+
+    responses = asyncio.run(fire())
+
+    assert [response.json()["ids"] for response in responses] == [[[f"doc-{i}"]] for i in range(5)]
+    assert all(len(response.json()["distances"]) == 1 for response in responses)
+    assert (batcher.batches, batcher.queries) == (2, 5)
+    assert client.get("/stats").json()["queryBatcher"]["batches"] == 2
+
+
+def test_query_batcher_embeds_text_queries_in_one_call(api_client, monkeypatch, counting_embed):
+    client, _ = api_client
+    batcher = chroma_server.QueryBatcher(window=0.05, max_queries=8)
+    function = counting_embed()
+    monkeypatch.setattr(chroma_server, "query_batcher", batcher)
+    monkeypatch.setattr(chroma_server, "query_cache", chroma_server.OwnedLRUCache(maxsize=0))
+    monkeypatch.setattr(chroma_server, "embedding_cache", chroma_server.EmbeddingCache(16, ""))
+    _create_with_function("batched-texts", function)
+    client.post("/collections/batched-texts/ingest", content=_ndjson(_records(3)))
+    texts = [["q"], ["qq", "qqq"], ["qqqq"]]
+
+    async def fire():
+        transport = httpx.ASGITransport(app=chroma_server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return await asyncio.gather(
+                *(http.post("/collections/batched-texts/query", json={"query_texts": query, "n_results": 1}) for query in texts)
+            )
+
+    responses = asyncio.run(fire())
+
+    assert [len(response.json()["ids"]) for response in responses] == [1, 2, 1]
+    assert batcher.batches == 1
+    assert len(function.calls) == 1 and sorted(function.calls[0]) == ["q", "qq", "qqq", "qqqq"]
+
+
+def test_query_batcher_fails_only_the_malformed_query(api_client, monkeypatch):
+    client, _ = api_client
+    batcher = chroma_server.QueryBatcher(window=0.05, max_queries=8)
+    monkeypatch.setattr(chroma_server, "query_batcher", batcher)
+    monkeypatch.setattr(chroma_server, "query_cache", chroma_server.OwnedLRUCache(maxsize=0))
+    client.post("/collections/batched")
+    client.post("/collections/batched/ingest", content=_ndjson(_records(3)))
+    # A wrong dimension gets its own group; a ragged request shares the 3-d batch and breaks it.
+    payloads = [[[1.0, 0.0, 0.0]], [[1.0, 0.0]], [[1.0, 0.2, 0.0]], [[1.0, 0.1, 0.0], [1.0, 0.1]]]
+
+    async def fire():
+        transport = httpx.ASGITransport(app=chroma_server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return await asyncio.gather(
+                *(http.post("/collections/batched/query", json={"query_embeddings": vectors, "n_results": 1}) for vectors in payloads)
+            )
+
+    responses = asyncio.run(fire())
+
+    assert [response.status_code for response in responses] == [200, 500, 200, 500]
+    assert [responses[0].json()["ids"], responses[2].json()["ids"]] == [[["doc-0"]], [["doc-2"]]]
+    assert (batcher.batches, batcher.queries) == (2, 4)
+    assert not batcher._tasks
+
+
+def _encoded(vectors):
+    matrix = np.asarray(vectors, dtype="<f4")
+    return {"dtype": "float32", "shape": list(matrix.shape), "data": base64.b64encode(matrix.tobytes()).decode("ascii")}
+
+
+def test_base64_and_raw_binary_vectors(api_client):
+    client, _ = api_client
+    client.post("/collections/binary")
+    vectors = [[1.0, i / 10, 0.0] for i in range(3)]
+    added = client.post(
+        "/collections/binary/documents",
+        json={"documents": ["a", "b", "c"], "ids": ["doc-0", "doc-1", "doc-2"], "embeddings": _encoded(vectors)},
+    )
+    assert added.status_code == 200
+
+    encoded_query = client.post("/collections/binary/query", json={"query_embeddings": _encoded([vectors[2]]), "n_results": 1})
+    raw_query = client.post(
+        "/collections/binary/query/binary?n_results=1&where=" + json.dumps({"missing": {"$ne": True}}),
+        content=np.asarray([vectors[1], vectors[2]], dtype="<f4").tobytes(),
+        headers={"Content-Type": "application/octet-stream", "X-Vector-Shape": "2,3"},
+    )
+
+    assert encoded_query.json()["ids"] == [["doc-2"]]
+    assert raw_query.status_code == 200
+    assert raw_query.json()["ids"] == [["doc-1"], ["doc-2"]]
+
+
+def test_binary_vectors_with_wrong_length_are_rejected(api_client):
+    client, _ = api_client
+    client.post("/collections/binary")
+    bad = _encoded([[1.0, 0.0, 0.0]])
+    bad["shape"] = [2, 3]
+
+    assert client.post("/collections/binary/query", json={"query_embeddings": bad}).status_code == 422
+    empty = {"dtype": "float32", "shape": [0, 3], "data": ""}
+    assert client.post("/collections/binary/query", json={"query_embeddings": empty}).status_code == 422
+    raw = client.post(
+        "/collections/binary/query/binary",
+        content=np.zeros(3, dtype="<f4").tobytes(),
+        headers={"X-Vector-Shape": "2,3"},
+    )
+    assert raw.status_code == 422
+    assert client.post("/collections/binary/query/binary", content=b"").status_code == 422
+
+
+def test_returned_embeddings_can_be_base64_encoded():
+    results = {"ids": [["a", "b"]], "embeddings": [np.array([[1.0, 2.0], [3.0, 4.5]], dtype=np.float32)]}
+
+    encoded = chroma_server.encode_result_embeddings(results, "base64")
+    plain = chroma_server.encode_result_embeddings(results, "json")
+
+    assert encoded["embeddings"][0]["shape"] == (2, 2)
+    assert chroma_server.EncodedVectors(**encoded["embeddings"][0]).to_array().tolist() == [[1.0, 2.0], [3.0, 4.5]]
+    assert plain["embeddings"] == [[[1.0, 2.0], [3.0, 4.5]]]
+    assert isinstance(results["embeddings"][0], np.ndarray)
+
+
+def test_query_include_projects_and_trims_results(api_client):
+    client, _ = api_client
+    client.post("/collections/projected")
+    client.post("/collections/projected/ingest", content=_ndjson(_records(3)))
+
+    ranking = client.post("/collections/projected/query", json={"query_embeddings": [[1.0, 0.2, 0.0]], "n_results": 2, "include": ["distances"]})
+    full = client.post(
+        "/collections/projected/query",
+        json={"query_embeddings": [[1.0, 0.2, 0.0]], "n_results": 1, "include": ["embeddings", "documents"], "embedding_encoding": "base64"},
+    )
+
+    assert set(ranking.json()) == {"ids", "distances", "included"}
+    assert ranking.json()["ids"] == [["doc-2", "doc-1"]]
+    assert full.json()["documents"] == [["document 2"]]
+    assert chroma_server.EncodedVectors(**full.json()["embeddings"][0]).to_array().tolist() == [pytest.approx([1.0, 0.2, 0.0])]
+    assert client.post("/collections/projected/query", json={"query_embeddings": [[1.0, 0.0, 0.0]], "include": ["bogus"]}).status_code == 422
+
+
+def test_documents_are_paginated_with_projection(api_client):
+    client, _ = api_client
+    client.post("/collections/paged")
+    client.post("/collections/paged/ingest", content=_ndjson(_records(5)))
+
+    first = client.get("/collections/paged/documents", params={"limit": 2, "include": "metadatas"}).json()
+    last = client.get("/collections/paged/documents", params={"limit": 2, "offset": 4, "include": "embeddings"}).json()
+    filtered = client.get("/collections/paged/documents", params={"where": json.dumps({"n": 3})}).json()
+
+    assert first["ids"] == ["doc-0", "doc-1"]
+    assert "documents" not in first and first["nextOffset"] == 2
+    assert last["ids"] == ["doc-4"] and last["embeddings"] == [pytest.approx([1.0, 0.4, 0.0])]
+    assert last["nextOffset"] is None
+    assert filtered["ids"] == ["doc-3"]
+    assert client.get("/collections/paged/documents", params={"include": "distances"}).status_code == 422
+
+
+def test_fan_out_query_merges_collections_by_distance(api_client, monkeypatch, tmp_path, counting_embed):
+    client, _ = api_client
+    function = counting_embed()
+    monkeypatch.setattr(chroma_server, "embedding_cache", chroma_server.EmbeddingCache(16, ""))
+    for name, start in (("evens", 0), ("odds", 1)):
+        _create_with_function(name, function)
+        records = [{"id": f"{name}-{i}", "document": f"doc {i}", "embedding": [6.0, float(i), 1.0]} for i in range(start, 6, 2)]
+        client.post(f"/collections/{name}/ingest", content=_ndjson(records))
+
+    response = client.post(
+        "/query",
+        json={"collections": ["evens", "odds"], "query": {"query_texts": ["aaaaaa"], "n_results": 3, "include": ["documents"]}},
+    )
+
+    body = response.json()
+    assert response.status_code == 200
+    assert function.embedded == ["aaaaaa"]
+    assert body["ids"] == [["odds-5", "evens-4", "odds-3"]]
+    assert body["collections"] == [["odds", "evens", "odds"]]
+    assert body["documents"] == [["doc 5", "doc 4", "doc 3"]]
+    assert body["distances"][0] == sorted(body["distances"][0])
+    missing = client.post("/query", json={"collections": ["evens", "absent"], "query": {"query_embeddings": [[1.0, 0.0, 0.0]]}})
+    assert missing.status_code == 404
+
+
+def test_export_streams_pages_that_import_restores(api_client, monkeypatch, counting_embed):
+    client, _ = api_client
+    function = counting_embed()
+    monkeypatch.setattr(chroma_server, "embedding_function", function)
+    client.post("/collections/source")
+    client.post("/collections/source/ingest", content=_ndjson(_records(5)))
+    client.post("/collections/source/ingest", content=_ndjson([{"id": "vector-only", "embedding": [0.0, 1.0, 0.0]}]))
+    pages = []
+    original_get = chromadb.api.models.Collection.Collection.get
+
+    def counting_get(self, *args, **kwargs):
+        pages.append(kwargs["limit"])
+        return original_get(self, *args, **kwargs)
+
+    monkeypatch.setattr(chromadb.api.models.Collection.Collection, "get", counting_get)
+    exported = client.get("/collections/source/export", params={"embeddings": "true", "page_size": 2})
+    plain = client.get("/collections/source/export")
+
+    lines = [json.loads(line) for line in exported.text.splitlines()]
+    assert exported.headers["content-type"].startswith("application/x-ndjson")
+    assert pages == [2, 2, 2, 2, chroma_server.DEFAULT_EXPORT_PAGE_SIZE]
+    assert [line["id"] for line in lines] == [f"doc-{i}" for i in range(5)] + ["vector-only"]
+    assert lines[1]["metadata"] == {"n": 1} and "metadata" not in lines[0]
+    assert "document" not in lines[5]
+    assert "embedding" not in json.loads(plain.text.splitlines()[0])
+
+    restored = client.post("/collections/restored/import?batch_size=2", content=exported.content)
+
+    assert restored.status_code == 200
+    assert restored.json()["ingested"] == 6
+    assert function.embedded == []
+    copy = client.get("/collections/restored/documents", params={"include": "documents,metadatas,embeddings"}).json()
+    original = client.get("/collections/source/documents", params={"include": "documents,metadatas,embeddings"}).json()
+    assert copy == original
+    assert client.get("/collections/absent/export").status_code == 404
+
+
+def test_startup_warm_up_gates_readiness(monkeypatch, counting_embed):
+    function = counting_embed()
+    monkeypatch.setattr(chroma_server, "embedding_function", function)
+    monkeypatch.setattr(chroma_server, "client", chroma_server.create_client("ephemeral", ""))
+    monkeypatch.setattr(chroma_server, "collection_cache", chroma_server.CollectionCache(8))
+    collection = chroma_server.client.get_or_create_collection("warm-up-target")
+    collection.upsert(ids=["a"], documents=["a"], embeddings=[[1.0, 0.0, 0.0]])
+    warmup = chroma_server.Warmup(collections=["warm-up-target", "not-there"], embedding_function=True)
+    monkeypatch.setattr(chroma_server, "warmup", warmup)
+
+    with TestClient(chroma_server.app) as client:
+        for _ in range(100):
+            response = client.get("/ready")
+            if response.status_code == 200:
+                break
+            threading.Event().wait(0.01)
+
+    report = response.json()
+    assert response.status_code == 200 and report["ready"] is True
+    assert report["embeddingFunction"]["status"] == "ok"
+    assert function.embedded == ["warm-up"]
+    target = report["collections"]["warm-up-target"]
+    assert (target["status"], target["count"]) == ("ok", 1)
+    assert report["collections"]["not-there"]["status"] == "error"
+    assert chroma_server.collection_cache.get(chroma_server.client, "warm-up-target") is not None
+
+
+def test_readiness_is_503_before_warm_up(api_client, monkeypatch):
+    client, _ = api_client
+    monkeypatch.setattr(chroma_server, "warmup", chroma_server.Warmup(collections=[], embedding_function=False))
+
+    assert client.get("/ready").status_code == 503
+    with pytest.raises(ValueError):
+        chroma_server.create_client("remote", "")
+
+
+def test_benchmark_harness_reports_percentiles(monkeypatch):
+    spec = importlib.util.spec_from_file_location("chroma_server_bench", Path(__file__).resolve().parents[1] / "benchmarks" / "chroma_server_bench.py")
+    bench = importlib.util.module_from_spec(spec)
+    # The harness configures chroma_server through the environment; restore it afterwards.
+    monkeypatch.setenv("CHROMA_SERVER_CLIENT", "persistent")
+    monkeypatch.setenv("CHROMA_SERVER_EMBEDDING_CACHE_PATH", "unused.sqlite3")
+    monkeypatch.delitem(sys.modules, "benchmarks._env", raising=False)
+    spec.loader.exec_module(bench)
+    assert (os.environ["CHROMA_SERVER_CLIENT"], os.environ["CHROMA_SERVER_EMBEDDING_CACHE_PATH"]) == ("ephemeral", "")
+    for name in ("client", "query_cache", "collection_cache"):
+        monkeypatch.setattr(chroma_server, name, getattr(chroma_server, name))
+    args = bench.build_parser().parse_args(["--documents", "40", "--dimensions", "8", "--queries", "20", "--concurrency", "4", "--ingest-request-size", "15"])
+
+    report = bench.run_benchmarks(args)
+
+    workloads = report["workloads"]
+    assert workloads["ingest"]["requests"] == 3 and workloads["ingest"]["errors"] == 0
+    assert workloads["query"]["requests"] == 20
+    assert workloads["query"]["p50Ms"] <= workloads["query"]["p95Ms"] <= workloads["query"]["p99Ms"]
+    assert sum(op["requests"] for op in workloads["mixed"]["byOperation"].values()) == 20
+    assert json.loads(json.dumps(report))["config"]["concurrency"] == 4
@@ -0,0 +1,298 @@
+import gzip
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from flask import Flask, jsonify
+
+# Ensure the application package is importable when running tests directly.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.api.errors import ApiError
+from src.api.routes.knowledge import create_knowledge_blueprint
+from src.api.routes.status import create_status_blueprint
+from src.indexing.inverted import top_hits
+from src.knowledge_service import KnowledgeService
+
+
+KNOWLEDGE = {
+    "categories": [
+        {
+            "id": "camera",
+            "title": "Camera",
+            "entries": [
+                {"question": "What is a dolly shot?", "answer": "The camera moves on a track toward the subject."},
+                {"question": "When should I use a crane?", "answer": "Cranes reveal scale by moving the camera vertically."},
+            ],
+        },
+        {
+            "id": "story",
+            "title": "Story",
+            "entries": [
+                {"question": "What is subtext?", "answer": "Meaning carried beneath the dialogue."},
+                {"question": "How do I pace a chase?", "answer": "Alternate tracking shots with short static inserts."},
+            ],
+        },
+    ]
+}
+
+
+@pytest.fixture
+def knowledge_path(tmp_path):
+    path = tmp_path / "knowledge_base.json"
+    path.write_text(json.dumps(KNOWLEDGE), encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def service(knowledge_path):
+    return KnowledgeService(knowledge_path)
+
+
+@pytest.fixture
+def client(service):
+    app = Flask(__name__)
+    app.register_blueprint(create_knowledge_blueprint(service))
+    app.register_blueprint(create_status_blueprint(service))
+    app.register_error_handler(ApiError, lambda exc: (jsonify({"error": exc.to_error_detail().__dict__}), exc.status_code))
+    return app.test_client()
+
+
+def _questions(response):
+    return [item["question"] for item in response.get_json()["results"]]
+
+
+def test_search_ranks_with_stemming(client):
+    response = client.get("/api/knowledge/search?q=moving cranes")
+
+    assert response.status_code == 200
+    payload = response.get_json()
+    assert payload["total"] == 2
+    assert _questions(response) == ["When should I use a crane?", "What is a dolly shot?"]
+    assert payload["results"][0]["categoryId"] == "camera"
+    assert payload["results"][0]["score"] > payload["results"][1]["score"]
+
+
+def test_search_paginates_and_filters_by_category(client):
+    first = client.get("/api/knowledge/search?q=camera shots track&limit=1")
+    second = client.get("/api/knowledge/search?q=camera shots track&limit=1&offset=1")
+    story_only = client.get("/api/knowledge/search?q=camera shots track&category=story")
+
+    assert first.get_json()["total"] == second.get_json()["total"] == 3
+    assert len(_questions(first)) == len(_questions(second)) == 1
+    assert _questions(first) != _questions(second)
+    assert _questions(story_only) == ["How do I pace a chase?"]
+
+
+def test_search_rejects_invalid_parameters(client):
+    assert client.get("/api/knowledge/search").status_code == 422
+    assert client.get("/api/knowledge/search?q=camera&limit=abc").status_code == 422
+
+
+def _large_service(tmp_path):
+    words = ["lens", "framing", "lighting", "blocking", "coverage", "montage", "pacing", "subtext"]
+    categories = [
+        {
+            "id": f"c{c}",
+            "title": f"Category {c}",
+            "entries": [
+                {"question": f"Question {c}-{e} about {words[e % 8]}", "answer": f"{words[(c + e) % 8]} answer {c} {e}"}
+                for e in range(100)
+            ],
+        }
+        for c in range(50)
+    ]
+    path = tmp_path / "large.json"
+    path.write_text(json.dumps({"categories": categories}), encoding="utf-8")
+    return KnowledgeService(path, cache_size=0)
+
+
+def test_search_latency_with_large_corpus(tmp_path):
+    service = _large_service(tmp_path)
+    # Terms, a phrase made of common words, a term in every entry and a prefix.
+    queries = ["subtext montage", '"about subtext"', "question about", "pac*"]
+    for query in queries:
+        service.search(query, limit=10)
+
+    timings = []
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(20):
+            results = [service.search(query, limit=10) for query in queries]
+        timings.append((time.perf_counter() - start) / (20 * len(queries)))
+
+    assert all(len(result["results"]) == 10 for result in results)
+    assert [result["total"] for result in results] == [2136, 600, 5000, 1140]
+    assert min(timings) < 0.001
+    # Pruning must not change the ranking: same scores as scoring every match.
+    index = service.snapshot().index
+    for query in queries:
+        hits, total = index.top(query, 10)
+        assert [hit.score for hit in hits] == [hit.score for hit in top_hits(index.rank(query), 10)]
+        assert total == len(index.rank(query))
+
+
+def test_suggest_latency_with_large_corpus(tmp_path):
+    service = _large_service(tmp_path)
+    # A typo, words found in every entry, a one-letter prefix and a mix of both.
+    queries = ["subtxt", "questin abot", "q", "question about montge", "categry 4"]
+    for query in queries:
+        service.suggest(query)
+
+    timings = []
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(20):
+            results = [service.suggest(query) for query in queries]
+        timings.append((time.perf_counter() - start) / (20 * len(queries)))
+
+    assert all(len(result) == 10 for result in results)
+    assert all("subtext" in item["text"] for item in results[0])
+    assert all("montage" in item["text"] for item in results[3])
+    assert results[4][0]["text"] == "Category 4"
+    assert min(timings) < 0.002
+
+
+def _rewrite(path, payload):
+    before = path.stat().st_mtime_ns
+    path.write_text(json.dumps(payload), encoding="utf-8")
+    os.utime(path, ns=(before + 10**9, before + 10**9))
+
+
+def test_reload_swaps_snapshot_and_reports_status(client, service, knowledge_path):
+    held = service.all()
+    assert client.get("/api/knowledge/search?q=lens").get_json()["total"] == 0
+    assert service.reload_if_changed() is False
+
+    updated = {"categories": [{"id": "lenses", "title": "Lenses", "entries": [{"question": "Which lens?", "answer": "A 35mm lens."}]}]}
+    _rewrite(knowledge_path, updated)
+
+    assert service.reload_if_changed() is True
+    assert held["categories"][0]["id"] == "camera"
+    assert client.get("/api/knowledge/").get_json() == updated
+    assert client.get("/api/knowledge/search?q=lens").get_json()["total"] == 1
+
+    status = client.get("/api/status").get_json()["knowledge"]
+    assert status["reloads"] == 1
+    assert status["lastReloadAt"].endswith("Z")
+
+
+def test_reload_keeps_previous_snapshot_on_parse_error(service, knowledge_path):
+    service.all()
+    before = knowledge_path.stat().st_mtime_ns
+    knowledge_path.write_text("{not json", encoding="utf-8")
+    os.utime(knowledge_path, ns=(before + 10**9, before + 10**9))
+
+    assert service.reload_if_changed() is False
+    assert service.search("subtext")["total"] == 1
+    assert service.reload_status()["reloads"] == 0
+
+
+def test_watcher_picks_up_changes(service, knowledge_path):
+    service.start_watching(interval=0.01)
+    try:
+        _rewrite(knowledge_path, {"categories": []})
+        deadline = time.monotonic() + 2
+        while service.all()["categories"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert service.all() == {"categories": []}
+        assert service.reload_status()["watching"] is True
+    finally:
+        service.stop_watching()
+
+
+def test_suggest_tolerates_typos_in_questions_and_categories(client):
+    response = client.get("/api/knowledge/suggest?q=subtxt")
+    assert response.status_code == 200
+    suggestions = response.get_json()["suggestions"]
+    assert suggestions[0]["text"] == "What is subtext?"
+    assert suggestions[0]["kind"] == "question"
+
+    texts = [item["text"] for item in client.get("/api/knowledge/suggest?q=camra").get_json()["suggestions"]]
+    assert texts[0] == "Camera"
+    assert client.get("/api/knowledge/suggest?q=cra&limit=1").get_json()["suggestions"][0]["text"] == "When should I use a crane?"
+    assert client.get("/api/knowledge/suggest").status_code == 422
+
+
+def test_search_applies_default_limit(client, service):
+    body = client.get("/api/knowledge/search?q=camera").get_json()
+
+    assert body["limit"] == 20
+    assert client.get("/api/knowledge/search?q=camera&limit=101").status_code == 422
+
+
+def test_search_results_are_cached_until_reload(client, service, knowledge_path):
+    first = client.get("/api/knowledge/search?q=Subtext").get_json()
+    second = client.get("/api/knowledge/search?q=SUBTEXT").get_json()
+
+    assert second["results"] == first["results"]
+    assert second["query"] == "SUBTEXT"
+    assert service.cache_stats()["hits"] == 1
+
+    _rewrite(knowledge_path, {"categories": []})
+    service.reload_if_changed()
+
+    assert client.get("/api/knowledge/search?q=subtext").get_json()["total"] == 0
+    stats = client.get("/api/status").get_json()["knowledge"]["searchCache"]
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+
+
+def test_knowledge_payload_supports_conditional_get(client, service, knowledge_path):
+    first = client.get("/api/knowledge/")
+    etag = first.headers["ETag"]
+
+    assert first.get_json() == KNOWLEDGE
+    assert "max-age=60" in first.headers["Cache-Control"]
+    assert client.get("/api/knowledge/", headers={"If-None-Match": etag}).status_code == 304
+
+    _rewrite(knowledge_path, {"categories": []})
+    service.reload_if_changed()
+
+    changed = client.get("/api/knowledge/", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+def test_knowledge_payload_is_served_precompressed(client, service, knowledge_path):
+    large = {"categories": [{"id": f"c{i}", "title": f"Category {i}", "entries": []} for i in range(100)]}
+    _rewrite(knowledge_path, large)
+    service.reload_if_changed()
+
+    response = client.get("/api/knowledge/", headers={"Accept-Encoding": "gzip"})
+    plain = client.get("/api/knowledge/")
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert json.loads(gzip.decompress(response.data)) == large
+    assert len(response.data) < len(plain.data)
+    assert response.headers["ETag"] != plain.headers["ETag"]
+
+
+def test_search_answers_not_modified_until_reload(client, service, knowledge_path):
+    etag = client.get("/api/knowledge/search?q=subtext").headers["ETag"]
+
+    assert client.get("/api/knowledge/search?q=subtext", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/api/knowledge/search?q=crane", headers={"If-None-Match": etag}).status_code == 200
+
+    _rewrite(knowledge_path, {"categories": []})
+    service.reload_if_changed()
+
+    assert client.get("/api/knowledge/search?q=subtext", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_create_app_starts_no_background_threads(monkeypatch, tmp_path):
+    import threading
+
+    from src.main import create_app
+
+    monkeypatch.setenv("ASSET_INDEX_CHROMA_PATH", str(tmp_path / "asset-index"))
+    before = {thread.ident for thread in threading.enumerate()}
+    create_app()
+    started = [thread.name for thread in threading.enumerate() if thread.ident not in before]
+
+    assert "knowledge-reload" not in started
+    assert "asset-indexer" not in started
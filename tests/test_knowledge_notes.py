@@ -0,0 +1,90 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+from flask import Flask
+
+# Ensure the application package is importable when running tests directly.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.api.routes.knowledge import create_knowledge_blueprint
+from src.knowledge_service import KnowledgeService as EntryService
+from src.services.knowledge import KnowledgeService, chunk_markdown
+
+
+def _touch(path, text):
+    before = path.stat().st_mtime_ns if path.exists() else 0
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, ns=(before + 10**9, before + 10**9))
+
+
+@pytest.fixture
+def notes_dir(tmp_path):
+    _touch(tmp_path / "camera_movement_notes.md", "## Dolly\n- Pan: sideways\n- Tilt\n- Pan: again\n")
+    _touch(tmp_path / "subtext_notes.md", "## Subtext\nSay less.\n")
+    return tmp_path
+
+
+def test_load_memoizes_until_a_note_changes(notes_dir, monkeypatch):
+    service = KnowledgeService(base_path=notes_dir)
+    first = service.load()
+
+    assert first["cameraMovements"] == ["Dolly", "Pan", "Tilt"]
+    assert first["filmTechniques"] == []
+    assert service.load() is first
+
+    reads = []
+    original = Path.read_text
+    monkeypatch.setattr(Path, "read_text", lambda self, *a, **k: reads.append(self.name) or original(self, *a, **k))
+    _touch(notes_dir / "subtext_notes.md", "## Subtext\n- Irony\n")
+
+    second = service.load()
+    assert second is not first
+    assert second["subtextNotes"] == ["Subtext", "Irony"]
+    assert "- Irony" in second["fullContext"]
+    assert reads == ["subtext_notes.md"]
+
+
+def test_new_markdown_files_are_discovered(notes_dir):
+    service = KnowledgeService(base_path=notes_dir)
+    service.load()
+
+    _touch(notes_dir / "lighting_basics.md", "## Three point lighting\n")
+    payload = service.load()
+    assert payload["lightingBasics"] == ["Three point lighting"]
+    assert "## Lighting Basics" in payload["fullContext"]
+
+    (notes_dir / "lighting_basics.md").unlink()
+    assert "lightingBasics" not in service.load()
+
+
+def test_chunk_markdown_assigns_stable_ids():
+    markdown = "Preamble\n## Lighting\nKey light.\n## Lighting\nFill light.\n### Sound\n" + "Room tone. " * 40
+
+    chunks = chunk_markdown("film_notes.md", markdown, max_chars=200)
+
+    assert [chunk.id for chunk in chunks][:3] == ["film_notes/intro", "film_notes/lighting", "film_notes/lighting-2"]
+    assert [chunk.id for chunk in chunks][3:] == ["film_notes/sound.1", "film_notes/sound.2", "film_notes/sound.3"]
+    assert all(len(chunk.text) <= 200 for chunk in chunks)
+    assert chunks[1].heading == "Lighting" and chunks[1].text == "Key light."
+
+
+def test_context_returns_ranked_chunks_within_budget(notes_dir, tmp_path):
+    _touch(notes_dir / "film_techniques_notes.md", "## Camera Movement\nDolly and crane moves.\n## Sound\nRoom tone.\n")
+    service = KnowledgeService(base_path=notes_dir)
+    app = Flask(__name__)
+    app.register_blueprint(create_knowledge_blueprint(EntryService(tmp_path / "kb.json"), service))
+    client = app.test_client()
+
+    payload = client.get("/api/knowledge/context?q=dolly moves&budget=200").get_json()
+
+    assert payload["chunks"][0]["id"] == "film_techniques_notes/camera-movement"
+    assert payload["used"] <= 200
+    assert payload["used"] < len(service.load()["fullContext"])
+
+    tight = client.get("/api/knowledge/context?q=dolly moves&budget=5&unit=tokens").get_json()
+    assert [chunk["id"] for chunk in tight["chunks"]] == []
+
+    _touch(notes_dir / "film_techniques_notes.md", "## Sound\nRoom tone.\n")
+    assert client.get("/api/knowledge/context?q=crane").get_json()["chunks"] == []
@@ -0,0 +1,103 @@
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Ensure the application package is importable when running tests directly.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import src.knowledge_service as knowledge_module
+import src.services.knowledge as notes_module
+from src.indexing.semantic import SemanticIndex
+from src.knowledge_service import KnowledgeService
+from src.knowledge_snapshot import CompiledKnowledge, build
+from src.semantic_service import SemanticSearchService
+from src.services.knowledge import KnowledgeService as NotesService
+
+NOTE = """# Subtext
+
+Characters rarely say what they mean; subtext carries the real intent.
+
+## Dolly Shot
+
+- Dolly: the camera moves on a track
+- Crane: the camera rises vertically
+"""
+
+
+@pytest.fixture
+def sources(tmp_path):
+    knowledge_path = tmp_path / "knowledge_base.json"
+    knowledge_path.write_text(
+        json.dumps({"categories": [{"id": "camera", "title": "Camera", "entries": [{"question": "What is a dolly?", "answer": "A wheeled camera cart."}]}]}),
+        encoding="utf-8",
+    )
+    notes_dir = tmp_path / "notes"
+    notes_dir.mkdir()
+    (notes_dir / "subtext_notes.md").write_text(NOTE, encoding="utf-8")
+    return knowledge_path, notes_dir
+
+
+def _services(sources, compiled):
+    knowledge = KnowledgeService(sources[0], compiled=compiled)
+    notes = NotesService(base_path=sources[1], compiled=compiled)
+    return knowledge, notes, SemanticSearchService(knowledge, notes, compiled=compiled)
+
+
+def test_compiled_snapshot_serves_without_parsing(sources, tmp_path, monkeypatch):
+    output = tmp_path / "knowledge.snapshot"
+    build(*sources, output)
+    live_knowledge, live_notes, live_semantic = _services(sources, None)
+    expected = (live_knowledge.search("dolly"), live_notes.load(), live_notes.context("subtext", budget=500), live_semantic.search("camera track"))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("sources should not be parsed when the snapshot is fresh")
+
+    monkeypatch.setattr(knowledge_module, "_build_snapshot", fail)
+    monkeypatch.setattr(notes_module, "chunk_markdown", fail)
+    monkeypatch.setattr(SemanticIndex, "build", fail)
+    knowledge, notes, semantic = _services(sources, CompiledKnowledge.open(output))
+
+    assert knowledge.search("dolly") == expected[0]
+    assert notes.load() == expected[1]
+    assert notes.context("subtext", budget=500) == expected[2]
+    assert notes.suggest("crne")[0]["text"] == "Crane"
+    assert semantic.search("camera track") == expected[3]
+    assert isinstance(semantic.index().vectors, np.ndarray)
+    assert not semantic.index().vectors.flags.writeable
+    assert knowledge.reload_if_changed() is False
+
+
+def test_stale_sections_fall_back_to_live_build(sources, tmp_path):
+    output = tmp_path / "knowledge.snapshot"
+    build(*sources, output)
+    (sources[1] / "subtext_notes.md").write_text(NOTE + "\n## Whip Pan\n\n- Whip pan: a blurred fast pan\n", encoding="utf-8")
+
+    knowledge, notes, semantic = _services(sources, CompiledKnowledge.open(output))
+
+    assert "Whip pan" in notes.load()["subtextNotes"]
+    assert notes.context("whip", budget=500)["chunks"][0]["heading"] == "Whip Pan"
+    assert any(result["id"].endswith("whip-pan") for result in semantic.search("whip pan")["results"])
+    assert knowledge.search("dolly")["total"] == 1
+
+
+def test_open_rejects_missing_or_foreign_files(tmp_path):
+    assert CompiledKnowledge.open(tmp_path / "missing.snapshot") is None
+    (tmp_path / "bogus.snapshot").write_bytes(b"not a snapshot at all")
+    assert CompiledKnowledge.open(tmp_path / "bogus.snapshot") is None
+
+
+def test_importing_the_snapshot_cli_does_not_build_the_app():
+    import subprocess
+
+    script = (
+        "import sys, threading, build_knowledge_snapshot; "
+        "print('app' in vars(sys.modules['src.main']), sorted(t.name for t in threading.enumerate()))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", script], cwd=Path(__file__).resolve().parents[1], capture_output=True, text=True, check=True
+    ).stdout
+
+    assert output.strip() == "False ['MainThread']"
@@ -0,0 +1,78 @@
+import json
+import sys
+from pathlib import Path
+
+import chromadb
+import pytest
+
+# Ensure the application package is importable when running tests directly.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.knowledge_sync import main, sync_notes
+
+NOTE = """# Camera
+
+## Dolly
+
+The camera moves on a track.
+
+## Crane
+
+The camera rises vertically.
+"""
+
+
+@pytest.fixture
+def notes_dir(tmp_path):
+    notes = tmp_path / "notes"
+    notes.mkdir()
+    (notes / "camera_notes.md").write_text(NOTE, encoding="utf-8")
+    return notes
+
+
+def test_sync_only_writes_changed_chunks(tmp_path, notes_dir, counting_embed):
+    collection = chromadb.PersistentClient(path=str(tmp_path / "chroma")).get_or_create_collection("notes-test")
+    embed = counting_embed()
+
+    first = sync_notes(collection, notes_dir, embed=embed)
+    assert (first["added"], first["total"]) == (3, 3)
+    assert sorted(collection.get()["ids"]) == ["camera_notes/camera", "camera_notes/crane", "camera_notes/dolly"]
+
+    embed.embedded.clear()
+    again = sync_notes(collection, notes_dir, embed=embed)
+    assert (again["unchanged"], again["added"], again["updated"], again["deleted"]) == (3, 0, 0, 0)
+    assert embed.embedded == []
+
+    edited = NOTE.replace("rises vertically", "lifts the lens high").replace("## Dolly\n\nThe camera moves on a track.\n\n", "")
+    (notes_dir / "camera_notes.md").write_text(edited + "\n## Whip Pan\n\nA blurred fast pan.\n", encoding="utf-8")
+    changed = sync_notes(collection, notes_dir, embed=embed)
+
+    assert (changed["added"], changed["updated"], changed["deleted"], changed["unchanged"]) == (1, 1, 1, 1)
+    assert embed.embedded == ["Crane\n\nThe camera lifts the lens high.", "Whip Pan\n\nA blurred fast pan."]
+    stored = collection.get(ids=["camera_notes/crane"], include=["metadatas"])["metadatas"][0]
+    assert stored["heading"] == "Crane" and stored["source"] == "camera_notes.md"
+    assert "camera_notes/dolly" not in collection.get()["ids"]
+
+
+def test_cli_dry_run_reports_without_writing(tmp_path, notes_dir, capsys):
+    chroma_path = tmp_path / "chroma"
+
+    assert main(["--notes", str(notes_dir), "--chroma-path", str(chroma_path), "--collection", "notes-cli", "--dry-run"]) == 0
+
+    summary = json.loads(capsys.readouterr().out)
+    assert (summary["added"], summary["dryRun"]) == (3, True)
+    assert chromadb.PersistentClient(path=str(chroma_path)).get_collection("notes-cli").count() == 0
+
+
+def test_importing_the_sync_cli_does_not_build_the_app():
+    import subprocess
+
+    script = (
+        "import sys, threading, sync_knowledge_notes; "
+        "print('app' in vars(sys.modules['src.main']), sorted(t.name for t in threading.enumerate()))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", script], cwd=Path(__file__).resolve().parents[1], capture_output=True, text=True, check=True
+    ).stdout
+
+    assert output.strip() == "False ['MainThread']"
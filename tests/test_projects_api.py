@@ -0,0 +1,117 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from flask import Flask, jsonify
+
+# Ensure the application package is importable when running tests directly.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.api.errors import ApiError
+from src.api.routes.projects import create_projects_blueprint
+from src.api.routes.search import create_search_blueprint
+from src.project_service import ProjectService
+from src.store import ProjectStore
+
+
+@pytest.fixture
+def service(tmp_path):
+    return ProjectService(ProjectStore(tmp_path / "projects.json"))
+
+
+@pytest.fixture
+def client(service):
+    app = Flask(__name__)
+    app.register_blueprint(create_projects_blueprint(service))
+    app.register_blueprint(create_search_blueprint(service))
+    app.register_error_handler(ApiError, lambda exc: (jsonify({"error": exc.to_error_detail().__dict__}), exc.status_code))
+    return app.test_client()
+
+
+def test_list_projects_streams_json_array(client, service):
+    for index in range(40):
+        service.create_project({"id": f"p-{index}", "name": f"Project {index}"})
+
+    response = client.get("/api/projects/")
+
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == "application/json"
+    payload = json.loads(response.get_data(as_text=True))
+    assert len(payload["projects"]) == 40
+    assert payload["projects"] == service.list_projects()
+
+
+def test_list_projects_empty(client):
+    response = client.get("/api/projects/")
+
+    assert response.status_code == 200
+    assert response.get_json() == {"projects": []}
+
+
+def test_list_assets_streams_json_array(client, service):
+    service.create_project({"id": "p-1", "name": "Streaming"})
+    service.add_asset("p-1", {"id": "a-1", "name": "Opening", "content": "Rain on glass"})
+    service.add_asset("p-1", {"id": "a-2", "name": "Closing", "content": "Sunrise"})
+
+    response = client.get("/api/projects/p-1/assets")
+
+    assert response.status_code == 200
+    assert [asset["id"] for asset in response.get_json()["assets"]] == ["a-1", "a-2"]
+
+
+@pytest.fixture
+def searchable(service):
+    service.create_project({"id": "noir", "name": "Noir"})
+    service.create_project({"id": "western", "name": "Western"})
+    service.add_asset("noir", {"id": "n-1", "name": "Rooftop chase", "type": "story", "content": "A slow dolly push across wet neon streets."})
+    service.add_asset("noir", {"id": "n-2", "name": "Interrogation", "type": "image", "content": "Hard key light", "tags": ["neon", "smoke"]})
+    service.add_asset("western", {"id": "w-1", "name": "Showdown", "type": "story", "content": "Dust and a dolly zoom at noon."})
+    return service
+
+
+def _ids(response):
+    return [(item["projectId"], item["id"]) for item in response.get_json()["results"]]
+
+
+def test_search_ranks_assets_across_projects(client, searchable):
+    response = client.get("/api/search?q=neon")
+
+    assert response.status_code == 200
+    assert set(_ids(response)) == {("noir", "n-1"), ("noir", "n-2")}
+    assert all(item["score"] > 0 for item in response.get_json()["results"])
+
+
+def test_search_supports_phrase_prefix_and_filters(client, searchable):
+    assert _ids(client.get('/api/search?q="dolly zoom"')) == [("western", "w-1")]
+    assert set(_ids(client.get("/api/search?q=interrog*"))) == {("noir", "n-2")}
+    assert _ids(client.get("/api/search?q=dolly&project=noir")) == [("noir", "n-1")]
+    assert _ids(client.get("/api/search?q=neon&type=image")) == [("noir", "n-2")]
+    assert len(_ids(client.get("/api/search?q=dolly&limit=1"))) == 1
+
+
+def test_search_index_follows_mutations(client, searchable, tmp_path):
+    searchable.update_asset("noir", "n-1", {"content": "Static wide shot"})
+    searchable.delete_project("western")
+
+    assert _ids(client.get("/api/search?q=dolly")) == []
+
+    reloaded = ProjectService(ProjectStore(tmp_path / "projects.json"))
+    assert [result["id"] for result in reloaded.search_assets("static")["results"]] == ["n-1"]
+
+
+def test_search_validates_parameters(client, searchable):
+    assert client.get("/api/search").status_code == 422
+    assert client.get("/api/search?q=dolly&limit=0").status_code == 422
+    assert client.get("/api/search?q=dolly&project=missing").status_code == 404
+
+
+def test_suggest_asset_names_tolerates_typos(client, searchable):
+    response = client.get("/api/search/suggest?q=interogation")
+
+    assert response.status_code == 200
+    suggestions = response.get_json()["suggestions"]
+    assert [(item["projectId"], item["assetId"], item["text"]) for item in suggestions] == [("noir", "n-2", "Interrogation")]
+    assert client.get("/api/search/suggest?q=show&project=noir").get_json()["suggestions"] == []
+    assert client.get("/api/search/suggest?q=show").get_json()["suggestions"][0]["assetId"] == "w-1"
@@ -0,0 +1,117 @@
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+from flask import Flask
+
+# Ensure the application package is importable when running tests directly.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.api.routes.knowledge import create_knowledge_blueprint
+from src.indexing.semantic import SemanticIndex, hybrid_scores
+from src.knowledge_service import KnowledgeService
+from src.semantic_service import SemanticSearchService
+from src.services.knowledge import KnowledgeService as NotesService
+
+REPO_NOTES = Path(__file__).resolve().parents[1] / "loop" / "knowledge"
+
+
+@pytest.fixture
+def knowledge(tmp_path):
+    path = tmp_path / "knowledge_base.json"
+    path.write_text(
+        json.dumps(
+            {
+                "categories": [
+                    {
+                        "id": "story",
+                        "title": "Story",
+                        "entries": [{"question": "What is subtext?", "answer": "Meaning hidden beneath dialogue."}],
+                    }
+                ]
+            }
+        ),
+        encoding="utf-8",
+    )
+    return KnowledgeService(path)
+
+
+def test_semantic_index_ranks_related_documents():
+    documents = [
+        ("a", "dolly track camera push toward the actor"),
+        ("b", "camera glides on a dolly track beside the actor"),
+        ("c", "dialogue hides subtext and hidden meaning"),
+        ("d", "characters speak around hidden feelings in dialogue"),
+    ]
+    index = SemanticIndex.build(documents, dimensions=2)
+
+    assert index.vectors.dtype == np.float32
+    assert [doc_id for doc_id, _ in index.query("dolly camera", k=2)] in (["a", "b"], ["b", "a"])
+    assert {doc_id for doc_id, _ in index.query("hidden dialogue", k=2)} == {"c", "d"}
+
+
+def test_semantic_index_round_trips_as_memory_map(tmp_path):
+    index = SemanticIndex.build([("a", "slow push in"), ("b", "subtext in dialogue")], source_hash="abc")
+    index.save(tmp_path)
+
+    loaded = SemanticIndex.load(tmp_path)
+
+    assert isinstance(loaded.vectors, np.memmap)
+    assert loaded.source_hash == "abc"
+    assert loaded.query("push in", k=1)[0][0] == "a"
+
+
+def test_hybrid_scores_blend_normalized_lexical_scores():
+    combined = hybrid_scores({"a": 0.8, "b": 0.1}, {"b": 10.0, "c": 5.0}, alpha=0.5)
+
+    assert combined == pytest.approx({"a": 0.4, "b": 0.55, "c": 0.25})
+
+
+def test_semantic_endpoint_searches_entries_and_notes(knowledge, tmp_path):
+    service = SemanticSearchService(knowledge, NotesService(base_path=REPO_NOTES), index_dir=tmp_path / "index")
+    app = Flask(__name__)
+    app.register_blueprint(create_knowledge_blueprint(knowledge, semantic=service))
+    client = app.test_client()
+
+    semantic = client.get("/api/knowledge/semantic?q=hidden meaning in dialogue&k=3").get_json()
+    hybrid = client.get("/api/knowledge/semantic?q=subtext&mode=hybrid&k=3").get_json()
+
+    assert len(semantic["results"]) == 3
+    assert any(result["kind"] == "note" and "subtext" in result["id"] for result in semantic["results"])
+    assert hybrid["results"][0]["kind"] in {"entry", "note"}
+    assert (tmp_path / "index" / "vectors.npy").exists()
+
+
+def test_reload_rebuilds_semantic_index_in_background(knowledge, tmp_path, monkeypatch):
+    service = SemanticSearchService(knowledge)
+    knowledge.subscribe(service.refresh)
+    assert [result["id"] for result in service.search("subtext", k=5)["results"]] == ["entry:0"]
+
+    started, release = threading.Event(), threading.Event()
+    build = SemanticIndex.build
+
+    def slow_build(*args, **kwargs):
+        started.set()
+        release.wait(5)
+        return build(*args, **kwargs)
+
+    monkeypatch.setattr(SemanticIndex, "build", slow_build)
+    payload = json.loads(knowledge.path.read_text(encoding="utf-8"))
+    payload["categories"][0]["entries"].append({"question": "What is a crane shot?", "answer": "The camera rises."})
+    before = knowledge.path.stat().st_mtime_ns
+    knowledge.path.write_text(json.dumps(payload), encoding="utf-8")
+    os.utime(knowledge.path, ns=(before + 10**9, before + 10**9))
+
+    assert knowledge.reload_if_changed() is True
+    assert started.wait(5)
+    # The rebuild is still running: searches are answered from the previous index.
+    assert [result["id"] for result in service.search("subtext", k=5)["results"]] == ["entry:0"]
+    assert service.search("crane camera", k=5)["results"] == []
+
+    release.set()
+    assert service.index().ids == ["entry:0", "entry:1"]
+    assert service.search("crane camera", k=5)["results"][0]["id"] == "entry:1"